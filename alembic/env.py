@@ -11,8 +11,16 @@ from src.database import Base
 from src.repository.directory.postgres.model import (  # noqa F401
     Activity,
     Building,
+    DirectoryChange,
+    DirectoryChangeHorizon,
+    DirectoryDataVersion,
+    DirectoryImport,
+    DirectoryImportBatch,
     Organization,
     OrganizationPhoneNumber,
+    OrganizationSearch,
+    PaginationSession,
+    PaginationSessionItem,
 )
 
 config = context.config
@@ -0,0 +1,139 @@
+"""add directory query indexes
+
+Revision ID: 3c1d9e7a4b52
+Revises: bfff63daab90
+Create Date: 2026-10-19 10:12:41.508317
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1d9e7a4b52"
+down_revision: Union[str, Sequence[str], None] = "bfff63daab90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Indexes are built concurrently so the migration does not block
+    # reads/writes on populated tables.
+    with op.get_context().autocommit_block():
+        # Detail endpoint looks phones up by organization id.
+        op.create_index(
+            op.f("ix_organization_phone_number_organization_id"),
+            "organization_phone_number",
+            ["organization_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Building filter + (created_at, id) keyset ordering.
+        op.create_index(
+            "ix_organization_building_id_created_at_id",
+            "organization",
+            ["building_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Activity semi-join becomes an index-only scan.
+        op.create_index(
+            "ix_organization_activity_activity_id_organization_id",
+            "organization_activity",
+            ["activity_id", "organization_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Bounding box filter casts location to geometry, which can not use
+        # the geography index.
+        op.create_index(
+            "ix_building_location_geometry",
+            "building",
+            [sa.text("(location::geometry)")],
+            unique=False,
+            postgresql_using="gist",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        # Superseded by the indexes above (organization_activity primary key
+        # already covers organization_id lookups).
+        op.drop_index(
+            op.f("ix_organization_building_id"),
+            table_name="organization",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            op.f("ix_organization_activity_activity_id"),
+            table_name="organization_activity",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            op.f("ix_organization_activity_organization_id"),
+            table_name="organization_activity",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_organization_activity_organization_id"),
+            "organization_activity",
+            ["organization_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            op.f("ix_organization_activity_activity_id"),
+            "organization_activity",
+            ["activity_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            op.f("ix_organization_building_id"),
+            "organization",
+            ["building_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        op.drop_index(
+            "ix_building_location_geometry",
+            table_name="building",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_organization_activity_activity_id_organization_id",
+            table_name="organization_activity",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_organization_building_id_created_at_id",
+            table_name="organization",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            op.f("ix_organization_phone_number_organization_id"),
+            table_name="organization_phone_number",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,32 @@
+"""add organization content hash
+
+Revision ID: 8f4b2c6d1e93
+Revises: 3c1d9e7a4b52
+Create Date: 2026-10-19 11:02:17.240951
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f4b2c6d1e93"
+down_revision: Union[str, Sequence[str], None] = "3c1d9e7a4b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "organization",
+        sa.Column("content_hash", sa.VARCHAR(length=64), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("organization", "content_hash")
@@ -0,0 +1,62 @@
+"""add pagination sessions
+
+Revision ID: a4d82e6f0b19
+Revises: f3c7a1d9e485
+Create Date: 2026-10-19 20:11:46.208315
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d82e6f0b19"
+down_revision: Union[str, Sequence[str], None] = "f3c7a1d9e485"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Unlogged: sessions are throwaway, and a crash that truncates them only
+    # makes clients start their listing again.
+    op.create_table(
+        "pagination_session",
+        sa.Column(
+            "id",
+            sa.UUID(),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column("filter_digest", sa.VARCHAR(length=64), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(
+        "ix_pagination_session_expires_at",
+        "pagination_session",
+        ["expires_at"],
+        unique=False,
+    )
+    op.create_table(
+        "pagination_session_item",
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("position", sa.BIGINT(), nullable=False),
+        sa.Column("organization_id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["session_id"], ["pagination_session.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("session_id", "position"),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("pagination_session_item")
+    op.drop_index("ix_pagination_session_expires_at", table_name="pagination_session")
+    op.drop_table("pagination_session")
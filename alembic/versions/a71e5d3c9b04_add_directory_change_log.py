@@ -0,0 +1,136 @@
+"""add directory change log
+
+Revision ID: a71e5d3c9b04
+Revises: 8f4b2c6d1e93
+Create Date: 2026-10-19 12:40:05.671223
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a71e5d3c9b04"
+down_revision: Union[str, Sequence[str], None] = "8f4b2c6d1e93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose writes are recorded in directory_change.
+TRACKED_TABLES = (
+    "organization",
+    "building",
+    "activity",
+    "organization_phone_number",
+    "organization_activity",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "directory_change",
+        sa.Column("seq", sa.BIGINT(), sa.Identity(always=True), nullable=False),
+        sa.Column("entity", sa.VARCHAR(length=32), nullable=False),
+        sa.Column("entity_id", sa.UUID(), nullable=False),
+        sa.Column("op", sa.VARCHAR(length=8), nullable=False),
+        sa.Column(
+            "tx_id",
+            sa.BIGINT(),
+            server_default=sa.text("pg_current_xact_id()::text::bigint"),
+            nullable=False,
+        ),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("seq"),
+    )
+    op.create_index(
+        "ix_directory_change_tx_id_seq",
+        "directory_change",
+        ["tx_id", "seq"],
+        unique=False,
+    )
+    op.create_table(
+        "directory_change_horizon",
+        sa.Column("id", sa.INTEGER(), nullable=False),
+        sa.Column("tx_id", sa.BIGINT(), server_default=sa.text("0"), nullable=False),
+        sa.Column("seq", sa.BIGINT(), server_default=sa.text("0"), nullable=False),
+        sa.Column("pruned_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO directory_change_horizon (id) VALUES (1)")
+    create_directory_change_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    remove_directory_change_triggers()
+    op.drop_table("directory_change_horizon")
+    op.drop_index("ix_directory_change_tx_id_seq", table_name="directory_change")
+    op.drop_table("directory_change")
+
+
+def create_directory_change_triggers():
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION record_directory_change()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            owner_id uuid;
+        BEGIN
+            IF TG_TABLE_NAME IN ('organization', 'building', 'activity') THEN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO directory_change (entity, entity_id, op)
+                    VALUES (TG_TABLE_NAME, OLD.id, 'delete');
+                ELSE
+                    INSERT INTO directory_change (entity, entity_id, op)
+                    VALUES (TG_TABLE_NAME, NEW.id, 'upsert');
+                END IF;
+                RETURN NULL;
+            END IF;
+
+            -- Phones and activity links are part of the organization: report
+            -- them as an upsert of every still existing owning organization.
+            FOR owner_id IN
+                SELECT DISTINCT owner.id
+                FROM organization AS owner
+                WHERE owner.id IN (
+                    CASE WHEN TG_OP <> 'INSERT' THEN OLD.organization_id END,
+                    CASE WHEN TG_OP <> 'DELETE' THEN NEW.organization_id END
+                )
+            LOOP
+                INSERT INTO directory_change (entity, entity_id, op)
+                VALUES ('organization', owner_id, 'upsert');
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    for table_name in TRACKED_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table_name}_directory_change
+            AFTER INSERT OR UPDATE OR DELETE
+            ON {table_name}
+            FOR EACH ROW
+            EXECUTE FUNCTION record_directory_change();
+            """
+        )
+
+
+def remove_directory_change_triggers():
+    for table_name in TRACKED_TABLES:
+        op.execute(
+            f"DROP TRIGGER IF EXISTS trg_{table_name}_directory_change ON {table_name};"
+        )
+    op.execute("DROP FUNCTION IF EXISTS record_directory_change();")
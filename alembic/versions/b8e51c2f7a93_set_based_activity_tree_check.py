@@ -0,0 +1,241 @@
+"""set based activity tree check
+
+Revision ID: b8e51c2f7a93
+Revises: a4d82e6f0b19
+Create Date: 2026-10-19 21:34:12.517093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e51c2f7a93"
+down_revision: Union[str, Sequence[str], None] = "a4d82e6f0b19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (trigger name, event, transition tables) validating the activity tree.
+# UPDATE triggers with transition tables can not list columns, so the
+# function itself skips rows whose parent did not change.
+ACTIVITY_TREE_TRIGGERS = (
+    ("trg_activity_tree_insert", "INSERT", "NEW TABLE AS new_rows"),
+    (
+        "trg_activity_tree_update",
+        "UPDATE",
+        "NEW TABLE AS new_rows OLD TABLE AS old_rows",
+    ),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_activity_max_depth ON activity;")
+    op.execute("DROP FUNCTION IF EXISTS check_activity_max_depth();")
+    create_activity_tree_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    remove_activity_tree_triggers()
+    create_activity_max_depth_trigger()
+
+
+def create_activity_tree_triggers():
+    # Runs once per statement on the final state of the table: every node
+    # whose parent was set is checked together, with one recursive walk up
+    # and one down for the whole batch. A statement may move several
+    # subtrees at once as long as the tree it leaves behind is valid.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION check_activity_tree()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            max_depth CONSTANT integer := 3;
+            changed_ids uuid[];
+            deepest_level integer;
+            has_cycle boolean;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                changed_ids := ARRAY(
+                    SELECT id FROM new_rows WHERE parent_id IS NOT NULL
+                );
+            ELSE
+                changed_ids := ARRAY(
+                    SELECT new_rows.id
+                    FROM new_rows
+                    JOIN old_rows ON old_rows.id = new_rows.id
+                    WHERE new_rows.parent_id IS NOT NULL
+                      AND new_rows.parent_id IS DISTINCT FROM old_rows.parent_id
+                );
+            END IF;
+
+            IF cardinality(changed_ids) = 0 THEN
+                RETURN NULL;
+            END IF;
+
+            IF EXISTS (
+                SELECT 1 FROM activity
+                WHERE id = ANY(changed_ids) AND parent_id = id
+            ) THEN
+                RAISE EXCEPTION 'Activity cannot be parent of itself';
+            END IF;
+
+            WITH RECURSIVE ancestors AS (
+                SELECT a.id AS node_id, a.parent_id AS ancestor_id, 1 AS depth
+                FROM activity a
+                WHERE a.id = ANY(changed_ids)
+                UNION ALL
+                SELECT ancestors.node_id, a.parent_id, ancestors.depth + 1
+                FROM ancestors
+                JOIN activity a ON a.id = ancestors.ancestor_id
+                WHERE a.parent_id IS NOT NULL
+                  AND ancestors.ancestor_id <> ancestors.node_id
+                  AND ancestors.depth < max_depth + 10
+            ),
+            chains AS (
+                SELECT
+                    node_id,
+                    MAX(depth) AS chain_depth,
+                    BOOL_OR(ancestor_id = node_id) AS has_cycle
+                FROM ancestors
+                GROUP BY node_id
+            ),
+            descendants AS (
+                SELECT a.id AS node_id, a.id AS descendant_id, 1 AS depth
+                FROM activity a
+                WHERE a.id = ANY(changed_ids)
+                UNION ALL
+                SELECT descendants.node_id, a.id, descendants.depth + 1
+                FROM descendants
+                JOIN activity a ON a.parent_id = descendants.descendant_id
+                WHERE descendants.depth < max_depth + 10
+            ),
+            heights AS (
+                SELECT node_id, MAX(depth) AS height
+                FROM descendants
+                GROUP BY node_id
+            )
+            SELECT
+                BOOL_OR(chains.has_cycle),
+                MAX(chains.chain_depth + heights.height)
+            INTO has_cycle, deepest_level
+            FROM chains
+            JOIN heights ON heights.node_id = chains.node_id;
+
+            IF has_cycle THEN
+                RAISE EXCEPTION 'Activity hierarchy cycle detected';
+            END IF;
+
+            IF deepest_level > max_depth THEN
+                RAISE EXCEPTION 'Activity max depth exceeded: % (allowed: %)',
+                    deepest_level, max_depth;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    for trigger_name, event, transition_tables in ACTIVITY_TREE_TRIGGERS:
+        op.execute(
+            f"""
+            CREATE TRIGGER {trigger_name}
+            AFTER {event}
+            ON activity
+            REFERENCING {transition_tables}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION check_activity_tree();
+            """
+        )
+
+
+def remove_activity_tree_triggers():
+    for trigger_name, _, _ in ACTIVITY_TREE_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger_name} ON activity;")
+    op.execute("DROP FUNCTION IF EXISTS check_activity_tree();")
+
+
+def create_activity_max_depth_trigger():
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION check_activity_max_depth()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            max_depth CONSTANT integer := 3;
+            parent_chain_depth integer;
+            subtree_depth integer := 1;
+            has_cycle boolean := false;
+            deepest_level integer;
+        BEGIN
+            IF NEW.parent_id IS NULL THEN
+                RETURN NEW;
+            END IF;
+
+            IF TG_OP = 'UPDATE' AND NEW.parent_id IS NOT DISTINCT FROM OLD.parent_id THEN
+                RETURN NEW;
+            END IF;
+
+            IF NEW.id IS NOT NULL AND NEW.parent_id = NEW.id THEN
+                RAISE EXCEPTION 'Activity cannot be parent of itself';
+            END IF;
+
+            WITH RECURSIVE ancestors AS (
+                SELECT a.id, a.parent_id, 1 AS depth
+                FROM activity a
+                WHERE a.id = NEW.parent_id
+                UNION ALL
+                SELECT a.id, a.parent_id, ancestors.depth + 1
+                FROM activity a
+                JOIN ancestors ON a.id = ancestors.parent_id
+                WHERE ancestors.depth < max_depth + 10
+            )
+            SELECT COALESCE(MAX(depth), 0), COALESCE(BOOL_OR(id = NEW.id), false)
+            INTO parent_chain_depth, has_cycle
+            FROM ancestors;
+
+            IF has_cycle THEN
+                RAISE EXCEPTION 'Activity hierarchy cycle detected';
+            END IF;
+
+            IF TG_OP = 'UPDATE' THEN
+                WITH RECURSIVE descendants AS (
+                    SELECT a.id, 1 AS depth
+                    FROM activity a
+                    WHERE a.id = NEW.id
+                    UNION ALL
+                    SELECT a.id, descendants.depth + 1
+                    FROM activity a
+                    JOIN descendants ON a.parent_id = descendants.id
+                )
+                SELECT COALESCE(MAX(depth), 1) INTO subtree_depth
+                FROM descendants;
+            END IF;
+
+            deepest_level := parent_chain_depth + subtree_depth;
+            IF deepest_level > max_depth THEN
+                RAISE EXCEPTION 'Activity max depth exceeded: % (allowed: %)',
+                    deepest_level, max_depth;
+            END IF;
+
+            RETURN NEW;
+        END;
+        $$;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER trg_activity_max_depth
+        BEFORE INSERT OR UPDATE OF parent_id
+        ON activity
+        FOR EACH ROW
+        EXECUTE FUNCTION check_activity_max_depth();
+        """
+    )
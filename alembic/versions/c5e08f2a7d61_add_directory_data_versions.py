@@ -0,0 +1,88 @@
+"""add directory data versions
+
+Revision ID: c5e08f2a7d61
+Revises: a71e5d3c9b04
+Create Date: 2026-10-19 14:05:48.119034
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e08f2a7d61"
+down_revision: Union[str, Sequence[str], None] = "a71e5d3c9b04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables with a data version counter.
+VERSIONED_TABLES = (
+    "organization",
+    "building",
+    "activity",
+    "organization_phone_number",
+    "organization_activity",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "directory_data_version",
+        sa.Column("table_name", sa.VARCHAR(length=64), nullable=False),
+        sa.Column("version", sa.BIGINT(), server_default=sa.text("0"), nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+    op.execute(
+        "INSERT INTO directory_data_version (table_name) VALUES "
+        + ", ".join(f"('{table_name}')" for table_name in VERSIONED_TABLES)
+    )
+    create_data_version_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    remove_data_version_triggers()
+    op.drop_table("directory_data_version")
+
+
+def create_data_version_triggers():
+    # Counter is bumped in the writing transaction, so readers observe the new
+    # version only together with the committed data.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_directory_data_version()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            UPDATE directory_data_version
+            SET version = version + 1
+            WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    for table_name in VERSIONED_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table_name}_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+            ON {table_name}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION bump_directory_data_version();
+            """
+        )
+
+
+def remove_data_version_triggers():
+    for table_name in VERSIONED_TABLES:
+        op.execute(
+            f"DROP TRIGGER IF EXISTS trg_{table_name}_data_version ON {table_name};"
+        )
+    op.execute("DROP FUNCTION IF EXISTS bump_directory_data_version();")
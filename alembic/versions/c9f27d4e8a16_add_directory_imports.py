@@ -0,0 +1,60 @@
+"""add directory imports
+
+Revision ID: c9f27d4e8a16
+Revises: b8e51c2f7a93
+Create Date: 2026-10-19 22:48:05.731264
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c9f27d4e8a16"
+down_revision: Union[str, Sequence[str], None] = "b8e51c2f7a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "directory_import",
+        sa.Column("source", sa.VARCHAR(length=1024), nullable=False),
+        sa.Column("file_size", sa.BIGINT(), nullable=False),
+        sa.Column("file_hash", sa.VARCHAR(length=64), nullable=False),
+        sa.Column("batch_size", sa.INTEGER(), nullable=False),
+        sa.Column(
+            "started_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("source"),
+    )
+    op.create_table(
+        "directory_import_batch",
+        sa.Column("source", sa.VARCHAR(length=1024), nullable=False),
+        sa.Column("batch_number", sa.INTEGER(), nullable=False),
+        sa.Column("records", sa.INTEGER(), nullable=False),
+        sa.Column(
+            "committed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["source"], ["directory_import.source"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("source", "batch_number"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("directory_import_batch")
+    op.drop_table("directory_import")
@@ -0,0 +1,472 @@
+"""add organization search
+
+Revision ID: d2a94c7e1f38
+Revises: c5e08f2a7d61
+Create Date: 2026-10-19 16:22:07.384519
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from geoalchemy2 import Geography
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a94c7e1f38"
+down_revision: Union[str, Sequence[str], None] = "c5e08f2a7d61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (trigger name, table, event, trigger function) keeping organization_search
+# in sync. Statement-level triggers with transition tables refresh every
+# affected organization once per statement, so bulk writes stay cheap.
+SEARCH_TRIGGERS = (
+    (
+        "trg_organization_search_organization_insert",
+        "organization",
+        "INSERT",
+        "organization_search_on_organization",
+    ),
+    (
+        "trg_organization_search_organization_update",
+        "organization",
+        "UPDATE",
+        "organization_search_on_organization",
+    ),
+    (
+        "trg_organization_search_building_update",
+        "building",
+        "UPDATE",
+        "organization_search_on_building",
+    ),
+    (
+        "trg_organization_search_activity_update",
+        "activity",
+        "UPDATE",
+        "organization_search_on_activity",
+    ),
+    (
+        "trg_organization_search_organization_activity_insert",
+        "organization_activity",
+        "INSERT",
+        "organization_search_on_organization_activity",
+    ),
+    (
+        "trg_organization_search_organization_activity_update",
+        "organization_activity",
+        "UPDATE",
+        "organization_search_on_organization_activity",
+    ),
+    (
+        "trg_organization_search_organization_activity_delete",
+        "organization_activity",
+        "DELETE",
+        "organization_search_on_organization_activity",
+    ),
+)
+
+SEARCH_TRIGGER_FUNCTIONS = (
+    "organization_search_on_organization",
+    "organization_search_on_building",
+    "organization_search_on_activity",
+    "organization_search_on_organization_activity",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "organization_search",
+        sa.Column("organization_id", sa.UUID(), nullable=False),
+        sa.Column("name", sa.VARCHAR(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("building_id", sa.UUID(), nullable=True),
+        sa.Column("building_address", sa.VARCHAR(length=255), nullable=True),
+        sa.Column(
+            "location",
+            Geography(
+                geometry_type="POINT",
+                srid=4326,
+                dimension=2,
+                spatial_index=False,
+                from_text="ST_GeogFromText",
+                name="geography",
+            ),
+            nullable=True,
+        ),
+        sa.Column(
+            "direct_activity_ids",
+            postgresql.ARRAY(sa.UUID()),
+            server_default=sa.text("'{}'"),
+            nullable=False,
+        ),
+        sa.Column(
+            "activity_ids",
+            postgresql.ARRAY(sa.UUID()),
+            server_default=sa.text("'{}'"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organization.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("organization_id"),
+    )
+    op.create_index(
+        "ix_organization_search_created_at_organization_id",
+        "organization_search",
+        ["created_at", "organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_organization_search_building_id_created_at_organization_id",
+        "organization_search",
+        ["building_id", "created_at", "organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_organization_search_name_trgm",
+        "organization_search",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_organization_search_direct_activity_ids",
+        "organization_search",
+        ["direct_activity_ids"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_organization_search_activity_ids",
+        "organization_search",
+        ["activity_ids"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_organization_search_location",
+        "organization_search",
+        ["location"],
+        unique=False,
+        postgresql_using="gist",
+    )
+    op.create_index(
+        "ix_organization_search_location_geometry",
+        "organization_search",
+        [sa.text("(location::geometry)")],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+    create_organization_search_triggers()
+    op.execute("SELECT refresh_organization_search(array_agg(id)) FROM organization")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    remove_organization_search_triggers()
+    op.drop_index(
+        "ix_organization_search_location_geometry",
+        table_name="organization_search",
+        postgresql_using="gist",
+    )
+    op.drop_index(
+        "ix_organization_search_location",
+        table_name="organization_search",
+        postgresql_using="gist",
+    )
+    op.drop_index(
+        "ix_organization_search_activity_ids",
+        table_name="organization_search",
+        postgresql_using="gin",
+    )
+    op.drop_index(
+        "ix_organization_search_direct_activity_ids",
+        table_name="organization_search",
+        postgresql_using="gin",
+    )
+    op.drop_index(
+        "ix_organization_search_name_trgm",
+        table_name="organization_search",
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.drop_index(
+        "ix_organization_search_building_id_created_at_organization_id",
+        table_name="organization_search",
+    )
+    op.drop_index(
+        "ix_organization_search_created_at_organization_id",
+        table_name="organization_search",
+    )
+    op.drop_table("organization_search")
+
+
+def create_organization_search_triggers():
+    create_organization_search_lock_function()
+
+    # activity_ids holds linked activities together with their ancestors.
+    # Hierarchy is at most three levels deep (trg_activity_max_depth), so two
+    # parent hops reach the root. Every statement of a plpgsql function takes
+    # a fresh snapshot, so the row is built after the locks are granted from
+    # everything committed up to then.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION refresh_organization_search(organization_ids uuid[])
+        RETURNS void
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM lock_organization_search(organization_ids);
+
+            INSERT INTO organization_search (
+                organization_id,
+                name,
+                created_at,
+                building_id,
+                building_address,
+                location,
+                direct_activity_ids,
+                activity_ids
+            )
+            SELECT
+                o.id,
+                o.name,
+                o.created_at,
+                o.building_id,
+                b.address,
+                b.location,
+                COALESCE(links.direct_activity_ids, '{}'),
+                COALESCE(links.activity_ids, '{}')
+            FROM organization AS o
+            LEFT JOIN building AS b ON b.id = o.building_id
+            LEFT JOIN LATERAL (
+                SELECT
+                    array_agg(DISTINCT a.id) AS direct_activity_ids,
+                    array_agg(DISTINCT ancestor.id) AS activity_ids
+                FROM organization_activity AS oa
+                JOIN activity AS a ON a.id = oa.activity_id
+                LEFT JOIN activity AS p ON p.id = a.parent_id
+                CROSS JOIN LATERAL (
+                    VALUES (a.id), (a.parent_id), (p.parent_id)
+                ) AS ancestor(id)
+                WHERE oa.organization_id = o.id AND ancestor.id IS NOT NULL
+            ) AS links ON true
+            WHERE o.id = ANY(organization_ids)
+            ON CONFLICT (organization_id) DO UPDATE SET
+                name = EXCLUDED.name,
+                created_at = EXCLUDED.created_at,
+                building_id = EXCLUDED.building_id,
+                building_address = EXCLUDED.building_address,
+                location = EXCLUDED.location,
+                direct_activity_ids = EXCLUDED.direct_activity_ids,
+                activity_ids = EXCLUDED.activity_ids;
+        END;
+        $$;
+        """
+    )
+
+    # Deleted organizations leave the table through the foreign key cascade.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION organization_search_on_organization()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM refresh_organization_search(
+                    ARRAY(SELECT id FROM new_rows)
+                );
+            ELSE
+                PERFORM refresh_organization_search(ARRAY(
+                    SELECT n.id
+                    FROM new_rows AS n
+                    JOIN old_rows AS o ON o.id = n.id
+                    WHERE (n.name, n.created_at, n.building_id)
+                        IS DISTINCT FROM (o.name, o.created_at, o.building_id)
+                ));
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    # Deleted buildings reach organizations as building_id SET NULL updates.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION organization_search_on_building()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM refresh_organization_search(ARRAY(
+                SELECT org.id
+                FROM new_rows AS n
+                JOIN old_rows AS o ON o.id = n.id
+                JOIN organization AS org ON org.building_id = n.id
+                WHERE (n.address, n.location::text)
+                    IS DISTINCT FROM (o.address, o.location::text)
+            ));
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    # Moving an activity changes ancestors of every activity in its subtree.
+    # Deleted activities reach organizations through organization_activity.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION organization_search_on_activity()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM refresh_organization_search(ARRAY(
+                WITH RECURSIVE moved AS (
+                    SELECT n.id
+                    FROM new_rows AS n
+                    JOIN old_rows AS o ON o.id = n.id
+                    WHERE n.parent_id IS DISTINCT FROM o.parent_id
+                    UNION
+                    SELECT a.id
+                    FROM activity AS a
+                    JOIN moved ON a.parent_id = moved.id
+                )
+                SELECT DISTINCT oa.organization_id
+                FROM moved
+                JOIN organization_activity AS oa ON oa.activity_id = moved.id
+            ));
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION organization_search_on_organization_activity()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM refresh_organization_search(
+                    ARRAY(SELECT DISTINCT organization_id FROM new_rows)
+                );
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM refresh_organization_search(
+                    ARRAY(SELECT DISTINCT organization_id FROM old_rows)
+                );
+            ELSE
+                PERFORM refresh_organization_search(ARRAY(
+                    SELECT organization_id FROM new_rows
+                    UNION
+                    SELECT organization_id FROM old_rows
+                ));
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    for trigger_name, table_name, event, function_name in SEARCH_TRIGGERS:
+        transition_tables = {
+            "INSERT": "NEW TABLE AS new_rows",
+            "UPDATE": "NEW TABLE AS new_rows OLD TABLE AS old_rows",
+            "DELETE": "OLD TABLE AS old_rows",
+        }[event]
+        op.execute(
+            f"""
+            CREATE TRIGGER {trigger_name}
+            AFTER {event}
+            ON {table_name}
+            REFERENCING {transition_tables}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION {function_name}();
+            """
+        )
+
+
+def create_organization_search_lock_function():
+    # Locking the search rows serializes refreshes of one organization, so the
+    # later one rebuilds the row from what the earlier one committed instead
+    # of overwriting it with its own stale view. Buildings and activities the
+    # row is built from are share locked first: a concurrent address change
+    # or activity move then either commits before the row is rebuilt, or
+    # waits for this transaction and refreshes the row itself. Sources go
+    # first, so a refresh waiting for a source holds no search row that the
+    # source's own refresh needs. Row locks live in the rows, so refreshing
+    # many organizations at once does not fill the shared lock table.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION lock_organization_search(organization_ids uuid[])
+        RETURNS void
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            activity_ids uuid[];
+            locked_activity_ids uuid[];
+        BEGIN
+            PERFORM 1
+            FROM building AS b
+            WHERE b.id IN (
+                SELECT o.building_id
+                FROM organization AS o
+                WHERE o.id = ANY(organization_ids)
+            )
+            ORDER BY b.id
+            FOR SHARE OF b;
+
+            -- A locked activity can not move, so the ancestor chains are
+            -- final once locking them finds no new ancestor.
+            LOOP
+                activity_ids := ARRAY(
+                    WITH RECURSIVE chain AS (
+                        SELECT oa.activity_id AS id
+                        FROM organization_activity AS oa
+                        WHERE oa.organization_id = ANY(organization_ids)
+                        UNION
+                        SELECT a.parent_id
+                        FROM activity AS a
+                        JOIN chain ON chain.id = a.id
+                        WHERE a.parent_id IS NOT NULL
+                    )
+                    SELECT id FROM chain ORDER BY id
+                );
+                EXIT WHEN activity_ids = locked_activity_ids;
+
+                PERFORM 1
+                FROM activity AS a
+                WHERE a.id = ANY(activity_ids)
+                ORDER BY a.id
+                FOR SHARE OF a;
+                locked_activity_ids := activity_ids;
+            END LOOP;
+
+            PERFORM 1
+            FROM organization_search AS s
+            WHERE s.organization_id = ANY(organization_ids)
+            ORDER BY s.organization_id
+            FOR UPDATE OF s;
+        END;
+        $$;
+        """
+    )
+
+
+def remove_organization_search_triggers():
+    for trigger_name, table_name, _, _ in SEARCH_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger_name} ON {table_name};")
+    for function_name in SEARCH_TRIGGER_FUNCTIONS:
+        op.execute(f"DROP FUNCTION IF EXISTS {function_name}();")
+    op.execute("DROP FUNCTION IF EXISTS refresh_organization_search(uuid[]);")
+    op.execute("DROP FUNCTION IF EXISTS lock_organization_search(uuid[]);")
@@ -0,0 +1,281 @@
+"""partition organization search
+
+Revision ID: e6b13f9a2c57
+Revises: d2a94c7e1f38
+Create Date: 2026-10-19 17:48:31.902746
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from geoalchemy2 import Geography
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b13f9a2c57"
+down_revision: Union[str, Sequence[str], None] = "d2a94c7e1f38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created ahead of the current month by the migration.
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Search rows are derived data, so the table is rebuilt instead of copied.
+    op.drop_table("organization_search")
+    create_organization_search_table(partitioned=True)
+    op.execute(
+        "CREATE TABLE organization_search_default "
+        "PARTITION OF organization_search DEFAULT"
+    )
+    replace_refresh_function()
+    create_partition_function()
+    op.execute(
+        f"""
+        SELECT create_organization_search_partitions(
+            date_trunc('month', COALESCE(MIN(created_at), now()) AT TIME ZONE 'UTC')::date,
+            (date_trunc('month', now() AT TIME ZONE 'UTC')
+                + interval '{MONTHS_AHEAD + 1} months')::date
+        )
+        FROM organization
+        """
+    )
+    create_organization_search_indexes(partitioned=True)
+    op.execute("SELECT refresh_organization_search(array_agg(id)) FROM organization")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "DROP FUNCTION IF EXISTS create_organization_search_partitions(date, date);"
+    )
+    op.drop_table("organization_search")
+    create_organization_search_table(partitioned=False)
+    create_organization_search_indexes(partitioned=False)
+    # Delete + insert refresh from this revision works for the plain table too.
+    op.execute("SELECT refresh_organization_search(array_agg(id)) FROM organization")
+
+
+def create_organization_search_table(partitioned: bool):
+    # Partition key has to be part of the primary key, so keyset order
+    # (created_at, organization_id) becomes the primary key. The plain table
+    # of the previous revision is keyed by organization_id alone.
+    primary_key = (
+        sa.PrimaryKeyConstraint("created_at", "organization_id")
+        if partitioned
+        else sa.PrimaryKeyConstraint("organization_id")
+    )
+    op.create_table(
+        "organization_search",
+        sa.Column("organization_id", sa.UUID(), nullable=False),
+        sa.Column("name", sa.VARCHAR(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("building_id", sa.UUID(), nullable=True),
+        sa.Column("building_address", sa.VARCHAR(length=255), nullable=True),
+        sa.Column(
+            "location",
+            Geography(
+                geometry_type="POINT",
+                srid=4326,
+                dimension=2,
+                spatial_index=False,
+                from_text="ST_GeogFromText",
+                name="geography",
+            ),
+            nullable=True,
+        ),
+        sa.Column(
+            "direct_activity_ids",
+            postgresql.ARRAY(sa.UUID()),
+            server_default=sa.text("'{}'"),
+            nullable=False,
+        ),
+        sa.Column(
+            "activity_ids",
+            postgresql.ARRAY(sa.UUID()),
+            server_default=sa.text("'{}'"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organization.id"], ondelete="CASCADE"
+        ),
+        primary_key,
+        postgresql_partition_by="RANGE (created_at)" if partitioned else None,
+    )
+
+
+def create_organization_search_indexes(partitioned: bool):
+    # Indexes on the partitioned table are created on every partition,
+    # including the ones added later. Each table gets an index on the columns
+    # its primary key does not cover.
+    if partitioned:
+        op.create_index(
+            "ix_organization_search_organization_id",
+            "organization_search",
+            ["organization_id"],
+            unique=False,
+        )
+    else:
+        op.create_index(
+            "ix_organization_search_created_at_organization_id",
+            "organization_search",
+            ["created_at", "organization_id"],
+            unique=False,
+        )
+    op.create_index(
+        "ix_organization_search_building_id_created_at_organization_id",
+        "organization_search",
+        ["building_id", "created_at", "organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_organization_search_name_trgm",
+        "organization_search",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_organization_search_direct_activity_ids",
+        "organization_search",
+        ["direct_activity_ids"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_organization_search_activity_ids",
+        "organization_search",
+        ["activity_ids"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_organization_search_location",
+        "organization_search",
+        ["location"],
+        unique=False,
+        postgresql_using="gist",
+    )
+    op.create_index(
+        "ix_organization_search_location_geometry",
+        "organization_search",
+        [sa.text("(location::geometry)")],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def create_partition_function():
+    # Creates missing monthly partitions in [from_month, to_month). Rows that
+    # already landed in the default partition for a new month are moved by
+    # refreshing them once the partition exists.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_organization_search_partitions(
+            from_month date,
+            to_month date
+        )
+        RETURNS SETOF text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            month_start date := date_trunc('month', from_month)::date;
+            month_end date;
+            partition_name text;
+            moved_ids uuid[];
+        BEGIN
+            WHILE month_start < to_month LOOP
+                month_end := (month_start + interval '1 month')::date;
+                partition_name := 'organization_search_p'
+                    || to_char(month_start, 'YYYYMM');
+
+                IF to_regclass(partition_name) IS NULL THEN
+                    WITH moved AS (
+                        DELETE FROM organization_search_default
+                        WHERE created_at >= month_start::timestamp AT TIME ZONE 'UTC'
+                            AND created_at < month_end::timestamp AT TIME ZONE 'UTC'
+                        RETURNING organization_id
+                    )
+                    SELECT array_agg(organization_id) INTO moved_ids FROM moved;
+
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF organization_search '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        partition_name,
+                        month_start::timestamp AT TIME ZONE 'UTC',
+                        month_end::timestamp AT TIME ZONE 'UTC'
+                    );
+
+                    PERFORM refresh_organization_search(moved_ids);
+                    RETURN NEXT partition_name;
+                END IF;
+
+                month_start := month_end;
+            END LOOP;
+        END;
+        $$;
+        """
+    )
+
+
+def replace_refresh_function():
+    # organization_id alone is no longer unique across partitions, and a
+    # changed created_at moves the row to another partition, so rows are
+    # replaced instead of upserted. The locks of lock_organization_search
+    # keep concurrent refreshes of one organization from both inserting.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION refresh_organization_search(organization_ids uuid[])
+        RETURNS void
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM lock_organization_search(organization_ids);
+
+            DELETE FROM organization_search
+            WHERE organization_id = ANY(organization_ids);
+
+            INSERT INTO organization_search (
+                organization_id,
+                name,
+                created_at,
+                building_id,
+                building_address,
+                location,
+                direct_activity_ids,
+                activity_ids
+            )
+            SELECT
+                o.id,
+                o.name,
+                o.created_at,
+                o.building_id,
+                b.address,
+                b.location,
+                COALESCE(links.direct_activity_ids, '{}'),
+                COALESCE(links.activity_ids, '{}')
+            FROM organization AS o
+            LEFT JOIN building AS b ON b.id = o.building_id
+            LEFT JOIN LATERAL (
+                SELECT
+                    array_agg(DISTINCT a.id) AS direct_activity_ids,
+                    array_agg(DISTINCT ancestor.id) AS activity_ids
+                FROM organization_activity AS oa
+                JOIN activity AS a ON a.id = oa.activity_id
+                LEFT JOIN activity AS p ON p.id = a.parent_id
+                CROSS JOIN LATERAL (
+                    VALUES (a.id), (a.parent_id), (p.parent_id)
+                ) AS ancestor(id)
+                WHERE oa.organization_id = o.id AND ancestor.id IS NOT NULL
+            ) AS links ON true
+            WHERE o.id = ANY(organization_ids);
+        END;
+        $$;
+        """
+    )
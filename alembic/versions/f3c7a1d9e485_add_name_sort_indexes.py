@@ -0,0 +1,60 @@
+"""add name sort indexes
+
+Revision ID: f3c7a1d9e485
+Revises: e6b13f9a2c57
+Create Date: 2026-10-19 19:05:12.417390
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c7a1d9e485"
+down_revision: Union[str, Sequence[str], None] = "e6b13f9a2c57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ICU root collation: language-aware alphabetical order that is the same
+    # on every database whatever its default locale, so shard pages agree.
+    op.execute(
+        "CREATE COLLATION IF NOT EXISTS directory_sort (provider = icu, locale = 'und')"
+    )
+    # Expressions must match text_sort_key() in the queries exactly for the
+    # planner to use them for the alphabetical keyset order. Indexes of a
+    # partitioned table can not be built concurrently.
+    op.create_index(
+        "ix_organization_search_name_sort",
+        "organization_search",
+        [sa.text("(lower(name) COLLATE directory_sort)"), "organization_id"],
+        unique=False,
+    )
+    # Built concurrently so the migration does not block writes to buildings.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_building_address_sort",
+            "building",
+            [sa.text("(lower(address) COLLATE directory_sort)"), "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_building_address_sort",
+            table_name="building",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_index("ix_organization_search_name_sort", table_name="organization_search")
+    op.execute("DROP COLLATION IF EXISTS directory_sort")
@@ -0,0 +1,230 @@
+import argparse
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from uuid import UUID
+
+import asyncpg
+
+from scripts._dev_db import create_connection
+
+# Row trigger the statement-level tree check replaced, installed inside the
+# benchmark transaction only.
+ROW_TRIGGER_SQL = """
+DROP TRIGGER trg_activity_tree_insert ON activity;
+DROP TRIGGER trg_activity_tree_update ON activity;
+
+CREATE FUNCTION check_activity_max_depth()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    max_depth CONSTANT integer := 3;
+    parent_chain_depth integer;
+    subtree_depth integer := 1;
+    has_cycle boolean := false;
+    deepest_level integer;
+BEGIN
+    IF NEW.parent_id IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.parent_id IS NOT DISTINCT FROM OLD.parent_id THEN
+        RETURN NEW;
+    END IF;
+
+    IF NEW.id IS NOT NULL AND NEW.parent_id = NEW.id THEN
+        RAISE EXCEPTION 'Activity cannot be parent of itself';
+    END IF;
+
+    WITH RECURSIVE ancestors AS (
+        SELECT a.id, a.parent_id, 1 AS depth
+        FROM activity a
+        WHERE a.id = NEW.parent_id
+        UNION ALL
+        SELECT a.id, a.parent_id, ancestors.depth + 1
+        FROM activity a
+        JOIN ancestors ON a.id = ancestors.parent_id
+        WHERE ancestors.depth < max_depth + 10
+    )
+    SELECT COALESCE(MAX(depth), 0), COALESCE(BOOL_OR(id = NEW.id), false)
+    INTO parent_chain_depth, has_cycle
+    FROM ancestors;
+
+    IF has_cycle THEN
+        RAISE EXCEPTION 'Activity hierarchy cycle detected';
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        WITH RECURSIVE descendants AS (
+            SELECT a.id, 1 AS depth
+            FROM activity a
+            WHERE a.id = NEW.id
+            UNION ALL
+            SELECT a.id, descendants.depth + 1
+            FROM activity a
+            JOIN descendants ON a.parent_id = descendants.id
+        )
+        SELECT COALESCE(MAX(depth), 1) INTO subtree_depth
+        FROM descendants;
+    END IF;
+
+    deepest_level := parent_chain_depth + subtree_depth;
+    IF deepest_level > max_depth THEN
+        RAISE EXCEPTION 'Activity max depth exceeded: % (allowed: %)',
+            deepest_level, max_depth;
+    END IF;
+
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER trg_activity_max_depth
+BEFORE INSERT OR UPDATE OF parent_id
+ON activity
+FOR EACH ROW
+EXECUTE FUNCTION check_activity_max_depth();
+"""
+
+
+@dataclass(frozen=True)
+class Taxonomy:
+    roots: list[UUID]
+    # (child, root) pairs of the second level.
+    children: list[tuple[UUID, UUID]]
+    # (grandchild, child) pairs of the third level.
+    grandchildren: list[tuple[UUID, UUID]]
+
+
+@dataclass(frozen=True)
+class Timing:
+    insert: float
+    move: float
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare the row-level and the statement-level activity tree check "
+            "on bulk inserts and subtree moves. Changes are rolled back."
+        )
+    )
+    parser.add_argument(
+        "--roots", type=int, default=200, help="Number of root activities."
+    )
+    parser.add_argument(
+        "--children", type=int, default=5, help="Children of every root."
+    )
+    parser.add_argument(
+        "--grandchildren", type=int, default=4, help="Children of every child."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per trigger, best one is shown."
+    )
+    return parser.parse_args()
+
+
+def build_taxonomy(roots: int, children: int, grandchildren: int) -> Taxonomy:
+    root_ids = [uuid.uuid4() for _ in range(roots)]
+    child_pairs = [
+        (uuid.uuid4(), root_id) for root_id in root_ids for _ in range(children)
+    ]
+    grandchild_pairs = [
+        (uuid.uuid4(), child_id)
+        for child_id, _ in child_pairs
+        for _ in range(grandchildren)
+    ]
+    return Taxonomy(
+        roots=root_ids, children=child_pairs, grandchildren=grandchild_pairs
+    )
+
+
+async def insert_level(
+    conn: asyncpg.Connection, pairs: list[tuple[UUID, UUID | None]]
+) -> None:
+    await conn.execute(
+        """
+        INSERT INTO activity (id, name, parent_id)
+        SELECT id, 'Benchmark ' || id, parent_id
+        FROM unnest($1::uuid[], $2::uuid[]) AS level(id, parent_id)
+        """,
+        [activity_id for activity_id, _ in pairs],
+        [parent_id for _, parent_id in pairs],
+    )
+
+
+async def run_once(
+    conn: asyncpg.Connection, taxonomy: Taxonomy, row_trigger: bool
+) -> Timing:
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        if row_trigger:
+            await conn.execute(ROW_TRIGGER_SQL)
+
+        started_at = time.perf_counter()
+        await insert_level(conn, [(root_id, None) for root_id in taxonomy.roots])
+        await insert_level(conn, taxonomy.children)
+        await insert_level(conn, taxonomy.grandchildren)
+        inserted_at = time.perf_counter()
+
+        # Every child subtree moves to the next root in one statement.
+        next_root = {
+            root_id: taxonomy.roots[(index + 1) % len(taxonomy.roots)]
+            for index, root_id in enumerate(taxonomy.roots)
+        }
+        await conn.execute(
+            """
+            UPDATE activity
+            SET parent_id = moves.parent_id
+            FROM unnest($1::uuid[], $2::uuid[]) AS moves(id, parent_id)
+            WHERE activity.id = moves.id
+            """,
+            [child_id for child_id, _ in taxonomy.children],
+            [next_root[root_id] for _, root_id in taxonomy.children],
+        )
+        moved_at = time.perf_counter()
+    finally:
+        await transaction.rollback()
+
+    return Timing(insert=inserted_at - started_at, move=moved_at - inserted_at)
+
+
+async def benchmark(args: argparse.Namespace) -> None:
+    taxonomy = build_taxonomy(args.roots, args.children, args.grandchildren)
+    total = len(taxonomy.roots) + len(taxonomy.children) + len(taxonomy.grandchildren)
+    conn = await create_connection()
+    try:
+        results: dict[str, Timing] = {}
+        for label, row_trigger in (("row", True), ("statement", False)):
+            runs = [
+                await run_once(conn, taxonomy, row_trigger) for _ in range(args.repeat)
+            ]
+            results[label] = Timing(
+                insert=min(run.insert for run in runs),
+                move=min(run.move for run in runs),
+            )
+    finally:
+        await conn.close()
+
+    print(
+        f"{total} activities inserted, "
+        f"{len(taxonomy.children)} subtrees moved in one statement."
+    )
+    print(f"{'trigger':<10} {'insert, ms':>12} {'move, ms':>12}")
+    for label, timing in results.items():
+        print(f"{label:<10} {timing.insert * 1000:>12.1f} {timing.move * 1000:>12.1f}")
+    row, statement = results["row"], results["statement"]
+    print(
+        f"speedup: insert x{row.insert / statement.insert:.1f}, "
+        f"move x{row.move / statement.move:.1f}"
+    )
+
+
+def main() -> None:
+    asyncio.run(benchmark(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.config import settings
+from src.tracing import tracer
+
+# Spans recorded by one organization list request: request, route, service,
+# repository, serialize and pool checkout plus statements.
+SPANS_PER_REQUEST = 12
+
+
+def _request() -> None:
+    with (
+        tracer.span("http.request", method="GET", path="/api/v1/directory"),
+        tracer.span("router.get_organizations"),
+    ):
+        with (
+            tracer.span("DirectoryService.get_organizations"),
+            tracer.span("PostgresDirectoryRepository.get_organizations"),
+        ):
+            for _ in range(SPANS_PER_REQUEST - 5):
+                with tracer.span("db.execute", statement="Select"):
+                    pass
+        with tracer.span("serialize"):
+            pass
+
+
+def _measure(requests: int) -> float:
+    """Seconds per simulated request"""
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        _request()
+    return (time.perf_counter() - started_at) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure the cost of a span with every tracing exporter."
+    )
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    results = {}
+    settings.TRACING_ENABLED = False
+    results["disabled"] = _measure(args.requests)
+
+    settings.TRACING_ENABLED = True
+    with tempfile.TemporaryDirectory() as directory:
+        for exporter in ("memory", "file"):
+            settings.TRACING_EXPORTER = exporter
+            settings.TRACING_FILE_PATH = Path(directory) / "spans.jsonl"
+            tracer.close()
+            tracer._exporter = None
+            _measure(args.requests // 10)  # warm up
+            results[exporter] = _measure(args.requests)
+        tracer.close()
+
+    baseline = results["disabled"]
+    for name, seconds in results.items():
+        per_span = (seconds - baseline) / SPANS_PER_REQUEST
+        print(
+            f"{name:>8}: {seconds * 1e6:7.1f} us per request of "
+            f"{SPANS_PER_REQUEST} spans, {per_span * 1e6:5.2f} us per span"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import csv
+from pathlib import Path
+
+from src.config import settings
+from src.database import Database
+from src.dependencies import create_sharded_directory_repository
+from src.dto import ActivityMove
+from src.repository.directory.postgres import PostgresDirectoryRepository
+
+
+def read_moves(path: Path) -> list[ActivityMove]:
+    """Read activity_id,parent_id rows, an empty parent_id makes a root"""
+    with path.open(newline="", encoding="utf-8") as file:
+        return [
+            ActivityMove(
+                activity_uuid=row["activity_id"],
+                parent_uuid=row["parent_id"] or None,
+            )
+            for row in csv.DictReader(file)
+        ]
+
+
+async def move_activities(moves: list[ActivityMove]) -> int:
+    """Apply all moves in one transaction per database, return moved count"""
+    if settings.DIRECTORY_SHARDS:
+        # Activities are replicated on every shard, the moves go to each.
+        repository = create_sharded_directory_repository()
+        try:
+            return await repository.move_activities(moves)
+        finally:
+            await repository.close()
+
+    database = Database()
+    try:
+        return await PostgresDirectoryRepository(database).move_activities(moves)
+    finally:
+        await database.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Move activities with their subtrees to new parents in one "
+            "transaction. Either every move is applied or none is."
+        )
+    )
+    parser.add_argument(
+        "path",
+        type=Path,
+        help="CSV file with activity_id,parent_id columns; "
+        "an empty parent_id moves the activity to the root.",
+    )
+    args = parser.parse_args()
+
+    try:
+        moves = read_moves(args.path)
+        moved = asyncio.run(move_activities(moves))
+    except (KeyError, ValueError) as exc:
+        parser.exit(1, f"Activity moves rejected: {exc}\n")
+    except RuntimeError as exc:
+        parser.exit(1, f"Activity moves failed: {exc}\n")
+
+    print(f"Moved {moved} of {len(moves)} activities.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import time
+from enum import StrEnum
+
+from fastapi import Request
+
+from src.config import settings
+from src.metrics import registry
+
+admission_limit = registry.gauge(
+    "directory_admission_limit", "Current adaptive concurrency limit"
+)
+admission_in_flight = registry.gauge(
+    "directory_admission_in_flight", "Admitted directory requests in progress"
+)
+admission_pool_wait = registry.gauge(
+    "directory_admission_pool_wait_seconds",
+    "Smoothed database pool checkout wait",
+)
+admission_rejected = registry.counter(
+    "directory_admission_rejected_total",
+    "Requests shed with 503 by admission control",
+    ["request_class"],
+)
+
+
+class RequestClass(StrEnum):
+    CHEAP = "cheap"
+    EXPENSIVE = "expensive"
+
+
+# Query parameters that turn an organization listing into a geo or name search.
+EXPENSIVE_ORGANIZATION_PARAMS = frozenset({"name", "radius", "min_lat"})
+
+
+def classify_request(request: Request) -> RequestClass:
+    """Detail lookups and plain pages are cheap, searches and bulk writes are not"""
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+
+    if path.endswith("/organization/bulk"):
+        return RequestClass.EXPENSIVE
+    if path.endswith("/organization") and not EXPENSIVE_ORGANIZATION_PARAMS.isdisjoint(
+        request.query_params
+    ):
+        return RequestClass.EXPENSIVE
+    return RequestClass.CHEAP
+
+
+class AdmissionRejected(Exception):
+    pass
+
+
+class AdmissionController:
+    """AIMD concurrency limit driven by database pool checkout wait
+
+    The limit grows by about one request per limit-sized batch of requests
+    completed while it is at least half used and shrinks multiplicatively
+    while pool wait stays above the target. Expensive requests only get part
+    of the limit, so cheap lookups are still admitted when searches are shed.
+    """
+
+    # Weight of the newest pool wait sample in the moving average.
+    POOL_WAIT_SMOOTHING = 0.2
+    # Seconds without checkouts that halve the average, so an idle or
+    # recovered pool does not keep the wait of its last burst.
+    POOL_WAIT_HALF_LIFE = 1.0
+    BACKOFF_RATIO = 0.9
+    # Minimum seconds between two decreases, one slow burst shrinks limit once.
+    BACKOFF_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        initial_limit: float,
+        min_limit: float,
+        max_limit: float,
+        target_pool_wait: float,
+        expensive_share: float,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_pool_wait = target_pool_wait
+        self.expensive_share = expensive_share
+        self.limit = min(max(initial_limit, min_limit), max_limit)
+        self.in_flight = 0
+        self.pool_wait = 0.0
+        self._pool_wait_at = time.monotonic()
+        self._sampled_at = 0.0
+        self._backoff_at = 0.0
+        self._publish()
+
+    def observe_pool_wait(self, seconds: float) -> None:
+        now = time.monotonic()
+        self._decay_pool_wait(now)
+        self.pool_wait += self.POOL_WAIT_SMOOTHING * (seconds - self.pool_wait)
+        self._sampled_at = now
+
+    def _decay_pool_wait(self, now: float) -> None:
+        elapsed = now - self._pool_wait_at
+        self.pool_wait *= 0.5 ** (elapsed / self.POOL_WAIT_HALF_LIFE)
+        self._pool_wait_at = now
+
+    def acquire(self, request_class: RequestClass) -> None:
+        capacity = self.limit
+        if request_class is RequestClass.EXPENSIVE:
+            capacity = max(1.0, self.limit * self.expensive_share)
+
+        if self.in_flight >= capacity:
+            admission_rejected.inc(request_class=request_class.value)
+            raise AdmissionRejected()
+
+        self.in_flight += 1
+        self._publish()
+
+    def release(self) -> None:
+        # Limit is only worth growing while at least half of it is in use.
+        saturated = self.in_flight * 2 >= self.limit
+        self.in_flight -= 1
+
+        now = time.monotonic()
+        self._decay_pool_wait(now)
+        if self.pool_wait > self.target_pool_wait:
+            # Only a checkout seen since the last decrease is fresh evidence
+            # that the pool is still congested.
+            if (
+                self._sampled_at > self._backoff_at
+                and now - self._backoff_at >= self.BACKOFF_INTERVAL
+            ):
+                self.limit = max(self.min_limit, self.limit * self.BACKOFF_RATIO)
+                self._backoff_at = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._publish()
+
+    def _publish(self) -> None:
+        admission_limit.set(self.limit)
+        admission_in_flight.set(self.in_flight)
+        admission_pool_wait.set(self.pool_wait)
+
+
+def create_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+        min_limit=settings.ADMISSION_MIN_LIMIT,
+        max_limit=settings.ADMISSION_MAX_LIMIT,
+        target_pool_wait=settings.ADMISSION_TARGET_POOL_WAIT,
+        expensive_share=settings.ADMISSION_EXPENSIVE_SHARE,
+    )
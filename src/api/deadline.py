@@ -0,0 +1,120 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import Header, Request, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.database import StatementTimeoutError, deadline
+from src.metrics import registry
+
+statement_timeouts = registry.counter(
+    "directory_statement_timeouts_total",
+    "Requests answered with 504 because a statement hit its timeout",
+    ["endpoint"],
+)
+requests_cancelled = registry.counter(
+    "directory_requests_cancelled_total",
+    "Requests cancelled because the client disconnected",
+    ["endpoint"],
+)
+
+
+def _endpoint_name(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "name", None) or "unknown"
+
+
+async def apply_request_deadline(
+    request: Request,
+    x_request_timeout_ms: Annotated[
+        int | None,
+        Header(ge=1, description="Client deadline, can only shorten server budget"),
+    ] = None,
+) -> AsyncIterator[None]:
+    endpoint = _endpoint_name(request.scope)
+    budget_ms = settings.STATEMENT_TIMEOUTS_MS.get(
+        endpoint, settings.STATEMENT_TIMEOUT_DEFAULT_MS
+    )
+    if x_request_timeout_ms is not None:
+        budget_ms = min(budget_ms, x_request_timeout_ms)
+
+    with deadline(budget_ms / 1000):
+        yield
+
+
+async def statement_timeout_handler(
+    request: Request, exc: StatementTimeoutError
+) -> JSONResponse:
+    statement_timeouts.inc(endpoint=_endpoint_name(request.scope))
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": str(exc)},
+    )
+
+
+class CancelOnDisconnectMiddleware:
+    """Cancel bodyless HTTP requests, and their queries, once the client is gone"""
+
+    METHODS = frozenset({"GET", "HEAD"})
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        # Request without body is read up front, afterwards receive() can only
+        # report the disconnect.
+        request_message = await receive()
+        if request_message["type"] == "http.disconnect":
+            return
+
+        disconnected = asyncio.Event()
+        response_complete = False
+
+        async def app_receive() -> Message:
+            nonlocal request_message
+            if request_message is not None:
+                message, request_message = request_message, None
+                return message
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def app_send(message: Message) -> None:
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                # Servers report disconnect once response is sent, that is not
+                # a reason to cancel the rest of the request.
+                response_complete = True
+            await send(message)
+
+        async def watch_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        app_task = asyncio.ensure_future(self.app(scope, app_receive, app_send))
+        watch_task = asyncio.ensure_future(watch_disconnect())
+        try:
+            await asyncio.wait(
+                {app_task, watch_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            watch_task.cancel()
+            if not app_task.done() and not response_complete:
+                if disconnected.is_set():
+                    requests_cancelled.inc(endpoint=_endpoint_name(scope))
+                app_task.cancel()
+
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                raise
@@ -0,0 +1,24 @@
+from fastapi import Response, status
+
+
+def _opaque_tag(entity_tag: str) -> str:
+    entity_tag = entity_tag.strip()
+    if entity_tag.startswith("W/"):
+        return entity_tag[2:]
+    return entity_tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of If-None-Match header against current ETag"""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == current for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
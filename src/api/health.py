@@ -0,0 +1,40 @@
+from dishka import FromDishka
+from dishka.integrations.fastapi import DishkaRoute
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRouter
+
+from src.repository.directory import DirectoryRepositoryProtocol
+from src.startup import WARM_UP_ERRORS, try_warm_up
+
+router = APIRouter(prefix="/health", route_class=DishkaRoute, tags=["health"])
+
+
+@router.get("/live")
+async def live():
+    """Process is running and its event loop responds"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(
+    request: Request,
+    directory_repository: FromDishka[DirectoryRepositoryProtocol],
+):
+    """Worker finished warm-up and every directory database is reachable"""
+    if not getattr(request.app.state, "ready", False) and not await try_warm_up(
+        request.app
+    ):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up"},
+        )
+
+    try:
+        await directory_repository.check_connection()
+    except WARM_UP_ERRORS:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "database_unavailable"},
+        )
+    return {"status": "ok"}
@@ -0,0 +1,14 @@
+from fastapi import Depends
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRouter
+
+from src.api.security import verify_api_key
+from src.metrics import registry
+
+router = APIRouter(dependencies=[Depends(verify_api_key)])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Get process metrics in Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
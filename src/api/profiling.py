@@ -0,0 +1,51 @@
+import asyncio
+import hmac
+import random
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import settings
+from src.metrics import registry
+from src.profiling import ProfileStorage, SamplingProfiler, current_profile
+
+PROFILE_HEADER = "x-profile-request"
+
+profiled_requests = registry.counter(
+    "directory_profiled_requests_total", "Requests recorded by sampling profiler"
+)
+
+
+def profile_storage() -> ProfileStorage:
+    return ProfileStorage(
+        settings.PROFILING_OUTPUT_DIR, max_profiles=settings.PROFILING_MAX_PROFILES
+    )
+
+
+class ProfilingMiddleware:
+    """Profile sampled requests and requests with admin X-Profile-Request header"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.profiler = SamplingProfiler(interval=settings.PROFILING_INTERVAL)
+
+    def _should_profile(self, scope: Scope) -> bool:
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        if token and settings.ADMIN_API_KEY:
+            return hmac.compare_digest(token, settings.ADMIN_API_KEY)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.start(f"{scope['method']} {scope['path']}")
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_profile.reset(token)
+            self.profiler.stop(profile)
+            profiled_requests.inc()
+            await asyncio.to_thread(profile_storage().save, profile)
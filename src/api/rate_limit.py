@@ -0,0 +1,156 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Protocol
+
+from src.config import ApiKeySettings, settings
+from src.metrics import registry
+from src.private_files import open_private
+
+api_key_throttled = registry.counter(
+    "directory_api_key_throttled_total",
+    "Requests rejected with 429 by per-key limits",
+    ["api_key", "reason"],
+)
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBuckets(Protocol):
+    def take(self, name: str, rate: float, burst: int) -> float:
+        """Take one token, return 0 on success or seconds until next token"""
+        ...
+
+
+def _refill(
+    tokens: float, updated_at: float, now: float, rate: float, burst: int
+) -> float:
+    return min(float(burst), tokens + max(0.0, now - updated_at) * rate)
+
+
+class LocalTokenBuckets:
+    """Token buckets of the current process"""
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def take(self, name: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(name, (float(burst), now))
+        tokens = _refill(tokens, updated_at, now, rate, burst)
+
+        if tokens >= 1:
+            self._buckets[name] = (tokens - 1, now)
+            return 0.0
+
+        self._buckets[name] = (tokens, now)
+        return (1 - tokens) / rate
+
+
+class SharedTokenBuckets:
+    """Token buckets shared by all workers on the host through a mmap'ed file"""
+
+    # Key name digest, tokens, refill timestamp.
+    SLOT = struct.Struct("<16sdd")
+
+    def __init__(self, path: Path, names: Sequence[str]) -> None:
+        self._slots = {name: index for index, name in enumerate(names)}
+        size = max(1, len(names)) * self.SLOT.size
+
+        self._fd = open_private(path)
+        with self._locked():
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def take(self, name: str, rate: float, burst: int) -> float:
+        offset = self._slots[name] * self.SLOT.size
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=16).digest()
+
+        with self._locked():
+            # CLOCK_MONOTONIC is system-wide, so timestamps are comparable
+            # between worker processes.
+            now = time.monotonic()
+            stored_digest, tokens, updated_at = self.SLOT.unpack_from(self._map, offset)
+            if stored_digest != digest:
+                # Slot is new or belonged to another key in old configuration.
+                tokens, updated_at = float(burst), now
+            tokens = _refill(tokens, updated_at, now, rate, burst)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self.SLOT.pack_into(self._map, offset, digest, tokens, now)
+
+        return wait
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+class RateLimiter:
+    """Per-key requests-per-second and concurrent request limits"""
+
+    def __init__(self, buckets: TokenBuckets, concurrency_share: int = 1) -> None:
+        self._buckets = buckets
+        # Concurrency limit is split between workers that share the buckets.
+        self._concurrency_share = max(1, concurrency_share)
+        self._in_flight: dict[str, int] = {}
+
+    def acquire(self, api_key: ApiKeySettings) -> None:
+        in_flight = self._in_flight.get(api_key.name, 0)
+        if api_key.max_concurrent is not None:
+            limit = math.ceil(api_key.max_concurrent / self._concurrency_share)
+            if in_flight >= limit:
+                api_key_throttled.inc(api_key=api_key.name, reason="concurrency")
+                raise RateLimitExceeded("concurrency", retry_after=1.0)
+
+        if api_key.requests_per_second is not None:
+            rate = api_key.requests_per_second
+            burst = api_key.burst or max(1, math.ceil(rate))
+            wait = self._buckets.take(api_key.name, rate, burst)
+            if wait > 0:
+                api_key_throttled.inc(api_key=api_key.name, reason="rate")
+                raise RateLimitExceeded("rate", retry_after=wait)
+
+        self._in_flight[api_key.name] = in_flight + 1
+
+    def release(self, api_key: ApiKeySettings) -> None:
+        in_flight = self._in_flight.get(api_key.name, 0) - 1
+        if in_flight > 0:
+            self._in_flight[api_key.name] = in_flight
+        else:
+            self._in_flight.pop(api_key.name, None)
+
+
+def create_rate_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_BACKEND == "shared":
+        names = [api_key.name for api_key in settings.api_keys()]
+        return RateLimiter(
+            SharedTokenBuckets(settings.RATE_LIMIT_SHARED_PATH, names),
+            concurrency_share=settings.APP_WORKERS,
+        )
+    return RateLimiter(LocalTokenBuckets())
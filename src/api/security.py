@@ -1,9 +1,17 @@
 import hmac
+import math
+from collections.abc import AsyncIterator
 
-from fastapi import HTTPException, Security, status
+from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from src.config import settings
+from src.api.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    classify_request,
+)
+from src.api.rate_limit import RateLimiter, RateLimitExceeded
+from src.config import ApiKeySettings, settings
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -19,9 +27,18 @@ def _extract_token(authorization: str) -> str:
     return value
 
 
+def _find_api_key(token: str) -> ApiKeySettings | None:
+    found = None
+    # Compare with every key so response time does not depend on match position.
+    for api_key in settings.api_keys():
+        if hmac.compare_digest(token, api_key.key):
+            found = api_key
+    return found
+
+
 async def verify_api_key(
     credentials: HTTPAuthorizationCredentials | None = Security(bearer_scheme),
-) -> None:
+) -> ApiKeySettings:
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,8 +46,77 @@ async def verify_api_key(
         )
 
     token = credentials.credentials
-    if not token or not hmac.compare_digest(token, settings.API_KEY):
+    api_key = _find_api_key(token) if token else None
+    if api_key is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
         )
+
+    return api_key
+
+
+async def verify_write_api_key(
+    api_key: ApiKeySettings = Depends(verify_api_key),
+) -> ApiKeySettings:
+    if not api_key.can_write:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API key is not allowed to write",
+        )
+
+    return api_key
+
+
+async def verify_admin_api_key(
+    credentials: HTTPAuthorizationCredentials | None = Security(bearer_scheme),
+) -> None:
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled",
+        )
+
+    token = credentials.credentials if credentials is not None else ""
+    if not token or not hmac.compare_digest(token, settings.ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin API key",
+        )
+
+
+async def enforce_api_key_limits(
+    request: Request,
+    api_key: ApiKeySettings = Depends(verify_api_key),
+) -> AsyncIterator[ApiKeySettings]:
+    rate_limiter = await request.state.dishka_container.get(RateLimiter)
+    try:
+        rate_limiter.acquire(api_key)
+    except RateLimitExceeded as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        ) from exc
+
+    try:
+        yield api_key
+    finally:
+        rate_limiter.release(api_key)
+
+
+async def admit_request(request: Request) -> AsyncIterator[None]:
+    admission_controller = await request.state.dishka_container.get(AdmissionController)
+    try:
+        admission_controller.acquire(classify_request(request))
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is overloaded, retry later",
+            headers={"Retry-After": "1"},
+        ) from exc
+
+    try:
+        yield
+    finally:
+        admission_controller.release()
@@ -0,0 +1,48 @@
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from dishka.integrations.fastapi import DishkaRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.tracing import format_traceparent, parse_traceparent, tracer
+
+
+class TracedRoute(DishkaRoute):
+    """Route recording dependencies, endpoint and response serialization as a span"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        span_name = f"router.{self.name}"
+
+        async def traced_handler(request: Request) -> Response:
+            with tracer.span(span_name):
+                return await handler(request)
+
+        return traced_handler
+
+
+class TracingMiddleware:
+    """Root span per request, continues trace from W3C traceparent header"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        parent = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        with tracer.span(f"{scope['method']} {scope['path']}", parent=parent) as span:
+
+            async def send_with_traceparent(message: Message) -> None:
+                if span is not None and message["type"] == "http.response.start":
+                    span.attributes["status_code"] = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers["traceparent"] = format_traceparent(span)
+                await send(message)
+
+            await self.app(scope, receive, send_with_traceparent)
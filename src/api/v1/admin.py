@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+from fastapi import Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from fastapi.routing import APIRouter
+
+from src.api.profiling import profile_storage
+from src.api.security import verify_admin_api_key
+from src.tracing import Span, tracer
+
+from .constants import API_V1_ADMIN_PREFIX
+from .schema import ProfileFileSchema, SpanSchema, TraceSummarySchema
+
+router = APIRouter(
+    prefix=API_V1_ADMIN_PREFIX,
+    tags=["admin"],
+    dependencies=[Depends(verify_admin_api_key)],
+)
+
+
+@router.get("/profiles", response_model=list[ProfileFileSchema])
+async def get_profiles():
+    """List recorded request profiles, newest first"""
+    profiles = []
+    for path in profile_storage().list():
+        stat = path.stat()
+        profiles.append(
+            ProfileFileSchema(
+                name=path.name,
+                size=stat.st_size,
+                created_at=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            )
+        )
+    return profiles
+
+
+@router.get("/profiles/{name}", response_class=FileResponse)
+async def get_profile(name: str):
+    """Download collapsed stacks or speedscope profile"""
+    path = profile_storage().get(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    media_type = "application/json" if name.endswith(".json") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=name)
+
+
+@router.get("/traces", response_model=list[TraceSummarySchema])
+async def get_traces(limit: int = Query(default=50, ge=1, le=1000)):
+    """List latest traces kept in the in-memory span buffer, newest first"""
+    traces: dict[int, list[Span]] = {}
+    for span in tracer.recent_spans():
+        traces.setdefault(span.trace_id, []).append(span)
+
+    summaries = []
+    for spans in traces.values():
+        span_ids = {span.span_id for span in spans}
+        # Local root, its parent (if any) lives in the calling service.
+        root = next(span for span in spans if span.parent_id not in span_ids)
+        root_schema = SpanSchema.from_dto(root)
+        summaries.append(
+            TraceSummarySchema(
+                trace_id=root_schema.trace_id,
+                name=root.name,
+                started_at=root_schema.started_at,
+                duration_ms=root_schema.duration_ms,
+                span_count=len(spans),
+            )
+        )
+    summaries.sort(key=lambda summary: summary.started_at, reverse=True)
+    return summaries[:limit]
+
+
+@router.get("/traces/{trace_id}", response_model=list[SpanSchema])
+async def get_trace(trace_id: str):
+    """Spans of one trace ordered by start time"""
+    try:
+        trace_id_value = int(trace_id, 16)
+    except ValueError:
+        trace_id_value = None
+
+    spans = [span for span in tracer.recent_spans() if span.trace_id == trace_id_value]
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+
+    spans.sort(key=lambda span: span.start_time_ns)
+    return [SpanSchema.from_dto(span) for span in spans]
@@ -1 +1,2 @@
 API_V1_DIRECTORY_PREFIX = "/api/v1/directory"
+API_V1_ADMIN_PREFIX = "/api/v1/admin"
@@ -2,49 +2,120 @@ from typing import Annotated
 from uuid import UUID
 
 from dishka import FromDishka
-from dishka.integrations.fastapi import DishkaRoute
-from fastapi import Depends, HTTPException, Query
+from fastapi import Depends, Header, HTTPException, Query, Response
 from fastapi.routing import APIRouter
 
-from src.api.security import verify_api_key
+from src.api.deadline import apply_request_deadline
+from src.api.etag import etag_matches, not_modified
+from src.api.security import (
+    admit_request,
+    enforce_api_key_limits,
+    verify_write_api_key,
+)
+from src.api.tracing import TracedRoute
 from src.dto import Organization
-from src.service import DirectoryServiceProtocol
+from src.service import (
+    ACTIVITY_TREE_TABLES,
+    BUILDING_LIST_TABLES,
+    ORGANIZATION_DETAIL_TABLES,
+    DataVersionTracker,
+    DirectoryServiceProtocol,
+    organization_list_tables,
+)
+from src.tracing import tracer
 
 from .constants import API_V1_DIRECTORY_PREFIX
 from .schema import (
+    ActivityListSchema,
+    ActivityQueryParams,
+    ActivityTreeSchema,
     BuildingPageSchema,
     BuildingQueryParams,
+    ChangePageSchema,
+    ChangeQueryParams,
+    OrganizationBulkUpsertSchema,
     OrganizationFullSchema,
     OrganizationPageSchema,
     OrganizationQueryParams,
+    OrganizationSyncResultSchema,
 )
 
 router = APIRouter(
     prefix=API_V1_DIRECTORY_PREFIX,
-    route_class=DishkaRoute,
-    dependencies=[Depends(verify_api_key)],
+    route_class=TracedRoute,
+    dependencies=[
+        Depends(enforce_api_key_limits),
+        Depends(admit_request),
+        Depends(apply_request_deadline),
+    ],
 )
 
 
-@router.get("/organization", response_model=OrganizationPageSchema)
+@router.get(
+    "/organization",
+    response_model=OrganizationPageSchema,
+    response_model_exclude_unset=True,
+)
 async def get_organizations(
     params: Annotated[OrganizationQueryParams, Query()],
+    response: Response,
     directory_service: FromDishka[DirectoryServiceProtocol],
+    data_versions: FromDishka[DataVersionTracker],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     """Get organizations"""
+    filter = params.to_dto()
+    # Snapshot pages belong to a session that expires, so they get no ETag.
+    etag = None
+    if not filter.snapshot:
+        etag = await data_versions.etag(
+            "organizations", filter.model_dump_json(), organization_list_tables(filter)
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     try:
-        organizations = await directory_service.get_organizations(params.to_dto())
+        organizations = await directory_service.get_organizations(filter)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return OrganizationPageSchema.from_dto(organizations)
+    if etag is not None:
+        response.headers["ETag"] = etag
+    with tracer.span("serialize"):
+        return OrganizationPageSchema.from_dto(organizations, filter.expand)
+
+
+@router.put(
+    "/organization/bulk",
+    response_model=OrganizationSyncResultSchema,
+    dependencies=[Depends(verify_write_api_key)],
+)
+async def sync_organizations(
+    payload: OrganizationBulkUpsertSchema,
+    directory_service: FromDishka[DirectoryServiceProtocol],
+):
+    """Insert or update organizations batch, unchanged organizations are skipped"""
+    try:
+        result = await directory_service.sync_organizations(payload.to_dto())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return OrganizationSyncResultSchema.from_dto(result)
 
 
 @router.get("/organization/{organization_uuid}", response_model=OrganizationFullSchema)
 async def get_organization(
     organization_uuid: UUID,
+    response: Response,
     directory_service: FromDishka[DirectoryServiceProtocol],
+    data_versions: FromDishka[DataVersionTracker],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     """Get organization by uuid"""
+    etag = await data_versions.etag(
+        "organization", str(organization_uuid), ORGANIZATION_DETAIL_TABLES
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     organization: Organization | None = await directory_service.get_organization(
         organization_uuid
     )
@@ -52,17 +123,84 @@ async def get_organization(
     if organization is None:
         raise HTTPException(status_code=404, detail="Organization not found")
 
-    return OrganizationFullSchema.from_dto(organization)
+    response.headers["ETag"] = etag
+    with tracer.span("serialize"):
+        return OrganizationFullSchema.from_dto(organization)
 
 
 @router.get("/building", response_model=BuildingPageSchema)
 async def get_buildings(
     params: Annotated[BuildingQueryParams, Query()],
+    response: Response,
     directory_service: FromDishka[DirectoryServiceProtocol],
+    data_versions: FromDishka[DataVersionTracker],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     """Get buildings"""
+    filter = params.to_dto()
+    etag = await data_versions.etag(
+        "buildings", filter.model_dump_json(), BUILDING_LIST_TABLES
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        buildings = await directory_service.get_buildings(filter)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    response.headers["ETag"] = etag
+    with tracer.span("serialize"):
+        return BuildingPageSchema.from_dto(buildings)
+
+
+@router.get("/changes", response_model=ChangePageSchema)
+async def get_changes(
+    params: Annotated[ChangeQueryParams, Query()],
+    directory_service: FromDishka[DirectoryServiceProtocol],
+):
+    """Get directory changes since token"""
     try:
-        buildings = await directory_service.get_buildings(params.to_dto())
+        changes = await directory_service.get_changes(params.to_dto())
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return BuildingPageSchema.from_dto(buildings)
+    with tracer.span("serialize"):
+        return ChangePageSchema.from_dto(changes)
+
+
+@router.get("/activity/tree", response_model=ActivityTreeSchema)
+async def get_activity_tree(
+    response: Response,
+    directory_service: FromDishka[DirectoryServiceProtocol],
+    data_versions: FromDishka[DataVersionTracker],
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Get activity hierarchy with organization counts"""
+    etag = await data_versions.etag("activity_tree", "", ACTIVITY_TREE_TABLES)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    tree = await directory_service.get_activity_tree()
+    response.headers["ETag"] = etag
+    with tracer.span("serialize"):
+        return ActivityTreeSchema.from_dto(tree)
+
+
+@router.get("/activity", response_model=ActivityListSchema)
+async def get_activities(
+    params: Annotated[ActivityQueryParams, Query()],
+    response: Response,
+    directory_service: FromDishka[DirectoryServiceProtocol],
+    data_versions: FromDishka[DataVersionTracker],
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Find activities by name"""
+    etag = await data_versions.etag(
+        "activities", params.model_dump_json(), ACTIVITY_TREE_TABLES
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    activities = await directory_service.find_activities(params.name)
+    response.headers["ETag"] = etag
+    with tracer.span("serialize"):
+        return ActivityListSchema.from_dto(activities)
@@ -1,19 +1,32 @@
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Annotated, Any
 from uuid import UUID
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from src.dto import (
+    ActivityMatch,
+    ActivityTreeNode,
     Building,
     BuildingFilter,
+    BuildingSort,
+    ChangeFilter,
+    DirectoryChangePage,
     Organization,
     OrganizationActivityFilter,
+    OrganizationExpand,
     OrganizationFilter,
+    OrganizationSort,
+    OrganizationSyncResult,
+    OrganizationUpsert,
     PaginatedBuildings,
     PaginatedOrganizations,
     PaginationParams,
     WithinBoundingBoxFilter,
     WithinRadiusFilter,
 )
+from src.tracing import Span, format_span_id, format_trace_id
 
 
 class OrganizationPhoneNumberSchema(BaseModel):
@@ -88,9 +101,31 @@ class OrganizationSchema(BaseModel):
     building: BuildingSchema | None = Field(
         description="Building associated with the organization"
     )
+    phone_numbers: list[OrganizationPhoneNumberSchema] | None = Field(
+        default=None, description="Phone numbers, present with expand=phones"
+    )
+    activities: list[ActivitySchema] | None = Field(
+        default=None, description="Activities, present with expand=activities"
+    )
 
     @classmethod
-    def from_dto(cls, dto: Organization) -> "OrganizationSchema":
+    def from_dto(
+        cls, dto: Organization, expand: Sequence[OrganizationExpand] = ()
+    ) -> "OrganizationSchema":
+        # Relations are only set when expanded, so they stay out of the response
+        # (the route excludes unset fields).
+        relations = {}
+        if OrganizationExpand.PHONES in expand:
+            relations["phone_numbers"] = [
+                OrganizationPhoneNumberSchema(number=phone_number.number)
+                for phone_number in dto.phone_numbers
+            ]
+        if OrganizationExpand.ACTIVITIES in expand:
+            relations["activities"] = [
+                ActivitySchema(uuid=activity.uuid, name=activity.name)
+                for activity in dto.activities
+            ]
+
         return cls(
             uuid=dto.uuid,
             name=dto.name,
@@ -102,6 +137,7 @@ class OrganizationSchema(BaseModel):
             )
             if dto.building
             else None,
+            **relations,
         )
 
 
@@ -112,9 +148,11 @@ class OrganizationPageSchema(BaseModel):
     )
 
     @classmethod
-    def from_dto(cls, dto: PaginatedOrganizations) -> "OrganizationPageSchema":
+    def from_dto(
+        cls, dto: PaginatedOrganizations, expand: Sequence[OrganizationExpand] = ()
+    ) -> "OrganizationPageSchema":
         return cls(
-            items=[OrganizationSchema.from_dto(org) for org in dto.items],
+            items=[OrganizationSchema.from_dto(org, expand) for org in dto.items],
             next_cursor=dto.next_cursor,
         )
 
@@ -133,18 +171,85 @@ class BuildingPageSchema(BaseModel):
         )
 
 
-class OrganizationQueryParams(BaseModel):
-    building_uuid: UUID | None = Field(
-        default=None,
-        description="Filter organizations by building UUID",
+class ActivityNodeSchema(BaseModel):
+    uuid: UUID = Field(description="Unique identifier for the activity")
+    name: str = Field(description="Name of the activity")
+    parent_uuid: UUID | None = Field(description="UUID of the parent activity")
+    organization_count: int = Field(
+        description="Organizations linked to this activity directly"
     )
-    activity_uuid: UUID | None = Field(
+    subtree_organization_count: int = Field(
+        description="Distinct organizations linked to this activity or its descendants"
+    )
+
+    @classmethod
+    def from_dto(cls, dto: ActivityTreeNode) -> "ActivityNodeSchema":
+        return cls(
+            uuid=dto.uuid,
+            name=dto.name,
+            parent_uuid=dto.parent_uuid,
+            organization_count=dto.organization_count,
+            subtree_organization_count=dto.subtree_organization_count,
+        )
+
+
+class ActivityTreeNodeSchema(ActivityNodeSchema):
+    children: list["ActivityTreeNodeSchema"] = Field(description="Child activities")
+
+    @classmethod
+    def from_dto(cls, dto: ActivityTreeNode) -> "ActivityTreeNodeSchema":
+        return cls(
+            uuid=dto.uuid,
+            name=dto.name,
+            parent_uuid=dto.parent_uuid,
+            organization_count=dto.organization_count,
+            subtree_organization_count=dto.subtree_organization_count,
+            children=[cls.from_dto(child) for child in dto.children],
+        )
+
+
+class ActivityTreeSchema(BaseModel):
+    items: list[ActivityTreeNodeSchema] = Field(description="Root activities")
+
+    @classmethod
+    def from_dto(cls, dto: list[ActivityTreeNode]) -> "ActivityTreeSchema":
+        return cls(items=[ActivityTreeNodeSchema.from_dto(node) for node in dto])
+
+
+class ActivityListSchema(BaseModel):
+    items: list[ActivityNodeSchema] = Field(description="Activities sorted by name")
+
+    @classmethod
+    def from_dto(cls, dto: list[ActivityTreeNode]) -> "ActivityListSchema":
+        return cls(items=[ActivityNodeSchema.from_dto(node) for node in dto])
+
+
+class ActivityQueryParams(BaseModel):
+    name: str | None = Field(
         default=None,
-        description="Filter organizations by activity UUID",
+        min_length=1,
+        description="Filter activities by partial name match, case insensitive",
+    )
+
+
+class OrganizationQueryParams(BaseModel):
+    building_uuid: list[UUID] = Field(
+        default_factory=list,
+        max_length=100,
+        description="Filter organizations by building UUIDs (comma separated or repeated)",
+    )
+    activity_uuid: list[UUID] = Field(
+        default_factory=list,
+        max_length=100,
+        description="Filter organizations by activity UUIDs (comma separated or repeated)",
+    )
+    activity_match: ActivityMatch = Field(
+        default=ActivityMatch.ANY,
+        description="Organization needs any or all of the selected activities",
     )
     include_children: bool = Field(
         default=False,
-        description="Include organizations from child activities of the selected activity",
+        description="Include organizations from child activities of the selected activities",
     )
     radius: float | None = Field(
         default=None,
@@ -198,6 +303,34 @@ class OrganizationQueryParams(BaseModel):
         description="Cursor from the previous page (exclusive)",
     )
     limit: int = Field(default=20, ge=1, le=100, description="Page size")
+    expand: list[OrganizationExpand] = Field(
+        default_factory=list,
+        description="Comma separated relations to add to every item: phones, activities",
+    )
+    sort: OrganizationSort = Field(
+        default=OrganizationSort.CREATED_AT,
+        description="Order of the listing: created_at, name or -name (descending)",
+    )
+    snapshot: bool = Field(
+        default=False,
+        description=(
+            "Resolve the filter once and page through the stored matches; "
+            "pass it again together with the returned cursor"
+        ),
+    )
+
+    @field_validator("building_uuid", "activity_uuid", "expand", mode="before")
+    @classmethod
+    def split_comma_separated(cls, value: object) -> object:
+        # Accepts both expand=phones,activities and repeated expand params.
+        values = value if isinstance(value, list) else [value]
+        parts: list[object] = []
+        for item in values:
+            if isinstance(item, str):
+                parts.extend(part.strip() for part in item.split(",") if part.strip())
+            else:
+                parts.append(item)
+        return parts
 
     @model_validator(mode="after")
     def validate_geo_filters(self) -> "OrganizationQueryParams":
@@ -237,10 +370,12 @@ class OrganizationQueryParams(BaseModel):
 
     def to_dto(self) -> OrganizationFilter:
         return OrganizationFilter(
-            building_uuid=self.building_uuid,
+            # Lists are normalized so equal requests share cache keys and ETags.
+            building_uuids=sorted(set(self.building_uuid)),
             activity=OrganizationActivityFilter(
-                activity_uuid=self.activity_uuid,
+                activity_uuids=sorted(set(self.activity_uuid)),
                 include_children=self.include_children,
+                match=self.activity_match,
             )
             if self.activity_uuid
             else None,
@@ -270,6 +405,9 @@ class OrganizationQueryParams(BaseModel):
             else None,
             name=self.name,
             pagination=PaginationParams(cursor=self.cursor, limit=self.limit),
+            expand=sorted(set(self.expand)),
+            sort=self.sort,
+            snapshot=self.snapshot,
         )
 
 
@@ -279,8 +417,150 @@ class BuildingQueryParams(BaseModel):
         description="Cursor from the previous page (exclusive)",
     )
     limit: int = Field(default=20, ge=1, le=100, description="Page size")
+    sort: BuildingSort = Field(
+        default=BuildingSort.CREATED_AT,
+        description="Order of the listing: created_at or address",
+    )
 
     def to_dto(self) -> BuildingFilter:
         return BuildingFilter(
-            pagination=PaginationParams(cursor=self.cursor, limit=self.limit)
+            pagination=PaginationParams(cursor=self.cursor, limit=self.limit),
+            sort=self.sort,
         )
+
+
+class OrganizationUpsertSchema(BaseModel):
+    uuid: UUID = Field(description="Unique identifier for the organization")
+    name: str = Field(
+        min_length=1, max_length=255, description="Name of the organization"
+    )
+    building_uuid: UUID | None = Field(
+        default=None, description="UUID of the organization building"
+    )
+    # Items are limited to the phone_number column width.
+    phone_numbers: list[Annotated[str, Field(max_length=255)]] = Field(
+        default_factory=list,
+        max_length=20,
+        description="Phone numbers of the organization",
+    )
+    activity_uuids: list[UUID] = Field(
+        default_factory=list,
+        max_length=50,
+        description="UUIDs of the organization activities",
+    )
+
+    def to_dto(self) -> OrganizationUpsert:
+        return OrganizationUpsert(
+            uuid=self.uuid,
+            name=self.name,
+            building_uuid=self.building_uuid,
+            phone_numbers=self.phone_numbers,
+            activity_uuids=self.activity_uuids,
+        )
+
+
+class OrganizationBulkUpsertSchema(BaseModel):
+    items: list[OrganizationUpsertSchema] = Field(
+        min_length=1,
+        max_length=1000,
+        description="Organizations to insert or update",
+    )
+
+    @model_validator(mode="after")
+    def validate_unique_uuids(self) -> "OrganizationBulkUpsertSchema":
+        if len({item.uuid for item in self.items}) != len(self.items):
+            raise ValueError("Organization uuids must be unique within a batch")
+        return self
+
+    def to_dto(self) -> list[OrganizationUpsert]:
+        return [item.to_dto() for item in self.items]
+
+
+class OrganizationSyncResultSchema(BaseModel):
+    inserted: int = Field(description="Number of inserted organizations")
+    updated: int = Field(description="Number of updated organizations")
+    unchanged: int = Field(description="Number of organizations left untouched")
+
+    @classmethod
+    def from_dto(cls, dto: OrganizationSyncResult) -> "OrganizationSyncResultSchema":
+        return cls(
+            inserted=dto.inserted,
+            updated=dto.updated,
+            unchanged=dto.unchanged,
+        )
+
+
+class ChangeSchema(BaseModel):
+    entity: str = Field(description="Changed entity: organization/building/activity")
+    uuid: UUID = Field(description="Unique identifier of the changed entity")
+    op: str = Field(description="Change operation: upsert/delete")
+
+
+class ChangePageSchema(BaseModel):
+    items: list[ChangeSchema] = Field(description="Compacted changes page")
+    next_token: str = Field(description="Token to fetch changes after this page")
+    has_more: bool = Field(
+        description="Whether more changes can be fetched right away with next_token"
+    )
+
+    @classmethod
+    def from_dto(cls, dto: DirectoryChangePage) -> "ChangePageSchema":
+        return cls(
+            items=[
+                ChangeSchema(entity=item.entity, uuid=item.uuid, op=item.op)
+                for item in dto.items
+            ],
+            next_token=dto.next_token,
+            has_more=dto.has_more,
+        )
+
+
+class ChangeQueryParams(BaseModel):
+    since: str | None = Field(
+        default=None,
+        description="Token from the previous changes page (start of log if omitted)",
+    )
+    limit: int = Field(default=100, ge=1, le=1000, description="Page size")
+
+    def to_dto(self) -> ChangeFilter:
+        return ChangeFilter(since=self.since, limit=self.limit)
+
+
+class ProfileFileSchema(BaseModel):
+    name: str = Field(description="File name to download the profile")
+    size: int = Field(description="File size in bytes")
+    created_at: datetime = Field(description="When the profile was written")
+
+
+class SpanSchema(BaseModel):
+    trace_id: str = Field(description="W3C trace id")
+    span_id: str = Field(description="W3C span id")
+    parent_id: str | None = Field(description="Parent span id, null for root span")
+    name: str = Field(description="Traced operation")
+    started_at: datetime = Field(description="Span start time")
+    duration_ms: float = Field(description="Span duration in milliseconds")
+    attributes: dict[str, Any] = Field(description="Operation details")
+    error: str | None = Field(description="Exception type if operation failed")
+
+    @classmethod
+    def from_dto(cls, dto: Span) -> "SpanSchema":
+        return cls(
+            trace_id=format_trace_id(dto.trace_id),
+            span_id=format_span_id(dto.span_id),
+            parent_id=None if dto.parent_id is None else format_span_id(dto.parent_id),
+            name=dto.name,
+            started_at=datetime.fromtimestamp(
+                dto.start_time_ns / 1_000_000_000, tz=timezone.utc
+            ),
+            duration_ms=dto.duration_ns / 1_000_000,
+            attributes=dto.attributes,
+            error=dto.error,
+        )
+
+
+class TraceSummarySchema(BaseModel):
+    trace_id: str = Field(description="W3C trace id")
+    name: str = Field(description="Root span name of this service")
+    started_at: datetime = Field(description="Root span start time")
+    duration_ms: float = Field(description="Root span duration in milliseconds")
+    span_count: int = Field(description="Spans recorded for the trace")
@@ -1,18 +1,45 @@
-import uvicorn
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-# from database import Database
+import uvicorn
 from dishka import make_async_container
 from dishka.integrations.fastapi import setup_dishka
 from fastapi import FastAPI
 
+from src.api.deadline import CancelOnDisconnectMiddleware, statement_timeout_handler
+from src.api.health import router as health_router
+from src.api.metrics import router as metrics_router
+from src.api.profiling import ProfilingMiddleware
+from src.api.tracing import TracingMiddleware
+from src.api.v1.admin import router as admin_router
 from src.api.v1.directory import router
 from src.config import settings
+from src.database import StatementTimeoutError
 from src.dependencies import AppProvider, DatabaseProvider
+from src.startup import try_warm_up
+from src.tracing import tracer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await try_warm_up(app)
+    yield
+    # Release pool connections before the worker exits.
+    await app.state.dishka_container.close()
+    tracer.close()
+
+
+def create_app() -> FastAPI:
+    """Application factory, every server worker builds its own container and pool"""
+    app = App.create_fastapi_app(lifespan=lifespan)
+    container = make_async_container(AppProvider(), DatabaseProvider())
+    setup_dishka(container, app)
+    return app
 
 
 class App:
     @staticmethod
-    def create_fastapi_app():
+    def create_fastapi_app(lifespan=None):
         app = FastAPI(
             title="Directory API",
             description="API for organizations, buildings, activities and directory lookup.",
@@ -20,19 +47,33 @@ class App:
             docs_url="/docs",
             redoc_url="/redoc",
             openapi_url="/openapi.json",
+            lifespan=lifespan,
         )
+        app.add_middleware(CancelOnDisconnectMiddleware)
+        app.add_middleware(ProfilingMiddleware)
+        app.add_middleware(TracingMiddleware)
+        app.add_exception_handler(StatementTimeoutError, statement_timeout_handler)
         app.include_router(router)
+        app.include_router(metrics_router)
+        app.include_router(health_router)
+        app.include_router(admin_router)
         return app
 
-    async def run_fastapi(self):
-        app = self.create_fastapi_app()
-
-        container = make_async_container(AppProvider(), DatabaseProvider())
-        setup_dishka(container, app)
-
-        config = uvicorn.Config(app, host="0.0.0.0", port=settings.APP_PORT)
-        server = uvicorn.Server(config)
-        await server.serve()
+    def run_fastapi(self):
+        # Workers share the listening socket bound by the uvicorn supervisor, which
+        # restarts dead or unresponsive workers and replaces them one by one on
+        # SIGHUP. uvloop and httptools are used when the speedups extra is installed.
+        uvicorn.run(
+            "src.app:create_app",
+            factory=True,
+            host="0.0.0.0",
+            port=settings.APP_PORT,
+            workers=settings.APP_WORKERS,
+            loop="auto",
+            http="auto",
+            timeout_worker_healthcheck=settings.APP_WORKER_HEALTHCHECK_TIMEOUT,
+            timeout_graceful_shutdown=settings.APP_GRACEFUL_SHUTDOWN_TIMEOUT,
+        )
 
-    async def start(self):
-        await self.run_fastapi()
+    def start(self):
+        self.run_fastapi()
@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from src.config import settings
+from src.database import Database
+from src.repository.directory.postgres import PostgresDirectoryRepository
+
+DEFAULT_RETENTION_DAYS = 30
+
+
+async def prune_changes(retention_days: int) -> dict[str, int]:
+    """Delete older changes on every directory database, return counts by name"""
+    before = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    # With shards the directory lives on shard databases only.
+    databases = {shard.name: str(shard.dsn) for shard in settings.DIRECTORY_SHARDS}
+    pruned = {}
+    for name, dsn in (databases or {"default": None}).items():
+        database = Database(dsn=dsn)
+        try:
+            repository = PostgresDirectoryRepository(database)
+            pruned[name] = await repository.prune_changes(before)
+        finally:
+            await database.dispose()
+    return pruned
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Delete directory change log entries older than the retention. "
+            "Change tokens older than the pruned entries expire."
+        )
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=DEFAULT_RETENTION_DAYS,
+        help="Days of changes to keep.",
+    )
+    args = parser.parse_args()
+    if args.retention_days < 0:
+        parser.error("--retention-days must not be negative")
+
+    pruned = asyncio.run(prune_changes(args.retention_days))
+    for name, count in pruned.items():
+        print(f"{name}: pruned {count} changes.")
+
+
+if __name__ == "__main__":
+    main()
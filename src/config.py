@@ -1,20 +1,96 @@
-from pydantic import PostgresDsn, computed_field
+import os
+import tempfile
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, Field, PostgresDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Directory private to the user running the app, created on first use.
+PRIVATE_DIR = Path(tempfile.gettempdir()) / f"directory-{os.geteuid()}"
+
+
+class ApiKeySettings(BaseModel):
+    name: str = Field(description="Client name used in metrics and logs")
+    key: str = Field(min_length=1, description="Bearer token of the client")
+    requests_per_second: float | None = Field(
+        default=None, gt=0, description="Sustained request rate, unlimited if unset"
+    )
+    burst: int | None = Field(
+        default=None, ge=1, description="Token bucket size, defaults to one second"
+    )
+    max_concurrent: int | None = Field(
+        default=None, ge=1, description="Requests in progress, unlimited if unset"
+    )
+    can_write: bool = Field(
+        default=False, description="Allows write endpoints such as bulk sync"
+    )
+
+
+class ShardSettings(BaseModel):
+    name: str = Field(description="Shard name used in metrics and change tokens")
+    dsn: PostgresDsn = Field(description="SQLAlchemy asyncpg DSN of the shard")
+    min_lat: float = Field(ge=-90, le=90, description="Region minimum latitude")
+    max_lat: float = Field(ge=-90, le=90, description="Region maximum latitude")
+    min_long: float = Field(ge=-180, le=180, description="Region minimum longitude")
+    max_long: float = Field(ge=-180, le=180, description="Region maximum longitude")
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env")
 
     APP_PORT: int = 8000
+    APP_WORKERS: int = 1
+    APP_WORKER_HEALTHCHECK_TIMEOUT: float = 5.0
+    APP_GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
     API_KEY: str = "dev-static-api-key"
+    API_KEYS: list[ApiKeySettings] = []
+    ADMIN_API_KEY: str | None = None
+    RATE_LIMIT_BACKEND: Literal["local", "shared"] = "local"
+    RATE_LIMIT_SHARED_PATH: Path = PRIVATE_DIR / "rate-limit"
     POSTGRES_USER: str = "directory"
     POSTGRES_PASSWORD: str = "directory"
     POSTGRES_DB: str = "directory"
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
     DATABASE_POOL_SIZE: int = 10
+    DATABASE_POOL_MAX_OVERFLOW: int = 10
+    DATABASE_MAX_CONNECTIONS: int = 80
     DATABASE_POOL_TTL: int = 300
     DATABASE_POOL_PRE_PING: int = 10
+    DATA_VERSION_CACHE_TTL: float = 1.0
+    STATEMENT_TIMEOUT_DEFAULT_MS: int = 5000
+    STATEMENT_TIMEOUTS_MS: dict[str, int] = {
+        "get_organizations": 3000,
+        "get_organization": 500,
+        "get_buildings": 1000,
+        "get_changes": 2000,
+        "sync_organizations": 30000,
+    }
+    PROFILING_SAMPLE_RATE: float = Field(default=0.0, ge=0, le=1)
+    PROFILING_INTERVAL: float = 0.005
+    PROFILING_OUTPUT_DIR: Path = PRIVATE_DIR / "profiles"
+    PROFILING_MAX_PROFILES: int = 100
+    PREFETCH_ENABLED: bool = False
+    PREFETCH_TTL: float = 5.0
+    PREFETCH_MAX_PAGES: int = 1000
+    PREFETCH_MAX_IN_FLIGHT: int = 4
+    PAGINATION_SESSION_TTL: float = 300.0
+    PAGINATION_SESSION_MAX_ROWS: int = 100_000
+    CACHE_BACKEND: Literal["none", "local", "shared"] = "none"
+    CACHE_MAX_ENTRIES: int = 4096
+    CACHE_SHARED_PATH: Path = PRIVATE_DIR / "cache"
+    CACHE_SHARED_SIZE_MB: int = 64
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: Literal["memory", "file"] = "memory"
+    TRACING_BUFFER_SIZE: int = 10000
+    TRACING_FILE_PATH: Path = PRIVATE_DIR / "spans.jsonl"
+    ADMISSION_INITIAL_LIMIT: int = 20
+    ADMISSION_MIN_LIMIT: int = 2
+    ADMISSION_MAX_LIMIT: int = 200
+    ADMISSION_TARGET_POOL_WAIT: float = 0.05
+    ADMISSION_EXPENSIVE_SHARE: float = 0.5
+    DIRECTORY_SHARDS: list[ShardSettings] = []
 
     @computed_field
     @property
@@ -28,5 +104,20 @@ class Settings(BaseSettings):
             path=f"{self.POSTGRES_DB}",
         )
 
+    def api_keys(self) -> list[ApiKeySettings]:
+        """Configured API keys, static API_KEY is kept as unlimited default client"""
+        api_keys = list(self.API_KEYS)
+        if self.API_KEY and all(api_key.key != self.API_KEY for api_key in api_keys):
+            api_keys.append(ApiKeySettings(name="default", key=self.API_KEY))
+        return api_keys
+
+    def worker_pool_limits(self) -> tuple[int, int]:
+        """Pool size and overflow of one worker within DATABASE_MAX_CONNECTIONS"""
+        # One extra worker runs next to the old ones during a rolling restart.
+        budget = max(1, self.DATABASE_MAX_CONNECTIONS // (max(1, self.APP_WORKERS) + 1))
+        pool_size = min(self.DATABASE_POOL_SIZE, budget)
+        max_overflow = min(self.DATABASE_POOL_MAX_OVERFLOW, budget - pool_size)
+        return pool_size, max_overflow
+
 
 settings = Settings()
@@ -1,18 +1,25 @@
-from collections.abc import Awaitable, Callable
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from typing import AsyncGenerator, Sequence, TypeVar
 
 from sqlalchemy import (
     CursorResult,
+    Delete,
     Insert,
     RowMapping,
     Select,
     Update,
     text,
 )
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from src.config import settings
+from src.tracing import tracer
 
 
 class Base(DeclarativeBase):
@@ -21,12 +28,49 @@ class Base(DeclarativeBase):
 
 T = TypeVar("T")
 
+# PostgreSQL query_canceled, raised when statement_timeout fires.
+QUERY_CANCELED_SQLSTATE = "57014"
+
+# Share of the remaining budget statement_timeout is set below it, a pooled
+# connection keeps its timeout while that is at most twice this share shorter.
+STATEMENT_TIMEOUT_REUSE_SLACK = 0.05
+STATEMENT_TIMEOUT_INFO_KEY = "statement_timeout_ms"
+
+statement_deadline: ContextVar[float | None] = ContextVar(
+    "statement_deadline", default=None
+)
+
+
+class StatementTimeoutError(Exception):
+    pass
+
+
+@contextmanager
+def deadline(timeout: float) -> Iterator[None]:
+    """Bound statements executed in this context to timeout seconds from now"""
+    token = statement_deadline.set(time.monotonic() + timeout)
+    try:
+        yield
+    finally:
+        statement_deadline.reset(token)
+
+
+def _is_query_canceled(exc: DBAPIError) -> bool:
+    sqlstate = getattr(exc.orig, "sqlstate", None) or getattr(
+        exc.orig.__cause__, "sqlstate", None
+    )
+    return sqlstate == QUERY_CANCELED_SQLSTATE
+
 
 class Database:
     def __init__(self, dsn: str | None = None) -> None:
+        pool_size, max_overflow = settings.worker_pool_limits()
+        self.pool_size = pool_size
+        self._checkout_wait_listeners: list[Callable[[float], None]] = []
         self.engine = create_async_engine(
             dsn or str(settings.POSTGRES_DSN),
-            pool_size=settings.DATABASE_POOL_SIZE,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
             pool_recycle=settings.DATABASE_POOL_TTL,
             pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
         )
@@ -59,7 +103,7 @@ class Database:
 
     async def execute(
         self,
-        query: Insert | Update,
+        query: Insert | Update | Delete,
         connection: AsyncConnection | None = None,
         commit_after: bool = False,
     ) -> None:
@@ -76,9 +120,28 @@ class Database:
         if connection is not None:
             return await operation(connection)
 
-        async with self.engine.connect() as new_connection:
+        async with self._connect() as new_connection:
+            await self._apply_statement_timeout(new_connection)
             return await operation(new_connection)
 
+    def add_checkout_wait_listener(self, listener: Callable[[float], None]) -> None:
+        """Call listener with seconds spent waiting for a pool connection"""
+        self._checkout_wait_listeners.append(listener)
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[AsyncConnection]:
+        started_at = time.perf_counter()
+        with tracer.span("db.pool_checkout"):
+            connection = await self.engine.connect()
+        waited = time.perf_counter() - started_at
+        for listener in self._checkout_wait_listeners:
+            listener(waited)
+        try:
+            yield connection
+        finally:
+            # Same as AsyncConnection.__aexit__, cancellation must not leak it.
+            await asyncio.shield(connection.close())
+
     async def _fetch_one_with_connection(
         self,
         select_query: Select | Insert | Update,
@@ -99,7 +162,7 @@ class Database:
 
     async def _execute_with_connection(
         self,
-        query: Insert | Update,
+        query: Insert | Update | Delete,
         connection: AsyncConnection,
         commit_after: bool,
     ) -> None:
@@ -107,24 +170,140 @@ class Database:
 
     async def _execute_query(
         self,
-        query: Select | Insert | Update,
+        query: Select | Insert | Update | Delete,
         connection: AsyncConnection,
         commit_after: bool = False,
     ) -> CursorResult:
-        result = await connection.execute(query)
+        try:
+            with tracer.span("db.execute", statement=type(query).__name__):
+                result = await connection.execute(query)
+        except DBAPIError as exc:
+            if _is_query_canceled(exc):
+                raise StatementTimeoutError("Statement timeout exceeded") from exc
+            raise
 
         if commit_after:
             await connection.commit()
 
         return result
 
+    async def _apply_statement_timeout(self, connection: AsyncConnection) -> None:
+        deadline_at = statement_deadline.get()
+        applied_ms = connection.info.get(STATEMENT_TIMEOUT_INFO_KEY)
+        if deadline_at is None:
+            if applied_ms is not None:
+                await self._set_statement_timeout(connection, None)
+            return
+
+        remaining_ms = int((deadline_at - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            raise StatementTimeoutError("Statement timeout exceeded")
+
+        # Timeout is set a little below the budget, so following checkouts
+        # with a similar budget can keep it instead of paying a round trip.
+        if (
+            applied_ms is not None
+            and remaining_ms * (1 - 2 * STATEMENT_TIMEOUT_REUSE_SLACK)
+            <= applied_ms
+            <= remaining_ms
+        ):
+            return
+        await self._set_statement_timeout(
+            connection,
+            max(int(remaining_ms * (1 - STATEMENT_TIMEOUT_REUSE_SLACK)), 1),
+        )
+
+    async def _set_statement_timeout(
+        self, connection: AsyncConnection, timeout_ms: int | None
+    ) -> None:
+        # Session level and sent before the transaction begins, so rollback
+        # keeps it and later checkouts of the connection can skip the round trip.
+        value = "DEFAULT" if timeout_ms is None else str(timeout_ms)
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.execute(
+            f"SET statement_timeout = {value}"
+        )
+        if timeout_ms is None:
+            connection.info.pop(STATEMENT_TIMEOUT_INFO_KEY, None)
+        else:
+            connection.info[STATEMENT_TIMEOUT_INFO_KEY] = timeout_ms
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncConnection]:
+        """Connection with an open transaction, committed on successful exit"""
+        async with self._connect() as connection, connection.begin():
+            await self._apply_statement_timeout(connection)
+            yield connection
+
+    @asynccontextmanager
+    async def prepared_transaction(
+        self, transaction_id: str
+    ) -> AsyncIterator[AsyncConnection]:
+        """Connection with an open transaction, prepared on successful exit
+
+        The prepared transaction outlives the connection until it is finished
+        with finish_prepared.
+        """
+        async with self._connect() as connection:
+            transaction = await connection.begin()
+            try:
+                await self._apply_statement_timeout(connection)
+                yield connection
+                await connection.exec_driver_sql(
+                    f"PREPARE TRANSACTION '{transaction_id}'"
+                )
+            finally:
+                # After PREPARE this only closes the transaction client side.
+                await transaction.rollback()
+
+    async def finish_prepared(self, transaction_id: str, commit: bool) -> None:
+        """Commit or roll back a transaction left by prepared_transaction"""
+        command = "COMMIT" if commit else "ROLLBACK"
+        async with self._connect() as connection:
+            # Not allowed in a transaction block, sent before SQLAlchemy
+            # would begin one.
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.execute(
+                f"{command} PREPARED '{transaction_id}'"
+            )
+
     async def get_db_connection(self) -> AsyncGenerator:
         connection = await self.engine.connect()
 
         try:
             yield connection
         finally:
-            await connection.close()
+            # Same as AsyncConnection.__aexit__, cancellation must not leak it.
+            await asyncio.shield(connection.close())
+
+    async def warm_up(
+        self,
+        statements: Sequence[Select],
+        connections: int | None = None,
+    ) -> None:
+        """Open pool connections and run statements once on each of them"""
+        connections = connections or self.pool_size
+        # Every task holds its connection until all are open, so the pool
+        # really creates `connections` distinct connections.
+        barrier = asyncio.Barrier(connections)
+
+        async def warm_connection() -> None:
+            try:
+                async with self.engine.connect() as connection:
+                    await barrier.wait()
+                    for statement in statements:
+                        await connection.execute(statement)
+                    await connection.rollback()
+            except BaseException:
+                # Release tasks still waiting for connections that never come.
+                await barrier.abort()
+                raise
+
+        await asyncio.gather(*(warm_connection() for _ in range(connections)))
+
+    async def dispose(self) -> None:
+        """Close all pool connections"""
+        await self.engine.dispose()
 
     async def check_connection(self) -> None:
         async with self.engine.connect() as connection:
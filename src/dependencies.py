@@ -1,9 +1,48 @@
+from collections.abc import AsyncIterator, Iterator
+
 from dishka import Provider, Scope, provide
 
+from src.api.admission import AdmissionController, create_admission_controller
+from src.api.rate_limit import RateLimiter, create_rate_limiter
+from src.config import settings
 from src.database import Database
 from src.repository.directory import DirectoryRepositoryProtocol
 from src.repository.directory.postgres import PostgresDirectoryRepository
-from src.service import DirectoryService, DirectoryServiceProtocol
+from src.repository.directory.sharded import (
+    Region,
+    Shard,
+    ShardedDirectoryRepository,
+)
+from src.service import (
+    ActivityTreeSnapshot,
+    DataVersionTracker,
+    DirectoryService,
+    DirectoryServiceProtocol,
+    LocalResultCache,
+    PagePrefetcher,
+    ResultCache,
+    SharedResultCache,
+    SingleFlight,
+)
+
+
+def create_sharded_directory_repository() -> ShardedDirectoryRepository:
+    """Repository over the DIRECTORY_SHARDS databases, each with its own pool"""
+    return ShardedDirectoryRepository(
+        [
+            Shard(
+                name=shard.name,
+                region=Region(
+                    min_lat=shard.min_lat,
+                    max_lat=shard.max_lat,
+                    min_long=shard.min_long,
+                    max_long=shard.max_long,
+                ),
+                repository=PostgresDirectoryRepository(Database(dsn=str(shard.dsn))),
+            )
+            for shard in settings.DIRECTORY_SHARDS
+        ]
+    )
 
 
 class DatabaseProvider(Provider):
@@ -19,12 +58,107 @@ class DatabaseProvider(Provider):
 
 class AppProvider(Provider):
     @provide(scope=Scope.APP)
-    def directory_repository(self, database: Database) -> DirectoryRepositoryProtocol:
-        return PostgresDirectoryRepository(database)
+    def rate_limiter(self) -> RateLimiter:
+        return create_rate_limiter()
+
+    @provide(scope=Scope.APP)
+    def admission_controller(
+        self, directory_repository: DirectoryRepositoryProtocol
+    ) -> AdmissionController:
+        admission_controller = create_admission_controller()
+        # Pools of the databases the directory queries actually go to.
+        directory_repository.add_checkout_wait_listener(
+            admission_controller.observe_pool_wait
+        )
+        return admission_controller
+
+    @provide(scope=Scope.APP)
+    async def directory_repository(
+        self, database: Database
+    ) -> AsyncIterator[DirectoryRepositoryProtocol]:
+        if not settings.DIRECTORY_SHARDS:
+            yield PostgresDirectoryRepository(
+                database,
+                snapshot_ttl=settings.PAGINATION_SESSION_TTL,
+                snapshot_max_rows=settings.PAGINATION_SESSION_MAX_ROWS,
+            )
+            return
+
+        repository = create_sharded_directory_repository()
+        yield repository
+        await repository.close()
+
+    @provide(scope=Scope.APP)
+    def data_version_tracker(
+        self, directory_repository: DirectoryRepositoryProtocol
+    ) -> DataVersionTracker:
+        return DataVersionTracker(
+            directory_repository=directory_repository,
+            ttl=settings.DATA_VERSION_CACHE_TTL,
+        )
+
+    @provide(scope=Scope.APP)
+    def single_flight(self) -> SingleFlight:
+        return SingleFlight()
+
+    @provide(scope=Scope.APP)
+    def result_cache(self) -> Iterator[ResultCache | None]:
+        if settings.CACHE_BACKEND == "none":
+            yield None
+        elif settings.CACHE_BACKEND == "local":
+            yield LocalResultCache(max_entries=settings.CACHE_MAX_ENTRIES)
+        else:
+            cache = SharedResultCache(
+                settings.CACHE_SHARED_PATH,
+                slots=settings.CACHE_MAX_ENTRIES,
+                size=settings.CACHE_SHARED_SIZE_MB * 1024 * 1024,
+            )
+            yield cache
+            cache.close()
+
+    @provide(scope=Scope.APP)
+    def activity_tree(
+        self,
+        directory_repository: DirectoryRepositoryProtocol,
+        data_versions: DataVersionTracker,
+        cache: ResultCache | None,
+    ) -> ActivityTreeSnapshot:
+        return ActivityTreeSnapshot(
+            directory_repository=directory_repository,
+            data_versions=data_versions,
+            cache=cache,
+        )
+
+    @provide(scope=Scope.APP)
+    async def page_prefetcher(self) -> AsyncIterator[PagePrefetcher | None]:
+        if not settings.PREFETCH_ENABLED:
+            yield None
+            return
+
+        prefetcher = PagePrefetcher(
+            ttl=settings.PREFETCH_TTL,
+            max_pages=settings.PREFETCH_MAX_PAGES,
+            max_in_flight=settings.PREFETCH_MAX_IN_FLIGHT,
+            statement_timeout=settings.STATEMENT_TIMEOUT_DEFAULT_MS / 1000,
+        )
+        yield prefetcher
+        await prefetcher.close()
 
     @provide(scope=Scope.REQUEST)
     def directory_service(
         self,
         directory_repository: DirectoryRepositoryProtocol,
+        data_versions: DataVersionTracker,
+        single_flight: SingleFlight,
+        activity_tree: ActivityTreeSnapshot,
+        prefetcher: PagePrefetcher | None,
+        cache: ResultCache | None,
     ) -> DirectoryServiceProtocol:
-        return DirectoryService(directory_repository=directory_repository)
+        return DirectoryService(
+            directory_repository=directory_repository,
+            data_versions=data_versions,
+            single_flight=single_flight,
+            activity_tree=activity_tree,
+            prefetcher=prefetcher,
+            cache=cache,
+        )
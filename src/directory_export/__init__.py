@@ -0,0 +1,3 @@
+from .exporter import DirectoryExporter, ExportReport
+
+__all__ = ["DirectoryExporter", "ExportReport"]
@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+import asyncpg
+
+from src.config import settings
+
+from .exporter import DEFAULT_WORKERS, FORMAT_SUFFIXES, DirectoryExporter, ExportReport
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+async def _connect() -> asyncpg.Connection:
+    return await asyncpg.connect(
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        database=settings.POSTGRES_DB,
+    )
+
+
+async def export_directory(
+    output: Path, workers: int, file_format: str
+) -> ExportReport:
+    exporter = DirectoryExporter(_connect, workers=workers, file_format=file_format)
+    return await exporter.run(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Export organizations, buildings, activities and their links to "
+            "Parquet or Arrow files, all read from one database snapshot."
+        )
+    )
+    parser.add_argument("output", type=Path, help="Empty or missing directory.")
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=DEFAULT_WORKERS,
+        help="Connections reading key ranges in parallel.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=tuple(FORMAT_SUFFIXES),
+        default="parquet",
+        help="File format of the parts.",
+    )
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(export_directory(args.output, args.workers, args.format))
+    except (OSError, RuntimeError, ValueError, asyncpg.PostgresError) as exc:
+        parser.exit(1, f"Export failed: {exc}\n")
+
+    for table_name, rows in report.rows.items():
+        print(f"{table_name}: {rows} rows in {len(report.files[table_name])} files.")
+    print(f"Exported snapshot {report.snapshot} in {report.seconds:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
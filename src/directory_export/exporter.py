@@ -0,0 +1,279 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import asyncpg
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional "export" extra
+    pa = None
+    pq = None
+
+DEFAULT_WORKERS = 4
+ROWS_PER_BATCH = 50_000
+
+FORMAT_SUFFIXES = {"parquet": "parquet", "arrow": "arrow"}
+
+
+@dataclass(frozen=True, slots=True)
+class ExportTable:
+    name: str
+    # Column the key ranges are cut on.
+    key: str
+    # (output column, select expression, arrow type name)
+    columns: tuple[tuple[str, str, str], ...]
+
+
+EXPORT_TABLES = (
+    ExportTable(
+        name="activity",
+        key="id",
+        columns=(
+            ("id", "id::text", "string"),
+            ("name", "name", "string"),
+            ("parent_id", "parent_id::text", "string"),
+        ),
+    ),
+    ExportTable(
+        name="building",
+        key="id",
+        columns=(
+            ("id", "id::text", "string"),
+            ("address", "address", "string"),
+            ("latitude", "ST_Y(location::geometry)", "float64"),
+            ("longitude", "ST_X(location::geometry)", "float64"),
+            ("created_at", "created_at", "timestamp"),
+        ),
+    ),
+    ExportTable(
+        name="organization",
+        key="id",
+        columns=(
+            ("id", "id::text", "string"),
+            ("name", "name", "string"),
+            ("building_id", "building_id::text", "string"),
+            ("created_at", "created_at", "timestamp"),
+        ),
+    ),
+    ExportTable(
+        name="organization_phone_number",
+        key="organization_id",
+        columns=(
+            ("organization_id", "organization_id::text", "string"),
+            ("phone_number", "phone_number", "string"),
+        ),
+    ),
+    ExportTable(
+        name="organization_activity",
+        key="organization_id",
+        columns=(
+            ("organization_id", "organization_id::text", "string"),
+            ("activity_id", "activity_id::text", "string"),
+        ),
+    ),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ExportPart:
+    table: ExportTable
+    number: int
+    lower: UUID | None
+    upper: UUID | None
+
+    def query(self) -> tuple[str, list[UUID]]:
+        """Select of the rows in [lower, upper) of the key"""
+        conditions, args = [], []
+        if self.lower is not None:
+            args.append(self.lower)
+            conditions.append(f"{self.table.key} >= ${len(args)}")
+        if self.upper is not None:
+            args.append(self.upper)
+            conditions.append(f"{self.table.key} < ${len(args)}")
+        where = " AND ".join(conditions) or "TRUE"
+        if self.lower is None:
+            # Rows whose key was nulled by ON DELETE SET NULL go to part 0.
+            where = f"({where}) OR {self.table.key} IS NULL"
+        select = ", ".join(
+            f"{expression} AS {name}" for name, expression, _ in self.table.columns
+        )
+        query = (
+            f"SELECT {select} FROM {self.table.name} "
+            # Qualified, a bare name would sort by the ::text output column.
+            f"WHERE {where} ORDER BY {self.table.name}.{self.table.key}"
+        )
+        return query, args
+
+
+@dataclass(slots=True)
+class ExportReport:
+    snapshot: str
+    rows: dict[str, int] = field(default_factory=dict)
+    files: dict[str, list[str]] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def key_ranges(parts: int) -> list[tuple[UUID | None, UUID | None]]:
+    """Split the uuid space into equal [lower, upper) ranges, open at the ends"""
+    # Random and name-based uuids are spread evenly, so equal ranges of the
+    # key space hold roughly equal numbers of rows.
+    bounds = [UUID(int=(index << 128) // parts) for index in range(1, parts)]
+    return list(zip([None, *bounds], [*bounds, None]))
+
+
+def _arrow_schema(table: ExportTable) -> Any:
+    types = {
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, _, kind in table.columns])
+
+
+class DirectoryExporter:
+    """Dumps the directory to columnar files from one exported snapshot.
+
+    A coordinator transaction exports its snapshot with pg_export_snapshot();
+    every worker connection imports it with SET TRANSACTION SNAPSHOT, so all
+    files show the same committed state however long the export runs. Each
+    table is cut into disjoint key ranges that workers read and write in
+    parallel.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[asyncpg.Connection]],
+        workers: int = DEFAULT_WORKERS,
+        file_format: str = "parquet",
+    ) -> None:
+        if pa is None:
+            raise RuntimeError(
+                "Export needs pyarrow, install the project with the export extra"
+            )
+        if file_format not in FORMAT_SUFFIXES:
+            raise ValueError(f"Unsupported export format: {file_format}")
+        if workers < 1:
+            raise ValueError("Export needs at least one worker")
+        self.connect = connect
+        self.workers = workers
+        self.file_format = file_format
+
+    def _open_writer(self, path: Path, schema: Any) -> Any:
+        if self.file_format == "parquet":
+            return pq.ParquetWriter(path, schema)
+        return pa.ipc.new_file(path, schema)
+
+    async def _export_part(
+        self, connection: asyncpg.Connection, part: ExportPart, output: Path
+    ) -> tuple[str, int]:
+        schema = _arrow_schema(part.table)
+        directory = output / part.table.name
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{part.number:04d}.{FORMAT_SUFFIXES[self.file_format]}"
+        writer = await asyncio.to_thread(self._open_writer, path, schema)
+        rows = 0
+        try:
+            query, args = part.query()
+            buffer: list[asyncpg.Record] = []
+            async for record in connection.cursor(query, *args, prefetch=10_000):
+                buffer.append(record)
+                if len(buffer) == ROWS_PER_BATCH:
+                    await self._write(writer, schema, buffer)
+                    rows += len(buffer)
+                    buffer = []
+            if buffer:
+                await self._write(writer, schema, buffer)
+                rows += len(buffer)
+        finally:
+            await asyncio.to_thread(writer.close)
+        return str(path.relative_to(output)), rows
+
+    @staticmethod
+    async def _write(writer: Any, schema: Any, records: list[asyncpg.Record]) -> None:
+        columns = {name: [record[name] for record in records] for name in schema.names}
+        table = pa.Table.from_pydict(columns, schema=schema)
+        # Encoding and compression run outside the event loop, so workers
+        # keep reading while others write.
+        await asyncio.to_thread(writer.write_table, table)
+
+    async def _worker(
+        self,
+        snapshot: str,
+        parts: asyncio.Queue[ExportPart],
+        output: Path,
+        report: ExportReport,
+    ) -> None:
+        connection = await self.connect()
+        try:
+            async with connection.transaction(
+                isolation="repeatable_read", readonly=True
+            ):
+                await connection.execute(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+                while not parts.empty():
+                    part = parts.get_nowait()
+                    path, rows = await self._export_part(connection, part, output)
+                    report.rows[part.table.name] += rows
+                    report.files[part.table.name].append(path)
+        finally:
+            await connection.close()
+
+    async def run(self, output: Path) -> ExportReport:
+        """Export every table into output/<table>/part-NNNN files"""
+        if output.exists() and any(output.iterdir()):
+            raise ValueError(f"Output directory is not empty: {output}")
+        output.mkdir(parents=True, exist_ok=True)
+
+        started_at = asyncio.get_running_loop().time()
+        coordinator = await self.connect()
+        try:
+            # Stays open until every worker imported the snapshot and finished.
+            async with coordinator.transaction(
+                isolation="repeatable_read", readonly=True
+            ):
+                snapshot = await coordinator.fetchval("SELECT pg_export_snapshot()")
+                report = ExportReport(snapshot=snapshot)
+                parts: asyncio.Queue[ExportPart] = asyncio.Queue()
+                for table in EXPORT_TABLES:
+                    report.rows[table.name] = 0
+                    report.files[table.name] = []
+                    for number, (lower, upper) in enumerate(key_ranges(self.workers)):
+                        parts.put_nowait(ExportPart(table, number, lower, upper))
+
+                workers = [
+                    asyncio.create_task(self._worker(snapshot, parts, output, report))
+                    for _ in range(self.workers)
+                ]
+                try:
+                    await asyncio.gather(*workers)
+                except BaseException:
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+                    raise
+                exported_at = await coordinator.fetchval("SELECT now()")
+        finally:
+            await coordinator.close()
+
+        report.seconds = asyncio.get_running_loop().time() - started_at
+        for files in report.files.values():
+            files.sort()
+        manifest = {
+            "snapshot": report.snapshot,
+            # Transaction start time of the snapshot, not of the file writes.
+            "exported_at": exported_at.astimezone(UTC).isoformat(),
+            "written_at": datetime.now(UTC).isoformat(),
+            "format": self.file_format,
+            "tables": {
+                name: {"rows": report.rows[name], "files": report.files[name]}
+                for name in report.rows
+            },
+        }
+        (output / "manifest.json").write_text(json.dumps(manifest, indent=2), "utf-8")
+        return report
@@ -0,0 +1,10 @@
+from .loader import DirectoryImporter, ImportBatch, ImportReport
+from .readers import ImportRecord, read_records
+
+__all__ = [
+    "DirectoryImporter",
+    "ImportBatch",
+    "ImportRecord",
+    "ImportReport",
+    "read_records",
+]
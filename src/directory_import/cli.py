@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+import asyncpg
+
+from src.config import settings
+
+from .loader import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_WORKERS,
+    DirectoryImporter,
+    ImportBatch,
+    ImportReport,
+)
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _print_progress(batch: ImportBatch, report: ImportReport) -> None:
+    print(
+        f"Batch {batch.number} committed: {report.records} records in "
+        f"{report.seconds:.1f}s ({report.records_per_second:.0f} records/s).",
+        flush=True,
+    )
+
+
+async def import_directory(
+    path: Path, batch_size: int, workers: int, restart: bool
+) -> ImportReport:
+    pool = await asyncpg.create_pool(
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        database=settings.POSTGRES_DB,
+        min_size=1,
+        # One more for the bookkeeping next to busy workers.
+        max_size=workers + 1,
+        init=DirectoryImporter.create_staging_tables,
+    )
+    try:
+        importer = DirectoryImporter(
+            pool, batch_size=batch_size, workers=workers, on_batch=_print_progress
+        )
+        return await importer.run(path, restart=restart)
+    finally:
+        await pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Import organizations with buildings, phones and activity paths from "
+            "a CSV or GeoJSON file. An interrupted import of the same file "
+            "resumes after its last committed batch."
+        )
+    )
+    parser.add_argument(
+        "path",
+        type=Path,
+        help="CSV file (uuid, name, address, latitude, longitude, phones, "
+        "activities columns) or GeoJSON FeatureCollection of points.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=_positive_int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Records loaded and committed together.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=DEFAULT_WORKERS,
+        help="Batches loaded in parallel.",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Start over instead of resuming an interrupted import.",
+    )
+    args = parser.parse_args()
+    if settings.DIRECTORY_SHARDS:
+        # Rows would land in the POSTGRES_* database, which no shard reads.
+        parser.exit(
+            1,
+            "Import is not supported while DIRECTORY_SHARDS is set, import "
+            "the rows of each region with POSTGRES_* set to its shard.\n",
+        )
+
+    try:
+        report = asyncio.run(
+            import_directory(args.path, args.batch_size, args.workers, args.restart)
+        )
+    except (OSError, ValueError, asyncpg.PostgresError) as exc:
+        parser.exit(
+            1,
+            f"Import failed: {exc}\n"
+            "Committed batches are kept, run the same command to resume.\n",
+        )
+
+    if report.skipped_batches:
+        print(
+            f"Resumed after {report.skipped_records} records of "
+            f"{report.skipped_batches} batches committed before."
+        )
+    print(
+        f"Imported {report.records} records in {report.batches} batches, "
+        f"{report.seconds:.1f}s ({report.records_per_second:.0f} records/s)."
+    )
+
+
+if __name__ == "__main__":
+    main()
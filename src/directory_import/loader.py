@@ -0,0 +1,411 @@
+import asyncio
+import hashlib
+import itertools
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import UUID, uuid5
+
+import asyncpg
+
+from src.dto import OrganizationUpsert
+from src.repository.directory.postgres.content_hash import organization_content_hash
+
+from .readers import ImportRecord, read_records
+
+# Buildings and organizations without an explicit uuid get one derived from
+# their content, so loading a batch again updates the same rows.
+IMPORT_NAMESPACE = UUID("5b0f3c52-8d4e-4a8e-9f61-2c7d0e9a4b13")
+
+ACTIVITY_PATH_SEPARATOR = "/"
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_WORKERS = 4
+DEADLOCK_RETRIES = 3
+
+# Created once per connection, emptied by every commit.
+STAGING_TABLES_SQL = """
+CREATE TEMP TABLE import_building (
+    id uuid NOT NULL,
+    address text NOT NULL,
+    latitude double precision NOT NULL,
+    longitude double precision NOT NULL
+) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE import_organization (
+    id uuid NOT NULL,
+    name text NOT NULL,
+    building_id uuid,
+    content_hash text NOT NULL
+) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE import_phone (
+    organization_id uuid NOT NULL,
+    phone_number text NOT NULL
+) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE import_activity (
+    organization_id uuid NOT NULL,
+    activity_id uuid NOT NULL
+) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE import_written (
+    id uuid NOT NULL
+) ON COMMIT DELETE ROWS;
+"""
+
+# Moves a staged batch into the directory. Rows are written in id order, so
+# workers loading batches that share buildings lock them in the same order.
+# Like bulk sync, organizations whose content hash did not change are left
+# untouched, and the phones and activities of written ones are replaced.
+MERGE_SQL = """
+INSERT INTO building (id, address, location)
+SELECT DISTINCT ON (id)
+    id,
+    address,
+    ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography
+FROM import_building
+ORDER BY id
+ON CONFLICT (id) DO NOTHING;
+
+WITH written AS (
+    INSERT INTO organization (id, name, building_id, content_hash)
+    SELECT DISTINCT ON (id) id, name, building_id, content_hash
+    FROM import_organization
+    ORDER BY id
+    ON CONFLICT (id) DO UPDATE
+    SET name = EXCLUDED.name,
+        building_id = EXCLUDED.building_id,
+        content_hash = EXCLUDED.content_hash
+    WHERE organization.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+    RETURNING id
+)
+INSERT INTO import_written (id) SELECT id FROM written;
+
+DELETE FROM organization_phone_number
+WHERE organization_id IN (SELECT id FROM import_written);
+
+DELETE FROM organization_activity
+WHERE organization_id IN (SELECT id FROM import_written);
+
+INSERT INTO organization_phone_number (organization_id, phone_number)
+SELECT DISTINCT import_phone.organization_id, import_phone.phone_number
+FROM import_phone
+JOIN import_written ON import_written.id = import_phone.organization_id;
+
+INSERT INTO organization_activity (organization_id, activity_id)
+SELECT DISTINCT import_activity.organization_id, import_activity.activity_id
+FROM import_activity
+JOIN import_written ON import_written.id = import_activity.organization_id;
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ImportBatch:
+    number: int
+    records: int
+    buildings: list[tuple[UUID, str, float, float]]
+    organizations: list[tuple[UUID, str, UUID | None, str]]
+    phone_numbers: list[tuple[UUID, str]]
+    activities: list[tuple[UUID, UUID]]
+
+
+@dataclass(slots=True)
+class ImportReport:
+    batches: int = 0
+    records: int = 0
+    skipped_batches: int = 0
+    skipped_records: int = 0
+    seconds: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of the file contents, hex encoded"""
+    with path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def _path_key(path: str) -> str:
+    return ACTIVITY_PATH_SEPARATOR.join(
+        part.strip().casefold() for part in path.split(ACTIVITY_PATH_SEPARATOR)
+    )
+
+
+class ActivityPaths:
+    """Activity ids by path of names from the root, e.g. "Food/Meat" """
+
+    def __init__(self, activities: Sequence[tuple[UUID, str, UUID | None]]) -> None:
+        by_id = {
+            activity_id: (name, parent_id)
+            for activity_id, name, parent_id in activities
+        }
+
+        def path_of(activity_id: UUID) -> str:
+            name, parent_id = by_id[activity_id]
+            if parent_id is None or parent_id not in by_id:
+                return name
+            return f"{path_of(parent_id)}{ACTIVITY_PATH_SEPARATOR}{name}"
+
+        self._ids: dict[str, UUID | None] = {}
+        for activity_id in by_id:
+            key = _path_key(path_of(activity_id))
+            # Same names under the same parent can not be told apart.
+            self._ids[key] = None if key in self._ids else activity_id
+
+    @classmethod
+    async def load(cls, connection: asyncpg.Connection) -> "ActivityPaths":
+        rows = await connection.fetch("SELECT id, name, parent_id FROM activity")
+        return cls([(row["id"], row["name"], row["parent_id"]) for row in rows])
+
+    def resolve(self, path: str) -> UUID:
+        key = _path_key(path)
+        if key not in self._ids:
+            raise ValueError(f"Unknown activity path: {path}")
+        activity_id = self._ids[key]
+        if activity_id is None:
+            raise ValueError(f"Ambiguous activity path: {path}")
+        return activity_id
+
+
+def build_batch(
+    number: int, records: Sequence[ImportRecord], activity_paths: ActivityPaths
+) -> ImportBatch:
+    """Rows of every staging table for a batch of source records"""
+    batch = ImportBatch(
+        number=number,
+        records=len(records),
+        buildings=[],
+        organizations=[],
+        phone_numbers=[],
+        activities=[],
+    )
+    for record in records:
+        try:
+            activity_uuids = [
+                activity_paths.resolve(path) for path in record.activity_paths
+            ]
+        except ValueError as exc:
+            raise ValueError(f"Invalid record {record.number}: {exc}") from exc
+
+        building_uuid = None
+        if record.address is not None:
+            building_uuid = uuid5(
+                IMPORT_NAMESPACE,
+                f"building:{record.address}:{record.latitude}:{record.longitude}",
+            )
+            batch.buildings.append(
+                (building_uuid, record.address, record.latitude, record.longitude)
+            )
+
+        organization = OrganizationUpsert(
+            uuid=record.uuid
+            or uuid5(IMPORT_NAMESPACE, f"organization:{record.name}:{building_uuid}"),
+            name=record.name,
+            building_uuid=building_uuid,
+            phone_numbers=record.phone_numbers,
+            activity_uuids=activity_uuids,
+        )
+        batch.organizations.append(
+            (
+                organization.uuid,
+                organization.name,
+                building_uuid,
+                organization_content_hash(organization),
+            )
+        )
+        batch.phone_numbers.extend(
+            (organization.uuid, phone_number)
+            for phone_number in organization.phone_numbers
+        )
+        batch.activities.extend(
+            (organization.uuid, activity_uuid) for activity_uuid in activity_uuids
+        )
+    return batch
+
+
+class DirectoryImporter:
+    """Loads a CSV or GeoJSON file in batches through COPY and staging tables.
+
+    Batches are loaded by several workers in parallel; each one commits
+    together with its row in directory_import_batch. An interrupted import
+    started again for the same file skips the batches already committed.
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        on_batch: Callable[[ImportBatch, ImportReport], None] | None = None,
+    ) -> None:
+        if batch_size < 1 or workers < 1:
+            raise ValueError("Batch size and workers must be at least 1")
+        self.pool = pool
+        self.batch_size = batch_size
+        self.workers = workers
+        self.on_batch = on_batch
+
+    @staticmethod
+    async def create_staging_tables(connection: asyncpg.Connection) -> None:
+        """Pool init callback"""
+        await connection.execute(STAGING_TABLES_SQL)
+
+    async def _start(
+        self, source: str, file_size: int, content_hash: str, restart: bool
+    ) -> set[int]:
+        """Register the import, return numbers of batches committed before"""
+        async with self.pool.acquire() as connection, connection.transaction():
+            previous = await connection.fetchrow(
+                """
+                SELECT file_size, file_hash, batch_size, finished_at
+                FROM directory_import
+                WHERE source = $1
+                FOR UPDATE
+                """,
+                source,
+            )
+            if previous is not None and not restart and previous["finished_at"] is None:
+                # Same size alone does not mean same rows, edits in place
+                # keep it; the hash catches them.
+                if (previous["file_size"], previous["file_hash"]) != (
+                    file_size,
+                    content_hash,
+                ):
+                    raise ValueError(
+                        "Source changed since the interrupted import, "
+                        "run it with --restart"
+                    )
+                if previous["batch_size"] != self.batch_size:
+                    raise ValueError(
+                        "Interrupted import used batch size "
+                        f"{previous['batch_size']}, resume it with the same one "
+                        "or run it with --restart"
+                    )
+                rows = await connection.fetch(
+                    "SELECT batch_number FROM directory_import_batch WHERE source = $1",
+                    source,
+                )
+                return {row["batch_number"] for row in rows}
+
+            # A finished import is loaded again from the start; unchanged
+            # organizations are skipped by their content hash.
+            await connection.execute(
+                "DELETE FROM directory_import WHERE source = $1", source
+            )
+            await connection.execute(
+                """
+                INSERT INTO directory_import (source, file_size, file_hash, batch_size)
+                VALUES ($1, $2, $3, $4)
+                """,
+                source,
+                file_size,
+                content_hash,
+                self.batch_size,
+            )
+            return set()
+
+    async def _load_batch(self, source: str, batch: ImportBatch) -> None:
+        for attempt in itertools.count(1):
+            try:
+                async with self.pool.acquire() as connection, connection.transaction():
+                    await self._copy_batch(connection, batch)
+                    await connection.execute(MERGE_SQL)
+                    await connection.execute(
+                        """
+                        INSERT INTO directory_import_batch (source, batch_number, records)
+                        VALUES ($1, $2, $3)
+                        """,
+                        source,
+                        batch.number,
+                        batch.records,
+                    )
+                return
+            except asyncpg.DeadlockDetectedError:
+                if attempt == DEADLOCK_RETRIES:
+                    raise
+
+    @staticmethod
+    async def _copy_batch(connection: asyncpg.Connection, batch: ImportBatch) -> None:
+        staged = (
+            (
+                "import_building",
+                batch.buildings,
+                ("id", "address", "latitude", "longitude"),
+            ),
+            (
+                "import_organization",
+                batch.organizations,
+                ("id", "name", "building_id", "content_hash"),
+            ),
+            ("import_phone", batch.phone_numbers, ("organization_id", "phone_number")),
+            ("import_activity", batch.activities, ("organization_id", "activity_id")),
+        )
+        for table_name, rows, columns in staged:
+            if rows:
+                await connection.copy_records_to_table(
+                    table_name, records=rows, columns=columns
+                )
+
+    async def run(self, path: Path, restart: bool = False) -> ImportReport:
+        """Import the file, resuming an interrupted import of it unless restart"""
+        source = str(path.resolve())
+        # Hashed off the event loop, the file is read once more in full.
+        content_hash = await asyncio.to_thread(file_hash, path)
+        committed = await self._start(
+            source, path.stat().st_size, content_hash, restart
+        )
+        async with self.pool.acquire() as connection:
+            activity_paths = await ActivityPaths.load(connection)
+
+        report = ImportReport()
+        started_at = time.perf_counter()
+        # Bounded, so the reader runs at most a few batches ahead of workers.
+        queue: asyncio.Queue[ImportBatch | None] = asyncio.Queue(self.workers * 2)
+        chunks = enumerate(itertools.batched(read_records(path), self.batch_size))
+
+        def next_batch() -> ImportBatch | None:
+            for number, records in chunks:
+                if number in committed:
+                    report.skipped_batches += 1
+                    report.skipped_records += len(records)
+                    continue
+                return build_batch(number, records, activity_paths)
+            return None
+
+        async def read() -> None:
+            # Parsing runs in a thread to keep the workers' I/O going.
+            while (batch := await asyncio.to_thread(next_batch)) is not None:
+                await queue.put(batch)
+            for _ in range(self.workers):
+                await queue.put(None)
+
+        async def load() -> None:
+            while (batch := await queue.get()) is not None:
+                await self._load_batch(source, batch)
+                report.batches += 1
+                report.records += batch.records
+                report.seconds = time.perf_counter() - started_at
+                if self.on_batch is not None:
+                    self.on_batch(batch, report)
+
+        tasks = [
+            asyncio.create_task(read()),
+            *(asyncio.create_task(load()) for _ in range(self.workers)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Batches committed so far stay, the next run resumes after them.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        report.seconds = time.perf_counter() - started_at
+        async with self.pool.acquire() as connection:
+            await connection.execute(
+                "UPDATE directory_import SET finished_at = now() WHERE source = $1",
+                source,
+            )
+        return report
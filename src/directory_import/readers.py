@@ -0,0 +1,174 @@
+import csv
+import json
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+from uuid import UUID
+
+# Separates phone numbers and activity paths inside one CSV cell.
+CSV_LIST_SEPARATOR = ";"
+
+READ_CHUNK_SIZE = 1024 * 1024
+# Larger features are treated as malformed instead of buffering the file.
+MAX_FEATURE_SIZE = 16 * 1024 * 1024
+
+FEATURES_ARRAY = re.compile(r'"features"\s*:\s*\[')
+FEATURE_SEPARATORS = " \t\r\n,"
+
+
+@dataclass(frozen=True, slots=True)
+class ImportRecord:
+    """Organization of a source file together with its building"""
+
+    number: int
+    name: str
+    uuid: UUID | None = None
+    address: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    phone_numbers: list[str] = field(default_factory=list)
+    activity_paths: list[str] = field(default_factory=list)
+
+
+def _as_list(value: Any) -> list[str]:
+    if not value:
+        return []
+    items = value.split(CSV_LIST_SEPARATOR) if isinstance(value, str) else value
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+def _build_record(
+    number: int,
+    *,
+    uuid: Any,
+    name: Any,
+    address: Any,
+    latitude: Any,
+    longitude: Any,
+    phone_numbers: Any,
+    activity_paths: Any,
+) -> ImportRecord:
+    try:
+        name = str(name or "").strip()
+        if not name:
+            raise ValueError("name is required")
+        address = str(address or "").strip() or None
+        has_location = latitude not in (None, "") and longitude not in (None, "")
+        if (address is not None) != has_location:
+            raise ValueError("address and coordinates must be given together")
+        if has_location:
+            latitude, longitude = float(latitude), float(longitude)
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValueError("coordinates are out of range")
+
+        return ImportRecord(
+            number=number,
+            name=name,
+            uuid=UUID(str(uuid)) if uuid else None,
+            address=address,
+            latitude=latitude if has_location else None,
+            longitude=longitude if has_location else None,
+            phone_numbers=_as_list(phone_numbers),
+            activity_paths=_as_list(activity_paths),
+        )
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid record {number}: {exc}") from exc
+
+
+def _read_csv(file: TextIO) -> Iterator[ImportRecord]:
+    """Rows with uuid, name, address, latitude, longitude, phones, activities"""
+    for number, row in enumerate(csv.DictReader(file), start=1):
+        yield _build_record(
+            number,
+            uuid=row.get("uuid"),
+            name=row.get("name"),
+            address=row.get("address"),
+            latitude=row.get("latitude"),
+            longitude=row.get("longitude"),
+            phone_numbers=row.get("phones"),
+            activity_paths=row.get("activities"),
+        )
+
+
+def _iter_features(file: TextIO) -> Iterator[Any]:
+    """Features of a FeatureCollection, decoded one at a time"""
+    # Only the feature being decoded and one read chunk are kept in memory.
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while (match := FEATURES_ARRAY.search(buffer)) is None:
+        chunk = file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            raise ValueError("GeoJSON source has no features array")
+        # The tail keeps a key split between two chunks.
+        buffer = buffer[-64:] + chunk
+    position = match.end()
+
+    while True:
+        while position < len(buffer) and buffer[position] in FEATURE_SEPARATORS:
+            position += 1
+        if position < len(buffer):
+            if buffer[position] == "]":
+                return
+            try:
+                feature, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                pass
+            else:
+                yield feature
+                continue
+
+        # Feature is cut by the end of the buffer, read the rest of it.
+        chunk = file.read(READ_CHUNK_SIZE)
+        if not chunk or len(buffer) - position > MAX_FEATURE_SIZE:
+            raise ValueError("GeoJSON features array is incomplete or malformed")
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def _feature_fields(feature: Any) -> dict[str, Any]:
+    """Record fields of a point feature, TypeError for a malformed one"""
+    if not isinstance(feature, dict):
+        raise TypeError("feature is not an object")
+    properties = feature.get("properties") or {}
+    geometry = feature.get("geometry") or {}
+    if not isinstance(properties, dict) or not isinstance(geometry, dict):
+        raise TypeError("properties and geometry must be objects")
+    coordinates = geometry.get("coordinates") or [None, None]
+    if not isinstance(coordinates, list) or len(coordinates) < 2:
+        raise TypeError("coordinates must be a [longitude, latitude] array")
+    longitude, latitude = coordinates[:2]
+    return {
+        "uuid": properties.get("uuid") or feature.get("id"),
+        "name": properties.get("name"),
+        "address": properties.get("address"),
+        "latitude": latitude,
+        "longitude": longitude,
+        "phone_numbers": properties.get("phones"),
+        "activity_paths": properties.get("activities"),
+    }
+
+
+def _read_geojson(file: TextIO) -> Iterator[ImportRecord]:
+    """Point features; properties carry name, address, phones and activities"""
+    for number, feature in enumerate(_iter_features(file), start=1):
+        try:
+            fields = _feature_fields(feature)
+        except TypeError as exc:
+            raise ValueError(f"Invalid record {number}: {exc}") from exc
+        yield _build_record(number, **fields)
+
+
+def read_records(path: Path) -> Iterator[ImportRecord]:
+    """Stream records of a CSV or GeoJSON file"""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        reader = _read_csv
+    elif suffix in (".geojson", ".json"):
+        reader = _read_geojson
+    else:
+        raise ValueError(f"Unsupported source format: {path.suffix}")
+
+    with path.open(newline="", encoding="utf-8") as file:
+        yield from reader(file)
@@ -1,11 +1,22 @@
 from .dto import (
     Activity,
+    ActivityMatch,
+    ActivityMove,
+    ActivityTreeNode,
     Building,
     BuildingFilter,
+    BuildingSort,
+    ChangeFilter,
+    DirectoryChange,
+    DirectoryChangePage,
     Organization,
     OrganizationActivityFilter,
+    OrganizationExpand,
     OrganizationFilter,
     OrganizationPhoneNumber,
+    OrganizationSort,
+    OrganizationSyncResult,
+    OrganizationUpsert,
     PaginatedBuildings,
     PaginatedOrganizations,
     PaginationParams,
@@ -16,14 +27,25 @@ from .dto import (
 __all__ = [
     "Building",
     "Activity",
+    "ActivityMatch",
+    "ActivityMove",
+    "ActivityTreeNode",
     "Organization",
     "OrganizationPhoneNumber",
     "OrganizationFilter",
+    "OrganizationExpand",
+    "OrganizationSort",
     "BuildingFilter",
+    "BuildingSort",
     "PaginationParams",
     "PaginatedOrganizations",
     "PaginatedBuildings",
     "OrganizationActivityFilter",
     "WithinRadiusFilter",
     "WithinBoundingBoxFilter",
+    "OrganizationUpsert",
+    "OrganizationSyncResult",
+    "ChangeFilter",
+    "DirectoryChange",
+    "DirectoryChangePage",
 ]
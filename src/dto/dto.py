@@ -1,3 +1,4 @@
+from enum import StrEnum
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -24,15 +25,58 @@ class WithinBoundingBoxFilter(BaseModel):
     max_long: float = Field(description="Maximum longitude")
 
 
+class ActivityMatch(StrEnum):
+    """
+    How several activities of a filter are combined
+    """
+
+    ANY = "any"
+    ALL = "all"
+
+
 class OrganizationActivityFilter(BaseModel):
     """
-    Filter organizations by activity
+    Filter organizations by activities
     """
 
-    activity_uuid: UUID | None = Field(default=None, description="UUID of the activity")
+    activity_uuids: list[UUID] = Field(
+        min_length=1, description="UUIDs of the activities"
+    )
     include_children: bool = Field(
         default=False, description="Include organizations with child activities"
     )
+    match: ActivityMatch = Field(
+        default=ActivityMatch.ANY,
+        description="Organization needs any or all of the activities",
+    )
+
+
+class OrganizationExpand(StrEnum):
+    """
+    Relations added to every organization of a listing page
+    """
+
+    PHONES = "phones"
+    ACTIVITIES = "activities"
+
+
+class OrganizationSort(StrEnum):
+    """
+    Order of organization listing pages
+    """
+
+    CREATED_AT = "created_at"
+    NAME = "name"
+    NAME_DESC = "-name"
+
+
+class BuildingSort(StrEnum):
+    """
+    Order of building listing pages
+    """
+
+    CREATED_AT = "created_at"
+    ADDRESS = "address"
 
 
 class OrganizationFilter(BaseModel):
@@ -40,8 +84,8 @@ class OrganizationFilter(BaseModel):
     Filter organizations by various criteria
     """
 
-    building_uuid: UUID | None = Field(
-        default=None, description="filter by UUID of the building"
+    building_uuids: list[UUID] = Field(
+        default_factory=list, description="filter by UUIDs of the buildings"
     )
     activity: OrganizationActivityFilter | None = Field(
         default=None, description="Filter by activity"
@@ -56,6 +100,16 @@ class OrganizationFilter(BaseModel):
         default=None, description="filter by name of the organization"
     )
     pagination: "PaginationParams" = Field(description="Pagination params")
+    expand: list[OrganizationExpand] = Field(
+        default_factory=list, description="Relations to load for every organization"
+    )
+    sort: OrganizationSort = Field(
+        default=OrganizationSort.CREATED_AT, description="Order of the listing"
+    )
+    snapshot: bool = Field(
+        default=False,
+        description="Page through matches resolved once by the first request",
+    )
 
 
 class PaginationParams(BaseModel):
@@ -65,6 +119,9 @@ class PaginationParams(BaseModel):
 
 class BuildingFilter(BaseModel):
     pagination: PaginationParams = Field(description="Pagination params")
+    sort: BuildingSort = Field(
+        default=BuildingSort.CREATED_AT, description="Order of the listing"
+    )
 
 
 class Building(BaseModel):
@@ -110,3 +167,76 @@ class PaginatedBuildings(BaseModel):
     next_cursor: str | None = Field(
         default=None, description="Cursor for the next page"
     )
+
+
+class OrganizationUpsert(BaseModel):
+    """
+    Organization state pushed by bulk sync
+    """
+
+    uuid: UUID = Field(description="Unique identifier for the organization")
+    name: str = Field(description="Name of the organization")
+    building_uuid: UUID | None = Field(
+        default=None, description="UUID of the organization building"
+    )
+    phone_numbers: list[str] = Field(
+        default_factory=list, description="Phone numbers of the organization"
+    )
+    activity_uuids: list[UUID] = Field(
+        default_factory=list, description="UUIDs of the organization activities"
+    )
+
+
+class ActivityMove(BaseModel):
+    """
+    New place of an activity, moved together with its subtree
+    """
+
+    activity_uuid: UUID = Field(description="UUID of the moved activity")
+    parent_uuid: UUID | None = Field(
+        default=None, description="UUID of the new parent, None for a root"
+    )
+
+
+class OrganizationSyncResult(BaseModel):
+    inserted: int = Field(default=0, description="Number of inserted organizations")
+    updated: int = Field(default=0, description="Number of updated organizations")
+    unchanged: int = Field(
+        default=0, description="Number of organizations left untouched"
+    )
+
+
+class ChangeFilter(BaseModel):
+    since: str | None = Field(
+        default=None, description="Change token from the previous page"
+    )
+    limit: int = Field(default=100, ge=1, le=1000, description="Page size")
+
+
+class DirectoryChange(BaseModel):
+    entity: str = Field(description="Changed entity: organization/building/activity")
+    uuid: UUID = Field(description="Unique identifier of the changed entity")
+    op: str = Field(description="Change operation: upsert/delete")
+
+
+class DirectoryChangePage(BaseModel):
+    items: list[DirectoryChange] = Field(description="Compacted changes")
+    next_token: str = Field(description="Token to fetch changes after this page")
+    has_more: bool = Field(description="Whether more changes are available now")
+
+
+class ActivityTreeNode(BaseModel):
+    uuid: UUID = Field(description="Unique identifier for the activity")
+    name: str = Field(description="Name of the activity")
+    parent_uuid: UUID | None = Field(
+        default=None, description="UUID of the parent activity"
+    )
+    organization_count: int = Field(
+        description="Organizations linked to this activity directly"
+    )
+    subtree_organization_count: int = Field(
+        description="Distinct organizations linked to this activity or its descendants"
+    )
+    children: list["ActivityTreeNode"] = Field(
+        default_factory=list, description="Child activities"
+    )
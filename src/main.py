@@ -1,12 +1,10 @@
-import asyncio
-
 from src.app import App
 
 
 def main():
     app = App()
 
-    asyncio.run(app.start())
+    app.start()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+import os
+from collections.abc import Iterable
+from typing import TypeVar
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self, pid: str) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        labelnames = (*self.labelnames, "pid")
+        for key, value in sorted(self._values.items()):
+            labels = _format_labels(labelnames, (*key, pid))
+            lines.append(f"{self.name}{labels} {value:g}")
+        return "\n".join(lines)
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in Prometheus text format
+
+    Every worker process keeps its own values, so each sample is labelled
+    with the pid of the process that rendered it.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def _register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        # Read at render time: workers fork after the registry is created.
+        pid = str(os.getpid())
+        return "\n".join(metric.render(pid) for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,50 @@
+import asyncio
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config import settings
+
+ALEMBIC_CONFIG_PATH = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+async def _current_heads() -> set[str]:
+    engine = create_async_engine(str(settings.POSTGRES_DSN), poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            heads = await connection.run_sync(
+                lambda sync_connection: MigrationContext.configure(
+                    sync_connection
+                ).get_current_heads()
+            )
+    finally:
+        await engine.dispose()
+    return set(heads)
+
+
+def upgrade_if_needed() -> bool:
+    """Run alembic upgrade only when database is behind script heads"""
+    config = Config(str(ALEMBIC_CONFIG_PATH))
+    script_heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    if asyncio.run(_current_heads()) == script_heads:
+        return False
+
+    command.upgrade(config, "head")
+    return True
+
+
+def main() -> None:
+    if upgrade_if_needed():
+        print("Database upgraded to head.")
+    else:
+        print("Database is already at head, skipping migrations.")
+
+
+if __name__ == "__main__":
+    main()
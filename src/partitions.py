@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+from datetime import date, datetime, timezone
+
+from sqlalchemy import pool, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config import settings
+
+DEFAULT_MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def create_future_partitions(months_ahead: int) -> list[str]:
+    """Create missing monthly organization_search partitions, return their names"""
+    current_month = datetime.now(timezone.utc).date().replace(day=1)
+    engine = create_async_engine(str(settings.POSTGRES_DSN), poolclass=pool.NullPool)
+    try:
+        async with engine.begin() as connection:
+            result = await connection.execute(
+                text("SELECT create_organization_search_partitions(:start, :end)"),
+                {
+                    "start": current_month,
+                    "end": _add_months(current_month, months_ahead + 1),
+                },
+            )
+            return list(result.scalars())
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Create monthly organization_search partitions ahead of time."
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=DEFAULT_MONTHS_AHEAD,
+        help="Number of months after the current one to cover.",
+    )
+    args = parser.parse_args()
+
+    created = asyncio.run(create_future_partitions(args.months_ahead))
+    if created:
+        print(f"Created partitions: {', '.join(created)}.")
+    else:
+        print("All partitions already exist, nothing to create.")
+
+
+if __name__ == "__main__":
+    main()
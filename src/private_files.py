@@ -0,0 +1,40 @@
+import os
+import stat
+from pathlib import Path
+
+
+def ensure_private_directory(directory: Path) -> None:
+    """Create the directory, refusing one that other users could write or swap"""
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # lstat: a symlink planted at the path is refused, not followed.
+    info = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.geteuid()
+        or info.st_mode & 0o022
+    ):
+        raise PermissionError(
+            f"Directory {directory} must be owned and writable only by the current user"
+        )
+
+
+def is_private_file(info: os.stat_result) -> bool:
+    """Regular file owned by the current user and closed to everybody else"""
+    return (
+        stat.S_ISREG(info.st_mode)
+        and info.st_uid == os.geteuid()
+        and not info.st_mode & 0o077
+    )
+
+
+def open_private(path: Path, flags: int = os.O_RDWR | os.O_CREAT) -> int:
+    """Open a file in a private directory, refusing one others could read or swap"""
+    ensure_private_directory(path.parent)
+    # O_NOFOLLOW: a symlink planted at the path fails instead of being opened.
+    fd = os.open(path, flags | os.O_NOFOLLOW, 0o600)
+    if not is_private_file(os.fstat(fd)):
+        os.close(fd)
+        raise PermissionError(
+            f"File {path} must be a regular file private to the current user"
+        )
+    return fd
@@ -0,0 +1,223 @@
+import asyncio
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+
+from src.private_files import ensure_private_directory, is_private_file
+
+# Profile of the request the current task works for, inherited by child tasks.
+current_profile: ContextVar["Profile | None"] = ContextVar(
+    "current_profile", default=None
+)
+
+Frame = tuple[str, str, int]
+
+# Shared by every storage of the process, so equal stamps still get new names.
+_profile_sequence = itertools.count()
+
+
+def _short_path(filename: str) -> str:
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    try:
+        return os.path.relpath(filename)
+    except ValueError:
+        return filename
+
+
+def _is_event_loop_frame(frame: Frame) -> bool:
+    filename, name, _ = frame
+    return name == "_run" and filename.endswith(f"asyncio{os.sep}events.py")
+
+
+def _stack(frame: FrameType | None) -> tuple[Frame, ...]:
+    frames: list[Frame] = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append((code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    frames.reverse()
+
+    # Drop event loop machinery below the task that was running.
+    for index in range(len(frames) - 1, -1, -1):
+        if _is_event_loop_frame(frames[index]):
+            return tuple(frames[index + 1 :])
+    return tuple(frames)
+
+
+@dataclass
+class Profile:
+    name: str
+    interval: float
+    started_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+    finished: bool = False
+    samples: Counter[tuple[Frame, ...]] = field(default_factory=Counter)
+
+    def to_collapsed(self) -> str:
+        """Folded stacks as used by flamegraph.pl and speedscope"""
+        lines = []
+        for stack, count in self.samples.most_common():
+            labels = (
+                f"{name} ({_short_path(filename)}:{line})"
+                for filename, name, line in stack
+            )
+            lines.append(f"{';'.join(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self) -> dict:
+        frame_indexes: dict[Frame, int] = {}
+        frames = []
+        samples = []
+        weights = []
+        for stack, count in self.samples.items():
+            sample = []
+            for frame in stack:
+                if frame not in frame_indexes:
+                    frame_indexes[frame] = len(frames)
+                    filename, name, line = frame
+                    frames.append(
+                        {"name": name, "file": _short_path(filename), "line": line}
+                    )
+                sample.append(frame_indexes[frame])
+            samples.append(sample)
+            weights.append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "directory-api",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+class SamplingProfiler:
+    """Samples event loop thread stack while a profiled task is running on it
+
+    The sampling thread only exists while at least one profile is active, so
+    unprofiled requests pay nothing.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active = 0
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id = 0
+
+    def start(self, name: str) -> Profile:
+        """Start profile of current request, must be called on event loop thread"""
+        profile = Profile(name=name, interval=self.interval)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: Profile) -> None:
+        with self._lock:
+            self._active -= 1
+            profile.finished = True
+            profile.duration = time.time() - profile.started_at
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if self._active == 0:
+                    self._thread = None
+                    return
+                self._sample()
+
+    def _sample(self) -> None:
+        assert self._loop is not None
+        task = asyncio.current_task(self._loop)
+        if task is None:
+            return
+
+        profile = task.get_context().get(current_profile)
+        if profile is None or profile.finished:
+            return
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        profile.samples[_stack(frame)] += 1
+
+
+class ProfileStorage:
+    """Directory with collapsed and speedscope files of finished profiles"""
+
+    SUFFIXES = (".collapsed", ".speedscope.json")
+
+    def __init__(self, directory: Path, max_profiles: int) -> None:
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def save(self, profile: Profile) -> str:
+        ensure_private_directory(self.directory)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(profile.started_at))
+        slug = "".join(char if char.isalnum() else "-" for char in profile.name)
+        base = f"{stamp}-{os.getpid()}-{next(_profile_sequence):06d}-{slug[:80]}"
+
+        self._write(f"{base}.collapsed", profile.to_collapsed())
+        self._write(f"{base}.speedscope.json", json.dumps(profile.to_speedscope()))
+        self._prune()
+        return base
+
+    def list(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        ensure_private_directory(self.directory)
+        files = [
+            path
+            for path in self.directory.iterdir()
+            if path.name.endswith(self.SUFFIXES) and is_private_file(path.lstat())
+        ]
+        return sorted(files, key=lambda path: path.name, reverse=True)
+
+    def get(self, name: str) -> Path | None:
+        for path in self.list():
+            if path.name == name:
+                return path
+        return None
+
+    def _write(self, name: str, content: str) -> None:
+        # O_EXCL and O_NOFOLLOW: never write through a file or symlink that
+        # is already there.
+        fd = os.open(
+            self.directory / name,
+            os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW,
+            0o600,
+        )
+        with open(fd, "w") as file:
+            file.write(content)
+
+    def _prune(self) -> None:
+        files = self.list()
+        for path in files[self.max_profiles * len(self.SUFFIXES) :]:
+            path.unlink(missing_ok=True)
@@ -1,10 +1,17 @@
+from collections.abc import Callable, Sequence
 from typing import Protocol
 from uuid import UUID
 
 from src.dto import (
+    ActivityMove,
+    ActivityTreeNode,
     BuildingFilter,
+    ChangeFilter,
+    DirectoryChangePage,
     Organization,
     OrganizationFilter,
+    OrganizationSyncResult,
+    OrganizationUpsert,
     PaginatedBuildings,
     PaginatedOrganizations,
 )
@@ -20,3 +27,21 @@ class DirectoryRepositoryProtocol(Protocol):
     ) -> Organization | None: ...
 
     async def get_buildings(self, filter: BuildingFilter) -> PaginatedBuildings: ...
+
+    async def sync_organizations(
+        self, organizations: Sequence[OrganizationUpsert]
+    ) -> OrganizationSyncResult: ...
+
+    async def move_activities(self, moves: Sequence[ActivityMove]) -> int: ...
+
+    async def get_changes(self, filter: ChangeFilter) -> DirectoryChangePage: ...
+
+    async def get_activity_tree(self) -> list[ActivityTreeNode]: ...
+
+    async def get_data_versions(self) -> dict[str, int]: ...
+
+    async def warm_up(self) -> None: ...
+
+    async def check_connection(self) -> None: ...
+
+    def add_checkout_wait_listener(self, listener: Callable[[float], None]) -> None: ...
@@ -1,3 +1,3 @@
-from .repository import PostgresDirectoryRepository
+from .repository import KeyedChanges, KeyedPage, PostgresDirectoryRepository
 
-__all__ = ["PostgresDirectoryRepository"]
+__all__ = ["KeyedChanges", "KeyedPage", "PostgresDirectoryRepository"]
@@ -0,0 +1,18 @@
+import hashlib
+import json
+
+from src.dto import OrganizationUpsert
+
+
+def organization_content_hash(organization: OrganizationUpsert) -> str:
+    """sha256 of synced organization content (phones/activities order agnostic)"""
+    payload = {
+        "name": organization.name,
+        "building": str(organization.building_uuid)
+        if organization.building_uuid
+        else None,
+        "phones": sorted(organization.phone_numbers),
+        "activities": sorted({str(uuid) for uuid in organization.activity_uuids}),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+# Errors of decoding base64 JSON whose shape is wrong: a list or number where
+# an object is expected raises TypeError, a non-string id AttributeError.
+_MALFORMED_PAYLOAD = (ValueError, KeyError, TypeError, AttributeError)
+
+
+class KeysetCursorCodec:
+    @staticmethod
+    def encode(created_at: datetime, entity_id: UUID) -> str:
+        payload = {"created_at": created_at.isoformat(), "id": str(entity_id)}
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8"))
+        return encoded.decode("utf-8")
+
+    @staticmethod
+    def decode(cursor: str) -> tuple[datetime, UUID]:
+        try:
+            decoded = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
+            payload = json.loads(decoded)
+            return datetime.fromisoformat(payload["created_at"]), UUID(payload["id"])
+        except _MALFORMED_PAYLOAD as exc:
+            raise ValueError("Invalid pagination cursor") from exc
+
+
+class SortKeyCursorCodec:
+    """Cursor of listings ordered by a text sort key instead of created_at"""
+
+    @staticmethod
+    def encode(sort: str, key: str, entity_id: UUID) -> str:
+        payload = {"sort": sort, "key": key, "id": str(entity_id)}
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8"))
+        return encoded.decode("utf-8")
+
+    @staticmethod
+    def decode(cursor: str, sort: str) -> tuple[str, UUID]:
+        try:
+            decoded = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
+            payload = json.loads(decoded)
+            if payload["sort"] != sort:
+                raise ValueError("Cursor belongs to another sort order")
+            return str(payload["key"]), UUID(payload["id"])
+        except _MALFORMED_PAYLOAD as exc:
+            raise ValueError("Invalid pagination cursor") from exc
+
+
+class SnapshotCursorCodec:
+    """Cursor of a pagination session: session id and last returned position"""
+
+    @staticmethod
+    def encode(session_id: UUID, position: int) -> str:
+        payload = {"session": str(session_id), "position": position}
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8"))
+        return encoded.decode("utf-8")
+
+    @staticmethod
+    def decode(cursor: str) -> tuple[UUID, int]:
+        try:
+            decoded = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
+            payload = json.loads(decoded)
+            return UUID(payload["session"]), int(payload["position"])
+        except _MALFORMED_PAYLOAD as exc:
+            raise ValueError("Invalid pagination cursor") from exc
+
+
+class ChangeTokenCodec:
+    @staticmethod
+    def encode(tx_id: int, seq: int) -> str:
+        payload = {"tx": tx_id, "seq": seq}
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8"))
+        return encoded.decode("utf-8")
+
+    @staticmethod
+    def decode(token: str) -> tuple[int, int]:
+        try:
+            decoded = base64.urlsafe_b64decode(token.encode("utf-8")).decode("utf-8")
+            payload = json.loads(decoded)
+            return int(payload["tx"]), int(payload["seq"])
+        except _MALFORMED_PAYLOAD as exc:
+            raise ValueError("Invalid change token") from exc
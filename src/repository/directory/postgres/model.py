@@ -2,8 +2,18 @@ import datetime
 import uuid
 
 from geoalchemy2 import Geography
-from sqlalchemy import VARCHAR, DateTime, ForeignKey, Index, PrimaryKeyConstraint, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    BIGINT,
+    INTEGER,
+    VARCHAR,
+    DateTime,
+    ForeignKey,
+    Identity,
+    Index,
+    PrimaryKeyConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database import Base
@@ -19,6 +29,12 @@ class Organization(Base):
             postgresql_ops={"name": "gin_trgm_ops"},
         ),
         Index("ix_organization_created_at_id", "created_at", "id"),
+        Index(
+            "ix_organization_building_id_created_at_id",
+            "building_id",
+            "created_at",
+            "id",
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -34,7 +50,6 @@ class Organization(Base):
         UUID(as_uuid=True),
         ForeignKey("building.id", ondelete="SET NULL"),
         nullable=True,
-        index=True,
     )
 
     created_at: Mapped[datetime.datetime] = mapped_column(
@@ -43,10 +58,29 @@ class Organization(Base):
         server_default=text("CURRENT_TIMESTAMP"),
     )
 
+    # sha256 of synced content (name, building, phones, activities),
+    # lets bulk sync skip rows that did not change.
+    content_hash: Mapped[str | None] = mapped_column(
+        VARCHAR(64),
+        nullable=True,
+    )
+
 
 class Building(Base):
     __tablename__ = "building"
-    __table_args__ = (Index("ix_building_created_at_id", "created_at", "id"),)
+    __table_args__ = (
+        Index("ix_building_created_at_id", "created_at", "id"),
+        Index(
+            "ix_building_address_sort",
+            text("(lower(address) COLLATE directory_sort)"),
+            "id",
+        ),
+        Index(
+            "ix_building_location_geometry",
+            text("(location::geometry)"),
+            postgresql_using="gist",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
@@ -90,20 +124,25 @@ class Activity(Base):
 
 class OrganizationActivity(Base):
     __tablename__ = "organization_activity"
-    __table_args__ = (PrimaryKeyConstraint("organization_id", "activity_id"),)
+    __table_args__ = (
+        PrimaryKeyConstraint("organization_id", "activity_id"),
+        Index(
+            "ix_organization_activity_activity_id_organization_id",
+            "activity_id",
+            "organization_id",
+        ),
+    )
 
     organization_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("organization.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     activity_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("activity.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
 
@@ -117,9 +156,301 @@ class OrganizationPhoneNumber(Base):
         UUID(as_uuid=True),
         ForeignKey("organization.id", ondelete="SET NULL"),
         nullable=True,
+        index=True,
     )
 
     phone_number: Mapped[str] = mapped_column(
         VARCHAR(255),
         nullable=False,
     )
+
+
+class OrganizationSearch(Base):
+    """Denormalized listing row per organization, maintained by triggers"""
+
+    __tablename__ = "organization_search"
+    __table_args__ = (
+        # Range partitioned by month; the partition key has to be part of the
+        # primary key, which therefore matches the keyset order.
+        PrimaryKeyConstraint("created_at", "organization_id"),
+        Index("ix_organization_search_organization_id", "organization_id"),
+        Index(
+            "ix_organization_search_building_id_created_at_organization_id",
+            "building_id",
+            "created_at",
+            "organization_id",
+        ),
+        Index(
+            "ix_organization_search_name_sort",
+            text("(lower(name) COLLATE directory_sort)"),
+            "organization_id",
+        ),
+        Index(
+            "ix_organization_search_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_organization_search_direct_activity_ids",
+            "direct_activity_ids",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_organization_search_activity_ids",
+            "activity_ids",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_organization_search_location",
+            "location",
+            postgresql_using="gist",
+        ),
+        Index(
+            "ix_organization_search_location_geometry",
+            text("(location::geometry)"),
+            postgresql_using="gist",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organization.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    name: Mapped[str] = mapped_column(
+        VARCHAR(255),
+        nullable=False,
+    )
+
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    building_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=True,
+    )
+
+    building_address: Mapped[str | None] = mapped_column(
+        VARCHAR(255),
+        nullable=True,
+    )
+
+    location: Mapped[object | None] = mapped_column(
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False),
+        nullable=True,
+    )
+
+    direct_activity_ids: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)),
+        nullable=False,
+        server_default=text("'{}'"),
+    )
+
+    # Linked activities together with all their ancestors, so "activity with
+    # children" filters become a single array containment check.
+    activity_ids: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)),
+        nullable=False,
+        server_default=text("'{}'"),
+    )
+
+
+class DirectoryChange(Base):
+    """Change log filled by triggers on every directory table write"""
+
+    __tablename__ = "directory_change"
+    __table_args__ = (Index("ix_directory_change_tx_id_seq", "tx_id", "seq"),)
+
+    seq: Mapped[int] = mapped_column(BIGINT, Identity(always=True), primary_key=True)
+
+    entity: Mapped[str] = mapped_column(
+        VARCHAR(32),
+        nullable=False,
+    )
+
+    entity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+    )
+
+    op: Mapped[str] = mapped_column(
+        VARCHAR(8),
+        nullable=False,
+    )
+
+    # Id of the writing transaction. Feed is ordered by (tx_id, seq) and only
+    # exposes finished transactions, so late commits are never skipped.
+    tx_id: Mapped[int] = mapped_column(
+        BIGINT,
+        nullable=False,
+        server_default=text("pg_current_xact_id()::text::bigint"),
+    )
+
+    changed_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+
+
+class DirectoryChangeHorizon(Base):
+    """Single row with the last change log position removed by pruning"""
+
+    __tablename__ = "directory_change_horizon"
+
+    id: Mapped[int] = mapped_column(INTEGER, primary_key=True)
+
+    # Change tokens before this position expired, their changes are gone.
+    tx_id: Mapped[int] = mapped_column(
+        BIGINT,
+        nullable=False,
+        server_default=text("0"),
+    )
+
+    seq: Mapped[int] = mapped_column(
+        BIGINT,
+        nullable=False,
+        server_default=text("0"),
+    )
+
+    pruned_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+
+class DirectoryDataVersion(Base):
+    """Per-table write counter bumped by statement-level triggers"""
+
+    __tablename__ = "directory_data_version"
+
+    table_name: Mapped[str] = mapped_column(VARCHAR(64), primary_key=True)
+
+    version: Mapped[int] = mapped_column(
+        BIGINT,
+        nullable=False,
+        server_default=text("0"),
+    )
+
+
+class PaginationSession(Base):
+    """Snapshot of a filter's matches that later pages are sliced from"""
+
+    __tablename__ = "pagination_session"
+    # Sessions are short-lived and can be recreated, so they skip the WAL.
+    __table_args__ = (
+        Index("ix_pagination_session_expires_at", "expires_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
+    )
+
+    # Digest of the filter the session was created for.
+    filter_digest: Mapped[str] = mapped_column(
+        VARCHAR(64),
+        nullable=False,
+    )
+
+    expires_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+
+class PaginationSessionItem(Base):
+    __tablename__ = "pagination_session_item"
+    __table_args__ = (
+        PrimaryKeyConstraint("session_id", "position"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+    session_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("pagination_session.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    position: Mapped[int] = mapped_column(
+        BIGINT,
+        nullable=False,
+    )
+
+    # No foreign key: deleted organizations are skipped when a page is read.
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+    )
+
+
+class DirectoryImport(Base):
+    """Import of a source file, kept to resume it after a failure"""
+
+    __tablename__ = "directory_import"
+
+    # Resolved path of the source file.
+    source: Mapped[str] = mapped_column(VARCHAR(1024), primary_key=True)
+
+    # Size, content and batch size the import started with; resuming needs
+    # the same file cut into the same batches.
+    file_size: Mapped[int] = mapped_column(
+        BIGINT,
+        nullable=False,
+    )
+
+    # SHA-256 of the file, hex encoded.
+    file_hash: Mapped[str] = mapped_column(
+        VARCHAR(64),
+        nullable=False,
+    )
+
+    batch_size: Mapped[int] = mapped_column(
+        INTEGER,
+        nullable=False,
+    )
+
+    started_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+
+    finished_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+
+class DirectoryImportBatch(Base):
+    """Batch committed together with the rows it loaded"""
+
+    __tablename__ = "directory_import_batch"
+    __table_args__ = (PrimaryKeyConstraint("source", "batch_number"),)
+
+    source: Mapped[str] = mapped_column(
+        VARCHAR(1024),
+        ForeignKey("directory_import.source", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    batch_number: Mapped[int] = mapped_column(
+        INTEGER,
+        nullable=False,
+    )
+
+    records: Mapped[int] = mapped_column(
+        INTEGER,
+        nullable=False,
+    )
+
+    committed_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
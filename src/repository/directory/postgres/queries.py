@@ -0,0 +1,699 @@
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from geoalchemy2 import Geometry
+from sqlalchemy import (
+    BIGINT,
+    TEXT,
+    ColumnElement,
+    Delete,
+    Insert,
+    Interval,
+    Select,
+    Update,
+    any_,
+    cast,
+    delete,
+    distinct,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
+
+from src.dto import (
+    ActivityMatch,
+    ActivityMove,
+    BuildingFilter,
+    BuildingSort,
+    OrganizationActivityFilter,
+    OrganizationFilter,
+    OrganizationSort,
+    OrganizationUpsert,
+)
+
+from .cursor import KeysetCursorCodec, SortKeyCursorCodec
+from .model import (
+    Activity as ActivityModel,
+)
+from .model import (
+    Building as BuildingModel,
+)
+from .model import DirectoryChange as DirectoryChangeModel
+from .model import DirectoryChangeHorizon as DirectoryChangeHorizonModel
+from .model import DirectoryDataVersion as DirectoryDataVersionModel
+from .model import Organization as OrganizationModel
+from .model import OrganizationActivity as OrganizationActivityModel
+from .model import OrganizationPhoneNumber as OrganizationPhoneNumberModel
+from .model import OrganizationSearch as OrganizationSearchModel
+from .model import PaginationSession as PaginationSessionModel
+from .model import PaginationSessionItem as PaginationSessionItemModel
+
+
+# ICU root collation created by the migrations, alphabetical order that does
+# not depend on the database locale.
+SORT_COLLATION = "directory_sort"
+
+
+def text_sort_key(column: ColumnElement) -> ColumnElement:
+    """Case-insensitive alphabetical sort key of a text column.
+
+    Indexes on this exact expression serve the alphabetical keyset order.
+    """
+    return func.lower(column).collate(SORT_COLLATION)
+
+
+def sort_key_ranks_query(keys: Sequence[str]) -> Select:
+    """Build query ranking text sort keys in the order text_sort_key() sorts"""
+    key = (
+        func.unnest(literal(list(keys), ARRAY(TEXT)))
+        .table_valued("key")
+        .render_derived(name="sort_keys")
+        .c.key
+    )
+    return Select(
+        key.label("srt_key"),
+        func.dense_rank().over(order_by=key.collate(SORT_COLLATION)).label("srt_rank"),
+    )
+
+
+def _keyset_after(
+    key: ColumnElement,
+    entity_id: ColumnElement,
+    cursor_key: ColumnElement,
+    cursor_id: ColumnElement,
+    descending: bool = False,
+) -> ColumnElement:
+    # Row comparison is an index range condition on (key, id); the
+    # equivalent OR form makes deep pages scan from the start.
+    if descending:
+        return tuple_(key, entity_id) < tuple_(cursor_key, cursor_id)
+    return tuple_(key, entity_id) > tuple_(cursor_key, cursor_id)
+
+
+def _organization_sort_key(filter: OrganizationFilter) -> ColumnElement:
+    if filter.sort == OrganizationSort.CREATED_AT:
+        return OrganizationSearchModel.created_at
+    return text_sort_key(OrganizationSearchModel.name)
+
+
+def _organization_order(filter: OrganizationFilter) -> tuple[ColumnElement, ...]:
+    sort_key = _organization_sort_key(filter)
+    if filter.sort == OrganizationSort.NAME_DESC:
+        return (sort_key.desc(), OrganizationSearchModel.organization_id.desc())
+    return (sort_key.asc(), OrganizationSearchModel.organization_id.asc())
+
+
+def _organization_columns() -> tuple[ColumnElement, ...]:
+    return (
+        OrganizationSearchModel.organization_id.label("org_id"),
+        OrganizationSearchModel.name.label("org_name"),
+        OrganizationSearchModel.building_id.label("bld_id"),
+        OrganizationSearchModel.building_address.label("bld_address"),
+        func.ST_Y(cast(OrganizationSearchModel.location, Geometry)).label("bld_lat"),
+        func.ST_X(cast(OrganizationSearchModel.location, Geometry)).label("bld_lon"),
+    )
+
+
+def _organization_conditions(filter: OrganizationFilter) -> list[ColumnElement]:
+    conditions: list[ColumnElement] = []
+
+    if filter.name:
+        conditions.append(OrganizationSearchModel.name.ilike(f"%{filter.name}%"))
+
+    if filter.building_uuids:
+        conditions.append(
+            _matches_any(OrganizationSearchModel.building_id, filter.building_uuids)
+        )
+
+    if filter.activity:
+        conditions.append(_activity_condition(filter.activity))
+
+    if filter.within_radius:
+        conditions.append(
+            func.ST_DWithin(
+                OrganizationSearchModel.location,
+                cast(
+                    func.ST_SetSRID(
+                        func.ST_MakePoint(
+                            filter.within_radius.center_long,
+                            filter.within_radius.center_lat,
+                        ),
+                        4326,
+                    ),
+                    Geometry("POINT", srid=4326),
+                ),
+                filter.within_radius.radius,
+            )
+        )
+
+    if filter.within_bounding_box:
+        conditions.append(
+            func.ST_Within(
+                # Plain ``location::geometry`` cast (without typmod) matches
+                # ix_organization_search_location_geometry expression index.
+                cast(OrganizationSearchModel.location, Geometry(geometry_type=None)),
+                func.ST_MakeEnvelope(
+                    filter.within_bounding_box.min_long,
+                    filter.within_bounding_box.min_lat,
+                    filter.within_bounding_box.max_long,
+                    filter.within_bounding_box.max_lat,
+                    4326,
+                ),
+            )
+        )
+
+    return conditions
+
+
+def organizations_query(filter: OrganizationFilter) -> Select:
+    """Build organizations page query (one extra row to detect next page)"""
+    sort_key = _organization_sort_key(filter)
+
+    # Every filter is answered from the denormalized organization_search row,
+    # so the page is a single-table plan without joins.
+    stmt = Select(sort_key.label("sort_key"), *_organization_columns()).where(
+        *_organization_conditions(filter)
+    )
+
+    if filter.pagination.cursor and filter.sort == OrganizationSort.CREATED_AT:
+        cursor_created_at, cursor_id = KeysetCursorCodec.decode(
+            filter.pagination.cursor
+        )
+        # Partition pruning does not look into row comparisons, so the
+        # redundant created_at bound skips partitions before the cursor.
+        stmt = stmt.where(
+            _keyset_after(
+                OrganizationSearchModel.created_at,
+                OrganizationSearchModel.organization_id,
+                literal(cursor_created_at, OrganizationSearchModel.created_at.type),
+                literal(cursor_id, OrganizationSearchModel.organization_id.type),
+            ),
+            OrganizationSearchModel.created_at
+            >= literal(cursor_created_at, OrganizationSearchModel.created_at.type),
+        )
+    elif filter.pagination.cursor:
+        cursor_key, cursor_id = SortKeyCursorCodec.decode(
+            filter.pagination.cursor, filter.sort
+        )
+        stmt = stmt.where(
+            _keyset_after(
+                sort_key,
+                OrganizationSearchModel.organization_id,
+                literal(cursor_key, TEXT),
+                literal(cursor_id, OrganizationSearchModel.organization_id.type),
+                descending=filter.sort == OrganizationSort.NAME_DESC,
+            )
+        )
+
+    return stmt.order_by(*_organization_order(filter)).limit(
+        filter.pagination.limit + 1
+    )
+
+
+def pagination_sessions_expired_delete_query() -> Delete:
+    """Build delete of expired pagination sessions, items go by cascade"""
+    return delete(PaginationSessionModel).where(
+        PaginationSessionModel.expires_at <= func.now()
+    )
+
+
+def pagination_session_insert_query(filter_digest: str, ttl: float) -> Insert:
+    """Build pagination session insert returning the session id"""
+    return (
+        insert(PaginationSessionModel)
+        .values(
+            filter_digest=filter_digest,
+            expires_at=func.now() + literal(timedelta(seconds=ttl), Interval),
+        )
+        .returning(PaginationSessionModel.id.label("session_id"))
+    )
+
+
+def pagination_session_items_insert_query(
+    session_id: UUID, filter: OrganizationFilter, max_rows: int
+) -> Insert:
+    """Build insert of the ordered ids of organizations matching the filter
+
+    One row past max_rows is stored, so an oversized session can be detected
+    by pagination_session_overflow_query().
+    """
+    order = _organization_order(filter)
+    # Ids and positions are computed and stored inside PostgreSQL, the
+    # matches are never sent to the application.
+    matches = (
+        Select(
+            literal(session_id, PG_UUID(as_uuid=True)),
+            func.row_number().over(order_by=order),
+            OrganizationSearchModel.organization_id,
+        )
+        .where(*_organization_conditions(filter))
+        .order_by(*order)
+        .limit(max_rows + 1)
+    )
+    return insert(PaginationSessionItemModel).from_select(
+        ["session_id", "position", "organization_id"], matches
+    )
+
+
+def pagination_session_overflow_query(session_id: UUID, max_rows: int) -> Select:
+    """Build check whether the session stored more than max_rows positions"""
+    return Select(PaginationSessionItemModel.position.label("position")).where(
+        PaginationSessionItemModel.session_id == session_id,
+        PaginationSessionItemModel.position > max_rows,
+    )
+
+
+def pagination_session_query(session_id: UUID) -> Select:
+    """Build query for a pagination session that has not expired"""
+    return Select(PaginationSessionModel.filter_digest).where(
+        PaginationSessionModel.id == session_id,
+        PaginationSessionModel.expires_at > func.now(),
+    )
+
+
+def pagination_session_page_query(
+    session_id: UUID, after_position: int, limit: int
+) -> Select:
+    """Build query for the organizations stored after a session position.
+
+    Deleted organizations keep their positions with NULL columns, so the page
+    boundaries do not move; one extra row detects the next page.
+    """
+    return (
+        Select(PaginationSessionItemModel.position, *_organization_columns())
+        .select_from(PaginationSessionItemModel)
+        .outerjoin(
+            OrganizationSearchModel,
+            OrganizationSearchModel.organization_id
+            == PaginationSessionItemModel.organization_id,
+        )
+        .where(
+            PaginationSessionItemModel.session_id == session_id,
+            PaginationSessionItemModel.position > after_position,
+        )
+        .order_by(PaginationSessionItemModel.position.asc())
+        .limit(limit + 1)
+    )
+
+
+def _matches_any(column: ColumnElement, values: Sequence[UUID]) -> ColumnElement:
+    # Plain equality for a single value keeps ordered index scans available.
+    if len(values) == 1:
+        return column == values[0]
+    return column == any_(uuid_array(values))
+
+
+def _activity_condition(activity_filter: OrganizationActivityFilter) -> ColumnElement:
+    # activity_ids already contains ancestors of linked activities, so an
+    # organization is in a subtree exactly when the subtree root is in it.
+    column = (
+        OrganizationSearchModel.activity_ids
+        if activity_filter.include_children
+        else OrganizationSearchModel.direct_activity_ids
+    )
+    roots = uuid_array(activity_filter.activity_uuids)
+    if activity_filter.match == ActivityMatch.ALL:
+        return column.contains(roots)
+    return column.overlap(roots)
+
+
+def organization_query(organization_uuid: UUID) -> Select:
+    """Build organization detail query"""
+    return (
+        Select(
+            OrganizationModel.id.label("org_id"),
+            OrganizationModel.name.label("org_name"),
+            BuildingModel.id.label("bld_id"),
+            BuildingModel.address.label("bld_address"),
+            func.ST_Y(cast(BuildingModel.location, Geometry)).label("bld_lat"),
+            func.ST_X(cast(BuildingModel.location, Geometry)).label("bld_lon"),
+        ).outerjoin(BuildingModel)
+    ).where(OrganizationModel.id == organization_uuid)
+
+
+def organization_phone_numbers_query(organization_uuid: UUID) -> Select:
+    """Build organization phone numbers query"""
+    return Select(OrganizationPhoneNumberModel).where(
+        OrganizationPhoneNumberModel.organization_id == organization_uuid
+    )
+
+
+def organization_activities_query(organization_uuid: UUID) -> Select:
+    """Build organization activities query"""
+    return (
+        Select(
+            ActivityModel.id.label("act_id"),
+            ActivityModel.name.label("act_name"),
+        )
+        .join(
+            OrganizationActivityModel,
+            OrganizationActivityModel.activity_id == ActivityModel.id,
+        )
+        .where(OrganizationActivityModel.organization_id == organization_uuid)
+        .order_by(ActivityModel.name.asc(), ActivityModel.id.asc())
+    )
+
+
+def buildings_query(filter: BuildingFilter) -> Select:
+    """Build buildings page query (one extra row to detect next page)"""
+    sort_key = (
+        BuildingModel.created_at
+        if filter.sort == BuildingSort.CREATED_AT
+        else text_sort_key(BuildingModel.address)
+    )
+    stmt = Select(
+        sort_key.label("sort_key"),
+        BuildingModel.id.label("bld_id"),
+        BuildingModel.address.label("bld_address"),
+        func.ST_Y(cast(BuildingModel.location, Geometry)).label("bld_lat"),
+        func.ST_X(cast(BuildingModel.location, Geometry)).label("bld_lon"),
+    )
+
+    if filter.pagination.cursor and filter.sort == BuildingSort.CREATED_AT:
+        cursor_created_at, cursor_id = KeysetCursorCodec.decode(
+            filter.pagination.cursor
+        )
+        stmt = stmt.where(
+            _keyset_after(
+                BuildingModel.created_at,
+                BuildingModel.id,
+                literal(cursor_created_at, BuildingModel.created_at.type),
+                literal(cursor_id, BuildingModel.id.type),
+            )
+        )
+    elif filter.pagination.cursor:
+        cursor_key, cursor_id = SortKeyCursorCodec.decode(
+            filter.pagination.cursor, filter.sort
+        )
+        stmt = stmt.where(
+            _keyset_after(
+                sort_key,
+                BuildingModel.id,
+                literal(cursor_key, TEXT),
+                literal(cursor_id, BuildingModel.id.type),
+            )
+        )
+
+    return stmt.order_by(sort_key.asc(), BuildingModel.id.asc()).limit(
+        filter.pagination.limit + 1
+    )
+
+
+def uuid_array(values: Sequence[UUID]) -> ColumnElement:
+    """Single ``uuid[]`` bind parameter, used as ``column = ANY(...)``"""
+    return literal(list(values), ARRAY(PG_UUID(as_uuid=True)))
+
+
+def organizations_phone_numbers_query(organization_uuids: Sequence[UUID]) -> Select:
+    """Build phone numbers query for a page of organizations"""
+    return Select(
+        OrganizationPhoneNumberModel.organization_id.label("org_id"),
+        OrganizationPhoneNumberModel.phone_number,
+    ).where(
+        OrganizationPhoneNumberModel.organization_id
+        == any_(uuid_array(organization_uuids))
+    )
+
+
+def organizations_activities_query(organization_uuids: Sequence[UUID]) -> Select:
+    """Build activities query for a page of organizations"""
+    return (
+        Select(
+            OrganizationActivityModel.organization_id.label("org_id"),
+            ActivityModel.id.label("act_id"),
+            ActivityModel.name.label("act_name"),
+        )
+        .join(
+            OrganizationActivityModel,
+            OrganizationActivityModel.activity_id == ActivityModel.id,
+        )
+        .where(
+            OrganizationActivityModel.organization_id
+            == any_(uuid_array(organization_uuids))
+        )
+        .order_by(ActivityModel.name.asc(), ActivityModel.id.asc())
+    )
+
+
+def organization_hashes_query(organization_uuids: Sequence[UUID]) -> Select:
+    """Build query for stored content hashes of organizations"""
+    return Select(
+        OrganizationModel.id.label("org_id"),
+        OrganizationModel.content_hash.label("org_content_hash"),
+    ).where(OrganizationModel.id == any_(uuid_array(organization_uuids)))
+
+
+def building_ids_query(building_uuids: Sequence[UUID]) -> Select:
+    """Build query for ids of existing buildings"""
+    return Select(BuildingModel.id.label("bld_id")).where(
+        BuildingModel.id == any_(uuid_array(building_uuids))
+    )
+
+
+def activity_ids_query(activity_uuids: Sequence[UUID]) -> Select:
+    """Build query for ids of existing activities"""
+    return Select(ActivityModel.id.label("act_id")).where(
+        ActivityModel.id == any_(uuid_array(activity_uuids))
+    )
+
+
+def activities_reparent_query(moves: Sequence[ActivityMove]) -> Update:
+    """Build single statement setting new parents, returning moved activities"""
+    # Two array parameters whatever the batch size, so the tree check trigger
+    # sees every move of the batch in one statement.
+    targets = (
+        func.unnest(
+            uuid_array([move.activity_uuid for move in moves]),
+            uuid_array([move.parent_uuid for move in moves]),
+        )
+        .table_valued("activity_id", "parent_id")
+        .render_derived(name="moves")
+    )
+    return (
+        update(ActivityModel)
+        .where(
+            ActivityModel.id == targets.c.activity_id,
+            ActivityModel.parent_id.is_distinct_from(targets.c.parent_id),
+        )
+        .values(parent_id=targets.c.parent_id)
+        .returning(ActivityModel.id.label("act_id"))
+    )
+
+
+def organizations_upsert_query(
+    organizations: Sequence[OrganizationUpsert], content_hashes: dict[UUID, str]
+) -> Insert:
+    """Build multi-row upsert returning only rows that were actually written"""
+    stmt = pg_insert(OrganizationModel).values(
+        [
+            {
+                "id": organization.uuid,
+                "name": organization.name,
+                "building_id": organization.building_uuid,
+                "content_hash": content_hashes[organization.uuid],
+            }
+            for organization in organizations
+        ]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[OrganizationModel.id],
+        set_={
+            "name": stmt.excluded.name,
+            "building_id": stmt.excluded.building_id,
+            "content_hash": stmt.excluded.content_hash,
+        },
+        where=OrganizationModel.content_hash.is_distinct_from(
+            stmt.excluded.content_hash
+        ),
+    ).returning(
+        OrganizationModel.id.label("org_id"),
+        # xmax is zero only for freshly inserted row versions.
+        literal_column("(organization.xmax = 0)").label("inserted"),
+    )
+
+
+def organization_phone_numbers_delete_query(
+    organization_uuids: Sequence[UUID],
+) -> Delete:
+    """Build query deleting phone numbers of organizations"""
+    return delete(OrganizationPhoneNumberModel).where(
+        OrganizationPhoneNumberModel.organization_id
+        == any_(uuid_array(organization_uuids))
+    )
+
+
+def organization_activities_delete_query(organization_uuids: Sequence[UUID]) -> Delete:
+    """Build query deleting activity links of organizations"""
+    return delete(OrganizationActivityModel).where(
+        OrganizationActivityModel.organization_id
+        == any_(uuid_array(organization_uuids))
+    )
+
+
+def organization_phone_numbers_insert_query(rows: Sequence[dict]) -> Insert:
+    """Build multi-row insert of organization phone numbers"""
+    return insert(OrganizationPhoneNumberModel).values(list(rows))
+
+
+def organization_activities_insert_query(rows: Sequence[dict]) -> Insert:
+    """Build multi-row insert of organization activity links"""
+    return insert(OrganizationActivityModel).values(list(rows))
+
+
+def _snapshot_xmin() -> ColumnElement[int]:
+    """Oldest transaction id still running as seen by the current snapshot"""
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), TEXT), BIGINT)
+
+
+def changes_query(since_tx_id: int, since_seq: int, limit: int) -> Select:
+    """Build change log page query (one extra row to detect more changes)"""
+    # Every transaction older than snapshot xmin is finished, so rows below it
+    # are final and no later commit can land before the returned position.
+    return (
+        Select(
+            DirectoryChangeModel.seq.label("chg_seq"),
+            DirectoryChangeModel.tx_id.label("chg_tx_id"),
+            DirectoryChangeModel.entity.label("chg_entity"),
+            DirectoryChangeModel.entity_id.label("chg_entity_id"),
+            DirectoryChangeModel.op.label("chg_op"),
+        )
+        .where(
+            tuple_(DirectoryChangeModel.tx_id, DirectoryChangeModel.seq)
+            > tuple_(
+                literal(since_tx_id, BIGINT),
+                literal(since_seq, BIGINT),
+            ),
+            DirectoryChangeModel.tx_id < _snapshot_xmin(),
+        )
+        .order_by(DirectoryChangeModel.tx_id.asc(), DirectoryChangeModel.seq.asc())
+        .limit(limit + 1)
+    )
+
+
+def change_horizon_query() -> Select:
+    """Build query of the last change log position removed by pruning"""
+    return Select(
+        DirectoryChangeHorizonModel.tx_id.label("hor_tx_id"),
+        DirectoryChangeHorizonModel.seq.label("hor_seq"),
+    )
+
+
+def changes_prune_query(before: datetime) -> Select:
+    """Build delete of the change log prefix recorded before the moment
+
+    The horizon is the last (tx_id, seq) position of a change older than the
+    moment in a transaction below snapshot xmin. Everything up to the horizon
+    is removed, also younger changes of earlier transactions: the feed is
+    ordered by position, so only a prefix of it can be pruned. No transaction
+    still running can later commit a change behind the horizon.
+
+    Returns one row with the horizon and the removed count, or nothing when no
+    change is old enough.
+    """
+    horizon = (
+        Select(DirectoryChangeModel.tx_id, DirectoryChangeModel.seq)
+        .where(
+            DirectoryChangeModel.changed_at < before,
+            DirectoryChangeModel.tx_id < _snapshot_xmin(),
+        )
+        .order_by(DirectoryChangeModel.tx_id.desc(), DirectoryChangeModel.seq.desc())
+        .limit(1)
+        .cte("horizon")
+    )
+    pruned = (
+        delete(DirectoryChangeModel)
+        .where(
+            tuple_(DirectoryChangeModel.tx_id, DirectoryChangeModel.seq)
+            <= tuple_(horizon.c.tx_id, horizon.c.seq)
+        )
+        .returning(DirectoryChangeModel.seq)
+        .cte("pruned")
+    )
+    return Select(
+        horizon.c.tx_id.label("chg_tx_id"),
+        horizon.c.seq.label("chg_seq"),
+        select(func.count())
+        .select_from(pruned)
+        .scalar_subquery()
+        .label("pruned_count"),
+    )
+
+
+def change_horizon_update_query(tx_id: int, seq: int) -> Update:
+    """Build move of the pruning horizon forward to the position"""
+    position = tuple_(literal(tx_id, BIGINT), literal(seq, BIGINT))
+    return (
+        update(DirectoryChangeHorizonModel)
+        .where(
+            tuple_(DirectoryChangeHorizonModel.tx_id, DirectoryChangeHorizonModel.seq)
+            < position
+        )
+        .values(tx_id=tx_id, seq=seq, pruned_at=func.now())
+    )
+
+
+def data_versions_query() -> Select:
+    """Build query of all table data versions"""
+    return Select(
+        DirectoryDataVersionModel.table_name, DirectoryDataVersionModel.version
+    )
+
+
+def activity_tree_query() -> Select:
+    """Build query of all activities with direct and subtree organization counts"""
+    # Every activity paired with itself and each of its descendants.
+    subtree = select(
+        ActivityModel.id.label("root_id"), ActivityModel.id.label("activity_id")
+    ).cte("activity_subtree", recursive=True)
+    child = aliased(ActivityModel)
+    subtree = subtree.union_all(
+        select(subtree.c.root_id, child.id).where(
+            child.parent_id == subtree.c.activity_id
+        )
+    )
+
+    subtree_counts = (
+        select(
+            subtree.c.root_id,
+            # Organization linked to several activities of a subtree counts once.
+            func.count(distinct(OrganizationActivityModel.organization_id)).label(
+                "subtree_count"
+            ),
+        )
+        .join(
+            OrganizationActivityModel,
+            OrganizationActivityModel.activity_id == subtree.c.activity_id,
+        )
+        .group_by(subtree.c.root_id)
+        .subquery()
+    )
+    direct_counts = (
+        select(
+            OrganizationActivityModel.activity_id,
+            func.count().label("direct_count"),
+        )
+        .group_by(OrganizationActivityModel.activity_id)
+        .subquery()
+    )
+
+    return (
+        Select(
+            ActivityModel.id.label("act_id"),
+            ActivityModel.name.label("act_name"),
+            ActivityModel.parent_id.label("act_parent_id"),
+            func.coalesce(direct_counts.c.direct_count, 0).label("direct_count"),
+            func.coalesce(subtree_counts.c.subtree_count, 0).label("subtree_count"),
+        )
+        .outerjoin(direct_counts, direct_counts.c.activity_id == ActivityModel.id)
+        .outerjoin(subtree_counts, subtree_counts.c.root_id == ActivityModel.id)
+        .order_by(ActivityModel.name.asc(), ActivityModel.id.asc())
+    )
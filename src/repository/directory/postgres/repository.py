@@ -1,222 +1,322 @@
-import base64
-import json
+import hashlib
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
 from datetime import datetime
 from uuid import UUID
 
-from geoalchemy2 import Geometry
-from sqlalchemy import Select, and_, cast, func, or_, select
+from sqlalchemy import RowMapping
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection
 
 from src.database import Database
 from src.dto import (
     Activity,
+    ActivityMove,
+    ActivityTreeNode,
     Building,
     BuildingFilter,
+    ChangeFilter,
+    DirectoryChange,
+    DirectoryChangePage,
     Organization,
+    OrganizationExpand,
     OrganizationFilter,
     OrganizationPhoneNumber,
+    OrganizationSyncResult,
+    OrganizationUpsert,
     PaginatedBuildings,
     PaginatedOrganizations,
+    PaginationParams,
 )
+from src.tracing import traced
 
-from .model import (
-    Activity as ActivityModel,
+from .content_hash import organization_content_hash
+from .cursor import (
+    ChangeTokenCodec,
+    KeysetCursorCodec,
+    SnapshotCursorCodec,
+    SortKeyCursorCodec,
 )
-from .model import (
-    Building as BuildingModel,
+from .queries import (
+    activities_reparent_query,
+    activity_ids_query,
+    activity_tree_query,
+    building_ids_query,
+    buildings_query,
+    change_horizon_query,
+    change_horizon_update_query,
+    changes_prune_query,
+    changes_query,
+    data_versions_query,
+    organization_activities_delete_query,
+    organization_activities_insert_query,
+    organization_activities_query,
+    organization_hashes_query,
+    organization_phone_numbers_delete_query,
+    organization_phone_numbers_insert_query,
+    organization_phone_numbers_query,
+    organization_query,
+    organizations_activities_query,
+    organizations_phone_numbers_query,
+    organizations_query,
+    organizations_upsert_query,
+    pagination_session_insert_query,
+    pagination_session_items_insert_query,
+    pagination_session_overflow_query,
+    pagination_session_page_query,
+    pagination_session_query,
+    pagination_sessions_expired_delete_query,
+    sort_key_ranks_query,
 )
-from .model import Organization as OrganizationModel
-from .model import OrganizationActivity as OrganizationActivityModel
-from .model import OrganizationPhoneNumber as OrganizationPhoneNumberModel
 
+# Keeps multi-row statements well below asyncpg 32767 bind parameters limit.
+WRITE_CHUNK_SIZE = 5000
 
-class KeysetCursorCodec:
-    @staticmethod
-    def encode(created_at: datetime, entity_id: UUID) -> str:
-        payload = {"created_at": created_at.isoformat(), "id": str(entity_id)}
-        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8"))
-        return encoded.decode("utf-8")
+# Lookup key for warm-up statements, matches no row.
+WARM_UP_UUID = UUID(int=0)
 
-    @staticmethod
-    def decode(cursor: str) -> tuple[datetime, UUID]:
-        try:
-            decoded = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
-            payload = json.loads(decoded)
-            return datetime.fromisoformat(payload["created_at"]), UUID(payload["id"])
-        except (ValueError, KeyError, json.JSONDecodeError) as exc:
-            raise ValueError("Invalid pagination cursor") from exc
+# PostgreSQL raise_exception, used by RAISE EXCEPTION in trigger functions.
+RAISE_EXCEPTION_SQLSTATE = "P0001"
+
+DEFAULT_SNAPSHOT_TTL = 300.0
+DEFAULT_SNAPSHOT_MAX_ROWS = 100_000
+
+
+def _organization_from_row(row: RowMapping) -> Organization:
+    return Organization(
+        uuid=row.org_id,
+        name=row.org_name,
+        phone_numbers=[],
+        building=Building(
+            uuid=row.bld_id,
+            address=row.bld_address,
+            coordinate_lat=row.bld_lat,
+            coordinate_long=row.bld_lon,
+        )
+        if row.bld_id
+        else None,
+    )
+
+
+def _snapshot_filter_digest(filter: OrganizationFilter) -> str:
+    # Later pages may change page size and expanded relations, not matches.
+    matches = filter.model_dump_json(exclude={"pagination", "expand"})
+    return hashlib.sha256(matches.encode("utf-8")).hexdigest()
+
+
+def _raised_message(exc: DBAPIError) -> str | None:
+    """Message of RAISE EXCEPTION in a trigger, None for any other error"""
+    error = exc.orig.__cause__ or exc.orig
+    if getattr(error, "sqlstate", None) != RAISE_EXCEPTION_SQLSTATE:
+        return None
+    return getattr(error, "message", None) or str(error)
+
+
+def _chunked[T](
+    items: Sequence[T], size: int = WRITE_CHUNK_SIZE
+) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@dataclass(slots=True)
+class KeyedPage[PageItem: (Organization, Building)]:
+    """Page items together with their (sort key, uuid) keyset values"""
+
+    rows: list[tuple[datetime | str, PageItem]]
+    has_next: bool
+    # Listing order; keys are created_at timestamps for the default order
+    # and text sort keys for the others.
+    sort: str = "created_at"
+
+    @property
+    def items(self) -> list[PageItem]:
+        return [item for _, item in self.rows]
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not self.has_next or not self.rows:
+            return None
+        key, item = self.rows[-1]
+        if isinstance(key, datetime):
+            return KeysetCursorCodec.encode(created_at=key, entity_id=item.uuid)
+        return SortKeyCursorCodec.encode(self.sort, key, item.uuid)
+
+
+@dataclass(slots=True)
+class KeyedChanges:
+    """Compacted changes together with the (tx_id, seq) log position of each"""
+
+    rows: list[tuple[tuple[int, int], DirectoryChange]]
+    has_more: bool
+    since: tuple[int, int] = (0, 0)
+
+    @property
+    def items(self) -> list[DirectoryChange]:
+        return [change for _, change in self.rows]
+
+    def token_after(self, count: int) -> str:
+        """Token continuing after the first `count` changes of the page"""
+        # Changes are ordered by their latest operation, so an entity left
+        # out of the prefix comes back with that operation on the next page.
+        tx_id, seq = self.rows[count - 1][0] if count else self.since
+        return ChangeTokenCodec.encode(tx_id=tx_id, seq=seq)
+
+    @property
+    def next_token(self) -> str:
+        return self.token_after(len(self.rows))
 
 
 class PostgresDirectoryRepository:
-    def __init__(self, database: Database):
+    def __init__(
+        self,
+        database: Database,
+        snapshot_ttl: float = DEFAULT_SNAPSHOT_TTL,
+        snapshot_max_rows: int = DEFAULT_SNAPSHOT_MAX_ROWS,
+    ):
         self.database = database
+        self.snapshot_ttl = snapshot_ttl
+        self.snapshot_max_rows = snapshot_max_rows
 
+    @traced("PostgresDirectoryRepository.get_organizations")
     async def get_organizations(
         self, filter: OrganizationFilter
     ) -> PaginatedOrganizations:
         """Get organization list"""
+        if filter.snapshot:
+            return await self._get_snapshot_organizations(filter)
+        page = await self.get_organization_page(filter)
+        return PaginatedOrganizations(items=page.items, next_cursor=page.next_cursor)
+
+    async def _get_snapshot_organizations(
+        self, filter: OrganizationFilter
+    ) -> PaginatedOrganizations:
+        """Get page of a pagination session, the first page creates the session"""
         page_size = filter.pagination.limit
-        stmt = Select(
-            OrganizationModel.id.label("org_id"),
-            OrganizationModel.created_at.label("org_created_at"),
-            OrganizationModel.name.label("org_name"),
-            BuildingModel.id.label("bld_id"),
-            BuildingModel.address.label("bld_address"),
-            func.ST_Y(cast(BuildingModel.location, Geometry)).label("bld_lat"),
-            func.ST_X(cast(BuildingModel.location, Geometry)).label("bld_lon"),
-        ).outerjoin(BuildingModel)
-
-        if filter.name:
-            stmt = stmt.where(OrganizationModel.name.ilike(f"%{filter.name}%"))
-
-        if filter.building_uuid:
-            stmt = stmt.where(BuildingModel.id == filter.building_uuid)
-
-        if filter.activity:
-            if filter.activity.include_children:
-                children_subquery = select(ActivityModel.id).where(
-                    ActivityModel.parent_id == filter.activity.activity_uuid
-                )
-                stmt = stmt.where(
-                    select(OrganizationActivityModel.organization_id)
-                    .join(
-                        ActivityModel,
-                        ActivityModel.id == OrganizationActivityModel.activity_id,
-                    )
-                    .where(
-                        OrganizationActivityModel.organization_id
-                        == OrganizationModel.id,
-                        or_(
-                            ActivityModel.id == filter.activity.activity_uuid,
-                            ActivityModel.parent_id == filter.activity.activity_uuid,
-                            ActivityModel.parent_id.in_(children_subquery),
-                        ),
-                    )
-                    .exists()
+        filter_digest = _snapshot_filter_digest(filter)
+
+        if filter.pagination.cursor:
+            session_id, position = SnapshotCursorCodec.decode(filter.pagination.cursor)
+            session = await self.database.fetch_one(
+                pagination_session_query(session_id)
+            )
+            if session is None:
+                raise ValueError("Pagination session expired")
+            if session.filter_digest != filter_digest:
+                raise ValueError("Pagination cursor belongs to another filter")
+            result = await self.database.fetch_all(
+                pagination_session_page_query(session_id, position, page_size)
+            )
+        else:
+            # The filter runs once here; every later page is a primary key
+            # range of the stored positions.
+            async with self.database.transaction() as connection:
+                await self.database.execute(
+                    pagination_sessions_expired_delete_query(), connection
                 )
-            else:
-                stmt = stmt.where(
-                    select(OrganizationActivityModel.organization_id)
-                    .where(
-                        OrganizationActivityModel.organization_id
-                        == OrganizationModel.id,
-                        OrganizationActivityModel.activity_id
-                        == filter.activity.activity_uuid,
-                    )
-                    .exists()
+                session = await self.database.fetch_one(
+                    pagination_session_insert_query(filter_digest, self.snapshot_ttl),
+                    connection,
                 )
-
-        if filter.within_radius:
-            stmt = stmt.where(
-                func.ST_DWithin(
-                    BuildingModel.location,
-                    cast(
-                        func.ST_SetSRID(
-                            func.ST_MakePoint(
-                                filter.within_radius.center_long,
-                                filter.within_radius.center_lat,
-                            ),
-                            4326,
-                        ),
-                        Geometry("POINT", srid=4326),
+                if session is None:
+                    raise RuntimeError("Pagination session insert returned no row")
+                session_id = session.session_id
+                await self.database.execute(
+                    pagination_session_items_insert_query(
+                        session_id, filter, self.snapshot_max_rows
                     ),
-                    filter.within_radius.radius,
+                    connection,
                 )
-            )
-
-        if filter.within_bounding_box:
-            stmt = stmt.where(
-                func.ST_Within(
-                    cast(BuildingModel.location, Geometry),
-                    func.ST_MakeEnvelope(
-                        filter.within_bounding_box.min_long,
-                        filter.within_bounding_box.min_lat,
-                        filter.within_bounding_box.max_long,
-                        filter.within_bounding_box.max_lat,
-                        4326,
+                # Later pages would silently stop short of the last matches;
+                # raising rolls the session back.
+                overflow = await self.database.fetch_one(
+                    pagination_session_overflow_query(
+                        session_id, self.snapshot_max_rows
                     ),
+                    connection,
                 )
-            )
-
-        if filter.pagination.cursor:
-            cursor_created_at, cursor_id = KeysetCursorCodec.decode(
-                filter.pagination.cursor
-            )
-            stmt = stmt.where(
-                or_(
-                    OrganizationModel.created_at > cursor_created_at,
-                    and_(
-                        OrganizationModel.created_at == cursor_created_at,
-                        OrganizationModel.id > cursor_id,
-                    ),
+                if overflow is not None:
+                    raise ValueError(
+                        f"Filter matches more than {self.snapshot_max_rows} "
+                        "organizations, narrow it down for snapshot pagination"
+                    )
+                result = await self.database.fetch_all(
+                    pagination_session_page_query(session_id, 0, page_size),
+                    connection,
                 )
-            )
 
-        stmt = stmt.order_by(
-            OrganizationModel.created_at.asc(), OrganizationModel.id.asc()
-        ).limit(page_size + 1)
+        has_next = len(result) > page_size
+        rows = result[:page_size]
+        organizations = [_organization_from_row(row) for row in rows if row.org_id]
+        if organizations and filter.expand:
+            await self._expand_organizations(organizations, filter.expand)
+
+        return PaginatedOrganizations(
+            items=organizations,
+            next_cursor=SnapshotCursorCodec.encode(session_id, rows[-1].position)
+            if has_next
+            else None,
+        )
+
+    async def get_organization_page(
+        self, filter: OrganizationFilter
+    ) -> KeyedPage[Organization]:
+        """Get organization page with keyset values of its rows"""
+        page_size = filter.pagination.limit
+        stmt = organizations_query(filter)
         result = await self.database.fetch_all(stmt)
 
         has_next = len(result) > page_size
         rows = result[:page_size]
 
-        organizations: list[Organization] = []
-        for row in rows:
-            organizations.append(
-                Organization(
-                    uuid=row.org_id,
-                    name=row.org_name,
-                    phone_numbers=[],
-                    building=Building(
-                        uuid=row.bld_id,
-                        address=row.bld_address,
-                        coordinate_lat=row.bld_lat,
-                        coordinate_long=row.bld_lon,
-                    )
-                    if row.bld_id
-                    else None,
-                )
-            )
+        organizations = [_organization_from_row(row) for row in rows]
 
-        next_cursor: str | None = (
-            KeysetCursorCodec.encode(
-                created_at=rows[-1].org_created_at,
-                entity_id=rows[-1].org_id,
-            )
-            if has_next
-            else None
+        if organizations and filter.expand:
+            await self._expand_organizations(organizations, filter.expand)
+
+        return KeyedPage(
+            rows=[
+                (row.sort_key, organization)
+                for row, organization in zip(rows, organizations)
+            ],
+            has_next=has_next,
+            sort=filter.sort,
         )
-        return PaginatedOrganizations(items=organizations, next_cursor=next_cursor)
 
+    async def _expand_organizations(
+        self,
+        organizations: list[Organization],
+        expand: Sequence[OrganizationExpand],
+    ) -> None:
+        """Load requested relations of a whole page, one query per relation"""
+        by_uuid = {organization.uuid: organization for organization in organizations}
+        organization_uuids = list(by_uuid)
+
+        if OrganizationExpand.PHONES in expand:
+            for row in await self.database.fetch_all(
+                organizations_phone_numbers_query(organization_uuids)
+            ):
+                by_uuid[row.org_id].phone_numbers.append(
+                    OrganizationPhoneNumber(number=row.phone_number)
+                )
+
+        if OrganizationExpand.ACTIVITIES in expand:
+            for row in await self.database.fetch_all(
+                organizations_activities_query(organization_uuids)
+            ):
+                by_uuid[row.org_id].activities.append(
+                    Activity(uuid=row.act_id, name=row.act_name)
+                )
+
+    @traced("PostgresDirectoryRepository.get_organization_by_uuid")
     async def get_organization_by_uuid(
         self, organization_uuid: UUID
     ) -> Organization | None:
         """Get detail info about organization by uuid"""
-        org_stmt = (
-            Select(
-                OrganizationModel.id.label("org_id"),
-                OrganizationModel.name.label("org_name"),
-                BuildingModel.id.label("bld_id"),
-                BuildingModel.address.label("bld_address"),
-                func.ST_Y(cast(BuildingModel.location, Geometry)).label("bld_lat"),
-                func.ST_X(cast(BuildingModel.location, Geometry)).label("bld_lon"),
-            ).outerjoin(BuildingModel)
-        ).where(OrganizationModel.id == organization_uuid)
-
-        numbers_stmt = Select(OrganizationPhoneNumberModel).where(
-            OrganizationPhoneNumberModel.organization_id == organization_uuid
-        )
-        activities_stmt = (
-            Select(
-                ActivityModel.id.label("act_id"),
-                ActivityModel.name.label("act_name"),
-            )
-            .join(
-                OrganizationActivityModel,
-                OrganizationActivityModel.activity_id == ActivityModel.id,
-            )
-            .where(OrganizationActivityModel.organization_id == organization_uuid)
-            .order_by(ActivityModel.name.asc(), ActivityModel.id.asc())
-        )
+        org_stmt = organization_query(organization_uuid)
+        numbers_stmt = organization_phone_numbers_query(organization_uuid)
+        activities_stmt = organization_activities_query(organization_uuid)
 
         org_result = await self.database.fetch_one(org_stmt)
 
@@ -249,53 +349,305 @@ class PostgresDirectoryRepository:
                 else None
             )
 
+    @traced("PostgresDirectoryRepository.get_buildings")
     async def get_buildings(self, filter: BuildingFilter) -> PaginatedBuildings:
+        page = await self.get_building_page(filter)
+        return PaginatedBuildings(items=page.items, next_cursor=page.next_cursor)
+
+    async def get_building_page(self, filter: BuildingFilter) -> KeyedPage[Building]:
+        """Get building page with keyset values of its rows"""
         page_size = filter.pagination.limit
-        stmt = Select(
-            BuildingModel.id.label("bld_id"),
-            BuildingModel.created_at.label("bld_created_at"),
-            BuildingModel.address.label("bld_address"),
-            func.ST_Y(cast(BuildingModel.location, Geometry)).label("bld_lat"),
-            func.ST_X(cast(BuildingModel.location, Geometry)).label("bld_lon"),
-        )
+        stmt = buildings_query(filter)
+        result = await self.database.fetch_all(stmt)
 
-        if filter.pagination.cursor:
-            cursor_created_at, cursor_id = KeysetCursorCodec.decode(
-                filter.pagination.cursor
-            )
-            stmt = stmt.where(
-                or_(
-                    BuildingModel.created_at > cursor_created_at,
-                    and_(
-                        BuildingModel.created_at == cursor_created_at,
-                        BuildingModel.id > cursor_id,
+        has_next = len(result) > page_size
+        rows = result[:page_size]
+
+        return KeyedPage(
+            rows=[
+                (
+                    row.sort_key,
+                    Building(
+                        uuid=row.bld_id,
+                        address=row.bld_address,
+                        coordinate_lat=row.bld_lat,
+                        coordinate_long=row.bld_lon,
                     ),
                 )
-            )
+                for row in rows
+            ],
+            has_next=has_next,
+            sort=filter.sort,
+        )
 
-        stmt = stmt.order_by(
-            BuildingModel.created_at.asc(), BuildingModel.id.asc()
-        ).limit(page_size + 1)
-        result = await self.database.fetch_all(stmt)
+    async def get_sort_key_ranks(self, keys: Sequence[str]) -> dict[str, int]:
+        """Rank text sort keys in the order this database sorts them"""
+        if not keys:
+            return {}
+        result = await self.database.fetch_all(sort_key_ranks_query(keys))
+        return {row.srt_key: row.srt_rank for row in result}
 
-        has_next = len(result) > page_size
-        rows = result[:page_size]
+    async def get_existing_building_uuids(
+        self, building_uuids: Sequence[UUID]
+    ) -> set[UUID]:
+        """Get which of the buildings are stored in this database"""
+        result = await self.database.fetch_all(building_ids_query(building_uuids))
+        return {row.bld_id for row in result}
+
+    async def get_existing_organization_uuids(
+        self, organization_uuids: Sequence[UUID]
+    ) -> set[UUID]:
+        """Get which of the organizations are stored in this database"""
+        result = await self.database.fetch_all(
+            organization_hashes_query(organization_uuids)
+        )
+        return {row.org_id for row in result}
+
+    @traced("PostgresDirectoryRepository.sync_organizations")
+    async def sync_organizations(
+        self, organizations: Sequence[OrganizationUpsert]
+    ) -> OrganizationSyncResult:
+        """Upsert organizations, writing only rows whose content hash changed"""
+        content_hashes = {
+            organization.uuid: organization_content_hash(organization)
+            for organization in organizations
+        }
+
+        try:
+            async with self.database.transaction() as connection:
+                stored_hashes = {
+                    row.org_id: row.org_content_hash
+                    for row in await self.database.fetch_all(
+                        organization_hashes_query(list(content_hashes)), connection
+                    )
+                }
+                changed = [
+                    organization
+                    for organization in organizations
+                    if stored_hashes.get(organization.uuid)
+                    != content_hashes[organization.uuid]
+                ]
+                if not changed:
+                    return OrganizationSyncResult(unchanged=len(organizations))
+
+                written = []
+                for chunk in _chunked(changed):
+                    written.extend(
+                        await self.database.fetch_all(
+                            organizations_upsert_query(chunk, content_hashes),
+                            connection,
+                        )
+                    )
+
+                updated_ids = [row.org_id for row in written if not row.inserted]
+                if updated_ids:
+                    await self.database.execute(
+                        organization_phone_numbers_delete_query(updated_ids),
+                        connection,
+                    )
+                    await self.database.execute(
+                        organization_activities_delete_query(updated_ids),
+                        connection,
+                    )
+
+                written_ids = {row.org_id for row in written}
+                written_organizations = [
+                    organization
+                    for organization in changed
+                    if organization.uuid in written_ids
+                ]
+                phone_rows = [
+                    {"organization_id": organization.uuid, "phone_number": number}
+                    for organization in written_organizations
+                    for number in organization.phone_numbers
+                ]
+                activity_rows = [
+                    {"organization_id": organization.uuid, "activity_id": activity_id}
+                    for organization in written_organizations
+                    for activity_id in dict.fromkeys(organization.activity_uuids)
+                ]
+                for chunk in _chunked(phone_rows):
+                    await self.database.execute(
+                        organization_phone_numbers_insert_query(chunk), connection
+                    )
+                for chunk in _chunked(activity_rows):
+                    await self.database.execute(
+                        organization_activities_insert_query(chunk), connection
+                    )
+        except IntegrityError as exc:
+            raise ValueError("Unknown building or activity reference") from exc
+
+        inserted = sum(1 for row in written if row.inserted)
+        return OrganizationSyncResult(
+            inserted=inserted,
+            updated=len(written) - inserted,
+            unchanged=len(organizations) - len(written),
+        )
+
+    @traced("PostgresDirectoryRepository.move_activities")
+    async def move_activities(self, moves: Sequence[ActivityMove]) -> int:
+        """Move activities with their subtrees in one statement, return moved count
 
-        buildings = [
-            Building(
-                uuid=row.bld_id,
-                address=row.bld_address,
-                coordinate_lat=row.bld_lat,
-                coordinate_long=row.bld_lon,
+        The whole batch is validated at once, so it either leaves a valid tree
+        behind or changes nothing.
+        """
+        return await self._move_activities(moves, self.database.transaction())
+
+    @traced("PostgresDirectoryRepository.prepare_move_activities")
+    async def prepare_move_activities(
+        self, moves: Sequence[ActivityMove], transaction_id: str
+    ) -> int:
+        """Move activities in a transaction prepared for two-phase commit
+
+        Nothing is visible until finish_prepared(transaction_id, commit=True).
+        """
+        return await self._move_activities(
+            moves, self.database.prepared_transaction(transaction_id)
+        )
+
+    async def finish_prepared(self, transaction_id: str, commit: bool) -> None:
+        await self.database.finish_prepared(transaction_id, commit)
+
+    async def _move_activities(
+        self,
+        moves: Sequence[ActivityMove],
+        transaction: AbstractAsyncContextManager[AsyncConnection],
+    ) -> int:
+        activity_uuids = [move.activity_uuid for move in moves]
+        if len(set(activity_uuids)) != len(activity_uuids):
+            raise ValueError("Activity is moved more than once")
+
+        try:
+            async with transaction as connection:
+                existing = await self.database.fetch_all(
+                    activity_ids_query(activity_uuids), connection
+                )
+                if len(existing) != len(activity_uuids):
+                    raise ValueError("Unknown activity")
+                moved = await self.database.fetch_all(
+                    activities_reparent_query(moves), connection
+                )
+        except IntegrityError as exc:
+            raise ValueError("Unknown parent activity") from exc
+        except DBAPIError as exc:
+            message = _raised_message(exc)
+            if message is None:
+                raise
+            raise ValueError(message) from exc
+
+        return len(moved)
+
+    @traced("PostgresDirectoryRepository.get_changes")
+    async def get_changes(self, filter: ChangeFilter) -> DirectoryChangePage:
+        """Get compacted directory changes after the token"""
+        page = await self.get_change_page(filter)
+        return DirectoryChangePage(
+            items=page.items, next_token=page.next_token, has_more=page.has_more
+        )
+
+    async def get_change_page(self, filter: ChangeFilter) -> KeyedChanges:
+        """Get compacted directory changes with the log position of each"""
+        since_tx_id, since_seq = (
+            ChangeTokenCodec.decode(filter.since) if filter.since else (0, 0)
+        )
+        result = await self.database.fetch_all(
+            changes_query(since_tx_id, since_seq, filter.limit)
+        )
+
+        if filter.since:
+            # Read after the page: a prune that raced it has moved the horizon.
+            horizon = await self.database.fetch_one(change_horizon_query())
+            if horizon is not None and (since_tx_id, since_seq) < (
+                horizon.hor_tx_id,
+                horizon.hor_seq,
+            ):
+                raise ValueError("Change token has expired, start again without since")
+
+        has_more = len(result) > filter.limit
+        rows = result[: filter.limit]
+
+        # Keep only the latest operation per entity, ordered by that operation.
+        latest: dict[tuple[str, UUID], RowMapping] = {}
+        for row in rows:
+            key = (row.chg_entity, row.chg_entity_id)
+            latest.pop(key, None)
+            latest[key] = row
+
+        return KeyedChanges(
+            rows=[
+                (
+                    (row.chg_tx_id, row.chg_seq),
+                    DirectoryChange(entity=entity, uuid=entity_id, op=row.chg_op),
+                )
+                for (entity, entity_id), row in latest.items()
+            ],
+            has_more=has_more,
+            since=(since_tx_id, since_seq),
+        )
+
+    async def prune_changes(self, before: datetime) -> int:
+        """Delete the change log prefix recorded before the moment, return count
+
+        Tokens pointing before the last removed position expire, so get_changes
+        rejects them instead of silently skipping the removed changes.
+        """
+        async with self.database.transaction() as connection:
+            last = await self.database.fetch_one(
+                changes_prune_query(before), connection
             )
-            for row in rows
-        ]
-        next_cursor: str | None = (
-            KeysetCursorCodec.encode(
-                created_at=rows[-1].bld_created_at,
-                entity_id=rows[-1].bld_id,
+            if last is None:
+                return 0
+            await self.database.execute(
+                change_horizon_update_query(last.chg_tx_id, last.chg_seq), connection
             )
-            if has_next
-            else None
+        return last.pruned_count
+
+    @traced("PostgresDirectoryRepository.get_activity_tree")
+    async def get_activity_tree(self) -> list[ActivityTreeNode]:
+        """Get root activities with nested children and organization counts"""
+        nodes = [
+            ActivityTreeNode(
+                uuid=row.act_id,
+                name=row.act_name,
+                parent_uuid=row.act_parent_id,
+                organization_count=row.direct_count,
+                subtree_organization_count=row.subtree_count,
+            )
+            for row in await self.database.fetch_all(activity_tree_query())
+        ]
+
+        by_uuid = {node.uuid: node for node in nodes}
+        roots: list[ActivityTreeNode] = []
+        for node in nodes:
+            parent = by_uuid.get(node.parent_uuid) if node.parent_uuid else None
+            if parent is None:
+                roots.append(node)
+            else:
+                parent.children.append(node)
+        return roots
+
+    async def get_data_versions(self) -> dict[str, int]:
+        """Get current write counter of every versioned table"""
+        result = await self.database.fetch_all(data_versions_query())
+        return {row.table_name: row.version for row in result}
+
+    async def warm_up(self) -> None:
+        """Open pool connections and prepare statements of the read endpoints"""
+        pagination = PaginationParams(limit=1)
+        await self.database.warm_up(
+            [
+                organizations_query(OrganizationFilter(pagination=pagination)),
+                organization_query(WARM_UP_UUID),
+                organization_phone_numbers_query(WARM_UP_UUID),
+                organization_activities_query(WARM_UP_UUID),
+                buildings_query(BuildingFilter(pagination=pagination)),
+                data_versions_query(),
+            ]
         )
-        return PaginatedBuildings(items=buildings, next_cursor=next_cursor)
+
+    async def check_connection(self) -> None:
+        await self.database.check_connection()
+
+    def add_checkout_wait_listener(self, listener: Callable[[float], None]) -> None:
+        """Call listener with seconds spent waiting for a pool connection"""
+        self.database.add_checkout_wait_listener(listener)
@@ -0,0 +1,3 @@
+from .repository import Region, Shard, ShardedDirectoryRepository
+
+__all__ = ["Region", "Shard", "ShardedDirectoryRepository"]
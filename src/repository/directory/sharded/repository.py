@@ -0,0 +1,476 @@
+import asyncio
+import base64
+import heapq
+import itertools
+import json
+import math
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+from src.dto import (
+    ActivityMove,
+    ActivityTreeNode,
+    Building,
+    BuildingFilter,
+    ChangeFilter,
+    DirectoryChangePage,
+    Organization,
+    OrganizationFilter,
+    OrganizationSyncResult,
+    OrganizationUpsert,
+    PaginatedBuildings,
+    PaginatedOrganizations,
+)
+from src.metrics import registry
+from src.tracing import traced
+
+from ..postgres import KeyedChanges, KeyedPage, PostgresDirectoryRepository
+
+shard_calls = registry.counter(
+    "directory_shard_calls_total",
+    "Repository calls sent to a shard",
+    ["shard", "method"],
+)
+
+# Meters in one degree of latitude, turns a search radius into a region box.
+METERS_PER_DEGREE = 111_320.0
+
+
+@dataclass(frozen=True, slots=True)
+class Region:
+    """Latitude/longitude box covered by a shard or a geo filter"""
+
+    min_lat: float
+    max_lat: float
+    min_long: float
+    max_long: float
+
+    def intersects(self, other: "Region") -> bool:
+        return (
+            self.min_lat <= other.max_lat
+            and other.min_lat <= self.max_lat
+            and self.min_long <= other.max_long
+            and other.min_long <= self.max_long
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Shard:
+    name: str
+    region: Region
+    repository: PostgresDirectoryRepository
+
+
+class ShardChangeTokenCodec:
+    @staticmethod
+    def encode(tokens: dict[str, str]) -> str:
+        encoded = base64.urlsafe_b64encode(json.dumps(tokens).encode("utf-8"))
+        return encoded.decode("utf-8")
+
+    @staticmethod
+    def decode(token: str) -> dict[str, str]:
+        try:
+            decoded = base64.urlsafe_b64decode(token.encode("utf-8")).decode("utf-8")
+            payload = json.loads(decoded)
+            if not isinstance(payload, dict):
+                raise TypeError("Change token is not a shard mapping")
+            return {
+                str(name): str(shard_token) for name, shard_token in payload.items()
+            }
+        except (ValueError, TypeError, json.JSONDecodeError) as exc:
+            raise ValueError("Invalid change token") from exc
+
+
+def _filter_region(filter: OrganizationFilter) -> Region | None:
+    """Area that rows matching the geo filter lie in, None without geo filter"""
+    if filter.within_bounding_box:
+        box = filter.within_bounding_box
+        return Region(
+            min_lat=box.min_lat,
+            max_lat=box.max_lat,
+            min_long=box.min_long,
+            max_long=box.max_long,
+        )
+
+    if filter.within_radius:
+        circle = filter.within_radius
+        lat_delta = circle.radius / METERS_PER_DEGREE
+        # Degrees of longitude shrink towards the poles.
+        long_delta = lat_delta / max(math.cos(math.radians(circle.center_lat)), 1e-6)
+        return Region(
+            min_lat=circle.center_lat - lat_delta,
+            max_lat=circle.center_lat + lat_delta,
+            min_long=circle.center_long - long_delta,
+            max_long=circle.center_long + long_delta,
+        )
+
+    return None
+
+
+def _merge_pages[PageItem: (Organization, Building)](
+    pages: Sequence[KeyedPage[PageItem]],
+    limit: int,
+    sort: str,
+    ranks: dict[str, int] | None = None,
+) -> KeyedPage[PageItem]:
+    """K-way merge of per-shard pages ordered by (sort key, uuid)
+
+    Text sort keys are compared by their `ranks` in the database collation,
+    Python string order differs from it.
+    """
+    # Every shard page starts right after the same cursor, so the first
+    # `limit` rows of the merged stream are exactly the global page.
+    merged = heapq.merge(
+        *(page.rows for page in pages),
+        key=(lambda row: (row[0], row[1].uuid))
+        if ranks is None
+        else (lambda row: (ranks[row[0]], row[1].uuid)),
+        reverse=sort.startswith("-"),
+    )
+    rows = list(itertools.islice(merged, limit + 1))
+    return KeyedPage(
+        rows=rows[:limit],
+        has_next=len(rows) > limit or any(page.has_next for page in pages),
+        sort=sort,
+    )
+
+
+def _merge_changes(pages: Sequence[KeyedChanges], limit: int) -> list[int]:
+    """Count of changes taken from each shard page, at most `limit` in total"""
+    # Log positions of different databases are not comparable, so shards
+    # take turns; a busy shard can not starve the others.
+    taken = [0] * len(pages)
+    remaining = limit
+    while remaining:
+        pending = [
+            index for index, page in enumerate(pages) if taken[index] < len(page.rows)
+        ]
+        if not pending:
+            break
+        for index in pending[:remaining]:
+            taken[index] += 1
+        remaining -= min(len(pending), remaining)
+    return taken
+
+
+def _flatten(nodes: Sequence[ActivityTreeNode]) -> list[ActivityTreeNode]:
+    flat: list[ActivityTreeNode] = []
+    for node in nodes:
+        flat.append(node)
+        flat.extend(_flatten(node.children))
+    return flat
+
+
+class ShardedDirectoryRepository:
+    """Directory split by region across several PostgreSQL databases.
+
+    Every organization lives on the shard of its building; activities are
+    reference data present on every shard. Geo queries go to the shards whose
+    region they intersect, everything else is fanned out and merged.
+    """
+
+    def __init__(self, shards: Sequence[Shard]):
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.shards = list(shards)
+        # Organizations without a building are stored on the first shard.
+        self.home_shard = self.shards[0]
+
+    async def _gather[T](
+        self,
+        shards: Sequence[Shard],
+        method: str,
+        call: Callable[[Shard], Awaitable[T]],
+    ) -> list[T]:
+        for shard in shards:
+            shard_calls.inc(shard=shard.name, method=method)
+        return await asyncio.gather(*(call(shard) for shard in shards))
+
+    async def _merge[PageItem: (Organization, Building)](
+        self, pages: Sequence[KeyedPage[PageItem]], limit: int, sort: str
+    ) -> KeyedPage[PageItem]:
+        keys = sorted({key for page in pages for key, _ in page.rows})
+        if not keys or not isinstance(keys[0], str):
+            return _merge_pages(pages, limit, sort)
+        # Every shard has the same collation, the home shard ranks the keys.
+        shard_calls.inc(shard=self.home_shard.name, method="get_sort_key_ranks")
+        ranks = await self.home_shard.repository.get_sort_key_ranks(keys)
+        return _merge_pages(pages, limit, sort, ranks)
+
+    @traced("ShardedDirectoryRepository.get_organizations")
+    async def get_organizations(
+        self, filter: OrganizationFilter
+    ) -> PaginatedOrganizations:
+        """Get organization list merged from the shards the filter can match"""
+        if filter.snapshot:
+            # Session positions are per database and can not be merged.
+            raise ValueError("Snapshot pagination is not available with shards")
+        area = _filter_region(filter)
+        shards = (
+            self.shards
+            if area is None
+            else [shard for shard in self.shards if shard.region.intersects(area)]
+        )
+        pages = await self._gather(
+            shards,
+            "get_organizations",
+            lambda shard: shard.repository.get_organization_page(filter),
+        )
+        page = await self._merge(pages, filter.pagination.limit, filter.sort)
+        return PaginatedOrganizations(items=page.items, next_cursor=page.next_cursor)
+
+    @traced("ShardedDirectoryRepository.get_organization_by_uuid")
+    async def get_organization_by_uuid(
+        self, organization_uuid: UUID
+    ) -> Organization | None:
+        """Get detail info about organization from whichever shard stores it"""
+        found = await self._gather(
+            self.shards,
+            "get_organization_by_uuid",
+            lambda shard: shard.repository.get_organization_by_uuid(organization_uuid),
+        )
+        return next((organization for organization in found if organization), None)
+
+    @traced("ShardedDirectoryRepository.get_buildings")
+    async def get_buildings(self, filter: BuildingFilter) -> PaginatedBuildings:
+        pages = await self._gather(
+            self.shards,
+            "get_buildings",
+            lambda shard: shard.repository.get_building_page(filter),
+        )
+        page = await self._merge(pages, filter.pagination.limit, filter.sort)
+        return PaginatedBuildings(items=page.items, next_cursor=page.next_cursor)
+
+    async def _owners(
+        self,
+        uuids: Sequence[UUID],
+        method: str,
+        lookup: Callable[[Shard], Awaitable[set[UUID]]],
+    ) -> dict[UUID, Shard]:
+        if not uuids:
+            return {}
+        found = await self._gather(self.shards, method, lookup)
+        return {
+            entity_uuid: shard
+            for shard, shard_uuids in zip(self.shards, found)
+            for entity_uuid in shard_uuids
+        }
+
+    @traced("ShardedDirectoryRepository.sync_organizations")
+    async def sync_organizations(
+        self, organizations: Sequence[OrganizationUpsert]
+    ) -> OrganizationSyncResult:
+        """Upsert organizations on the shards of their buildings"""
+        building_uuids = list(
+            {
+                organization.building_uuid
+                for organization in organizations
+                if organization.building_uuid
+            }
+        )
+        organization_uuids = [organization.uuid for organization in organizations]
+        building_owners, organization_owners = await asyncio.gather(
+            self._owners(
+                building_uuids,
+                "get_existing_building_uuids",
+                lambda shard: shard.repository.get_existing_building_uuids(
+                    building_uuids
+                ),
+            ),
+            self._owners(
+                organization_uuids,
+                "get_existing_organization_uuids",
+                lambda shard: shard.repository.get_existing_organization_uuids(
+                    organization_uuids
+                ),
+            ),
+        )
+        # Checked up front: shards commit independently, so a batch failing
+        # on one shard after another one committed would be half written.
+        if set(building_uuids) - building_owners.keys():
+            raise ValueError("Unknown building or activity reference")
+
+        batches: dict[str, list[OrganizationUpsert]] = {}
+        for organization in organizations:
+            current = organization_owners.get(organization.uuid)
+            target = (
+                building_owners[organization.building_uuid]
+                if organization.building_uuid
+                else current or self.home_shard
+            )
+            if current is not None and current is not target:
+                raise ValueError("Organization can not move to another shard region")
+            batches.setdefault(target.name, []).append(organization)
+
+        shards = [shard for shard in self.shards if shard.name in batches]
+        results = await self._gather(
+            shards,
+            "sync_organizations",
+            lambda shard: shard.repository.sync_organizations(batches[shard.name]),
+        )
+        return OrganizationSyncResult(
+            inserted=sum(result.inserted for result in results),
+            updated=sum(result.updated for result in results),
+            unchanged=sum(result.unchanged for result in results),
+        )
+
+    @traced("ShardedDirectoryRepository.move_activities")
+    async def move_activities(self, moves: Sequence[ActivityMove]) -> int:
+        """Apply activity moves on every shard atomically, return moved count
+
+        Activities are replicated, so every shard prepares the moves in a
+        two-phase transaction and they are committed only once all shards
+        prepared them. A batch any shard rejects changes nothing anywhere.
+        """
+        batch_id = uuid4().hex
+        # Prepared transaction ids are unique per PostgreSQL cluster, and
+        # shards may share one.
+        transaction_ids = {
+            shard.name: f"move_activities-{batch_id}-{shard.name}"
+            for shard in self.shards
+        }
+        for shard in self.shards:
+            shard_calls.inc(shard=shard.name, method="move_activities")
+        prepared = await asyncio.gather(
+            *(
+                shard.repository.prepare_move_activities(
+                    moves, transaction_ids[shard.name]
+                )
+                for shard in self.shards
+            ),
+            return_exceptions=True,
+        )
+
+        failed = [result for result in prepared if isinstance(result, BaseException)]
+        if failed:
+            await self._finish_prepared(
+                [
+                    shard
+                    for shard, result in zip(self.shards, prepared)
+                    if not isinstance(result, BaseException)
+                ],
+                transaction_ids,
+                commit=False,
+                cause=failed[0],
+            )
+            raise failed[0]
+
+        await self._finish_prepared(self.shards, transaction_ids, commit=True)
+        # Every shard holds the same tree, so each moved the same rows.
+        return prepared[0]
+
+    async def _finish_prepared(
+        self,
+        shards: Sequence[Shard],
+        transaction_ids: dict[str, str],
+        commit: bool,
+        cause: BaseException | None = None,
+    ) -> None:
+        results = await asyncio.gather(
+            *(
+                shard.repository.finish_prepared(transaction_ids[shard.name], commit)
+                for shard in shards
+            ),
+            return_exceptions=True,
+        )
+        pending = [
+            transaction_ids[shard.name]
+            for shard, result in zip(shards, results)
+            if isinstance(result, BaseException)
+        ]
+        if pending:
+            # Shards stay split until these are finished by hand.
+            command = "COMMIT" if commit else "ROLLBACK"
+            raise RuntimeError(
+                "Prepared transactions are left on shards, run "
+                f"{command} PREPARED for: {', '.join(pending)}"
+            ) from cause
+
+    @traced("ShardedDirectoryRepository.get_changes")
+    async def get_changes(self, filter: ChangeFilter) -> DirectoryChangePage:
+        """Get changes of every shard; the token keeps one position per shard"""
+        tokens = ShardChangeTokenCodec.decode(filter.since) if filter.since else {}
+        pages = await self._gather(
+            self.shards,
+            "get_changes",
+            lambda shard: shard.repository.get_change_page(
+                ChangeFilter(since=tokens.get(shard.name), limit=filter.limit)
+            ),
+        )
+        # Every shard page may fill the limit on its own; the merged page is
+        # trimmed and each shard token stops after its last returned change.
+        taken = _merge_changes(pages, filter.limit)
+        return DirectoryChangePage(
+            items=[
+                change
+                for page, count in zip(pages, taken)
+                for change in page.items[:count]
+            ],
+            next_token=ShardChangeTokenCodec.encode(
+                {
+                    shard.name: page.token_after(count)
+                    for shard, page, count in zip(self.shards, pages, taken)
+                }
+            ),
+            has_more=any(
+                page.has_more or count < len(page.rows)
+                for page, count in zip(pages, taken)
+            ),
+        )
+
+    @traced("ShardedDirectoryRepository.get_activity_tree")
+    async def get_activity_tree(self) -> list[ActivityTreeNode]:
+        """Get activity tree with organization counts summed over shards"""
+        trees = await self._gather(
+            self.shards,
+            "get_activity_tree",
+            lambda shard: shard.repository.get_activity_tree(),
+        )
+        # An organization is stored on one shard only, so counts add up.
+        nodes = {node.uuid: node for node in _flatten(trees[0])}
+        for tree in trees[1:]:
+            for node in _flatten(tree):
+                if node.uuid in nodes:
+                    nodes[node.uuid].organization_count += node.organization_count
+                    nodes[
+                        node.uuid
+                    ].subtree_organization_count += node.subtree_organization_count
+        return trees[0]
+
+    async def get_data_versions(self) -> dict[str, int]:
+        """Get write counters summed over shards, they only ever grow"""
+        versions = await self._gather(
+            self.shards,
+            "get_data_versions",
+            lambda shard: shard.repository.get_data_versions(),
+        )
+        totals: dict[str, int] = {}
+        for shard_versions in versions:
+            for table_name, version in shard_versions.items():
+                totals[table_name] = totals.get(table_name, 0) + version
+        return totals
+
+    async def warm_up(self) -> None:
+        """Warm up pools of every shard"""
+        await self._gather(
+            self.shards, "warm_up", lambda shard: shard.repository.warm_up()
+        )
+
+    async def check_connection(self) -> None:
+        """Check that every shard is reachable"""
+        await self._gather(
+            self.shards,
+            "check_connection",
+            lambda shard: shard.repository.check_connection(),
+        )
+
+    def add_checkout_wait_listener(self, listener: Callable[[float], None]) -> None:
+        """Call listener with pool waits of every shard"""
+        for shard in self.shards:
+            shard.repository.add_checkout_wait_listener(listener)
+
+    async def close(self) -> None:
+        """Close pool connections of every shard"""
+        for shard in self.shards:
+            await shard.repository.database.dispose()
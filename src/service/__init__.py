@@ -1,7 +1,30 @@
 from .abstract import DirectoryServiceProtocol
-from .service import DirectoryService
+from .activity_tree import ACTIVITY_TREE_TABLES, ActivityTreeSnapshot
+from .cache import LocalResultCache, ResultCache, SharedResultCache
+from .data_version import DataVersionTracker
+from .prefetch import PagePrefetcher
+from .service import (
+    BUILDING_LIST_TABLES,
+    ORGANIZATION_DETAIL_TABLES,
+    ORGANIZATION_LIST_TABLES,
+    DirectoryService,
+    organization_list_tables,
+)
+from .single_flight import SingleFlight
 
 __all__ = [
+    "ACTIVITY_TREE_TABLES",
+    "BUILDING_LIST_TABLES",
+    "ORGANIZATION_DETAIL_TABLES",
+    "ORGANIZATION_LIST_TABLES",
+    "ActivityTreeSnapshot",
+    "DataVersionTracker",
     "DirectoryServiceProtocol",
     "DirectoryService",
+    "LocalResultCache",
+    "PagePrefetcher",
+    "ResultCache",
+    "SharedResultCache",
+    "SingleFlight",
+    "organization_list_tables",
 ]
@@ -1,10 +1,16 @@
+from collections.abc import Sequence
 from typing import Protocol
 from uuid import UUID
 
 from src.dto import (
+    ActivityTreeNode,
     BuildingFilter,
+    ChangeFilter,
+    DirectoryChangePage,
     Organization,
     OrganizationFilter,
+    OrganizationSyncResult,
+    OrganizationUpsert,
     PaginatedBuildings,
     PaginatedOrganizations,
 )
@@ -20,3 +26,13 @@ class DirectoryServiceProtocol(Protocol):
     ) -> Organization | None: ...
 
     async def get_buildings(self, filter: BuildingFilter) -> PaginatedBuildings: ...
+
+    async def sync_organizations(
+        self, organizations: Sequence[OrganizationUpsert]
+    ) -> OrganizationSyncResult: ...
+
+    async def get_changes(self, filter: ChangeFilter) -> DirectoryChangePage: ...
+
+    async def get_activity_tree(self) -> list[ActivityTreeNode]: ...
+
+    async def find_activities(self, name: str | None) -> list[ActivityTreeNode]: ...
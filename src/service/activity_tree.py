@@ -0,0 +1,83 @@
+import asyncio
+
+from pydantic import TypeAdapter
+
+from src.dto import ActivityTreeNode
+from src.metrics import registry
+from src.repository.directory import DirectoryRepositoryProtocol
+
+from .cache import ResultCache
+from .data_version import DataVersionTracker
+
+# Tables the tree and its organization counts are built from.
+ACTIVITY_TREE_TABLES = ("activity", "organization_activity")
+
+ACTIVITY_TREE_ADAPTER = TypeAdapter(list[ActivityTreeNode])
+
+activity_tree_rebuilds = registry.counter(
+    "directory_activity_tree_rebuilds_total", "Activity tree snapshot rebuilds"
+)
+
+
+class ActivityTreeSnapshot:
+    """In-process activity tree, rebuilt only when its tables change"""
+
+    def __init__(
+        self,
+        directory_repository: DirectoryRepositoryProtocol,
+        data_versions: DataVersionTracker,
+        cache: ResultCache | None = None,
+    ) -> None:
+        self.directory_repository = directory_repository
+        self.data_versions = data_versions
+        self.cache = cache
+        self._roots: list[ActivityTreeNode] = []
+        self._nodes: list[ActivityTreeNode] = []
+        self._version_key: str | None = None
+        self._lock = asyncio.Lock()
+
+    async def get_tree(self) -> list[ActivityTreeNode]:
+        await self._refresh()
+        return self._roots
+
+    async def find(self, name: str | None = None) -> list[ActivityTreeNode]:
+        """Activities whose name contains the given text, ignoring case"""
+        await self._refresh()
+        if not name:
+            return self._nodes
+        needle = name.casefold()
+        return [node for node in self._nodes if needle in node.name.casefold()]
+
+    async def _refresh(self) -> None:
+        version_key = await self.data_versions.version_key(ACTIVITY_TREE_TABLES)
+        if version_key == self._version_key:
+            return
+
+        # Requests arriving during a rebuild wait for it instead of starting theirs.
+        async with self._lock:
+            if version_key == self._version_key:
+                return
+            # Tree built by another worker for the same versions is reused.
+            roots = None
+            if self.cache is not None:
+                roots = self.cache.get(
+                    "activity_tree", version_key, ACTIVITY_TREE_ADAPTER
+                )
+            if roots is None:
+                roots = await self.directory_repository.get_activity_tree()
+                activity_tree_rebuilds.inc()
+                if self.cache is not None:
+                    self.cache.set(
+                        "activity_tree", version_key, roots, ACTIVITY_TREE_ADAPTER
+                    )
+            self._roots = roots
+            self._nodes = sorted(_walk(roots), key=lambda node: node.name)
+            self._version_key = version_key
+
+
+def _walk(nodes: list[ActivityTreeNode]) -> list[ActivityTreeNode]:
+    result = []
+    for node in nodes:
+        result.append(node)
+        result.extend(_walk(node.children))
+    return result
@@ -0,0 +1,199 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Protocol
+
+from pydantic import TypeAdapter, ValidationError
+
+from src.metrics import registry
+from src.private_files import open_private
+
+cache_lookups = registry.counter(
+    "directory_cache_lookups_total",
+    "Result cache lookups by outcome",
+    ["result"],
+)
+cache_rejected = registry.counter(
+    "directory_cache_rejected_total",
+    "Values not stored in the result cache",
+    ["reason"],
+)
+
+
+class ResultCache(Protocol):
+    def get[T](self, key: str, version: str, adapter: TypeAdapter[T]) -> T | None:
+        """Cached value stored under the same version, None otherwise"""
+        ...
+
+    def set[T](
+        self, key: str, version: str, value: T, adapter: TypeAdapter[T]
+    ) -> None: ...
+
+
+class LocalResultCache:
+    """Least recently used results of the current process"""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, Any]] = OrderedDict()
+
+    def get[T](self, key: str, version: str, adapter: TypeAdapter[T]) -> T | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            cache_lookups.inc(result="miss")
+            return None
+        if entry[0] != version:
+            cache_lookups.inc(result="stale")
+            return None
+
+        self._entries.move_to_end(key)
+        cache_lookups.inc(result="hit")
+        return entry[1]
+
+    def set[T](self, key: str, version: str, value: T, adapter: TypeAdapter[T]) -> None:
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+def _digest(value: str) -> bytes:
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+
+
+class SharedResultCache:
+    """Results shared by all workers on the host through a mmap'ed file.
+
+    The file holds a header, a direct-mapped index of entry slots and a ring
+    of values serialized as JSON by their pydantic adapter. Writers serialize
+    on a file lock. Readers take no lock: the header sequence is odd while a
+    write is in progress and changes after it, so a reader that saw it change
+    copied a torn entry and retries.
+    """
+
+    MAGIC = b"DRC1"
+    # Magic, index slots, ring size.
+    HEADER = struct.Struct("<4sIQ")
+    # Write sequence, ring head.
+    STATE = struct.Struct("<QQ")
+    # Key digest, version digest, value offset in the ring, value length.
+    SLOT = struct.Struct("<16s16sQQ")
+    READ_ATTEMPTS = 3
+
+    def __init__(self, path: Path, slots: int, size: int) -> None:
+        self._slots = max(1, slots)
+        self._ring_size = size
+        self._index_offset = self.HEADER.size + self.STATE.size
+        self._ring_offset = self._index_offset + self._slots * self.SLOT.size
+        total_size = self._ring_offset + self._ring_size
+
+        self._fd = open_private(path)
+        with self._locked():
+            if os.fstat(self._fd).st_size < total_size:
+                os.ftruncate(self._fd, total_size)
+            self._map = mmap.mmap(self._fd, total_size)
+            layout = self.HEADER.unpack_from(self._map, 0)
+            if layout != (self.MAGIC, self._slots, self._ring_size):
+                # New file, or one left by a different configuration.
+                self._map[: self._ring_offset] = bytes(self._ring_offset)
+                self.HEADER.pack_into(
+                    self._map, 0, self.MAGIC, self._slots, self._ring_size
+                )
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _slot_offset(self, key_digest: bytes) -> int:
+        index = int.from_bytes(key_digest[:8], "little") % self._slots
+        return self._index_offset + index * self.SLOT.size
+
+    def get[T](self, key: str, version: str, adapter: TypeAdapter[T]) -> T | None:
+        key_digest = _digest(key)
+        slot_offset = self._slot_offset(key_digest)
+
+        for _ in range(self.READ_ATTEMPTS):
+            sequence, _ = self.STATE.unpack_from(self._map, self.HEADER.size)
+            if sequence % 2:
+                continue
+            stored_key, stored_version, offset, length = self.SLOT.unpack_from(
+                self._map, slot_offset
+            )
+            data = b""
+            if stored_key == key_digest and length:
+                start = self._ring_offset + offset
+                data = self._map[start : start + length]
+            if self.STATE.unpack_from(self._map, self.HEADER.size)[0] == sequence:
+                break
+        else:
+            cache_lookups.inc(result="busy")
+            return None
+
+        if not data:
+            cache_lookups.inc(result="miss")
+            return None
+        if stored_version != _digest(version):
+            cache_lookups.inc(result="stale")
+            return None
+
+        try:
+            value = adapter.validate_json(data)
+        except ValidationError:
+            # Written by a worker running another release of the code.
+            cache_lookups.inc(result="miss")
+            return None
+        cache_lookups.inc(result="hit")
+        return value
+
+    def set[T](self, key: str, version: str, value: T, adapter: TypeAdapter[T]) -> None:
+        data = adapter.dump_json(value)
+        if len(data) > self._ring_size:
+            cache_rejected.inc(reason="too_large")
+            return
+        key_digest = _digest(key)
+
+        with self._locked():
+            sequence, head = self.STATE.unpack_from(self._map, self.HEADER.size)
+            # Sequence stays odd if a writer died mid-write.
+            sequence += sequence % 2
+            if head + len(data) > self._ring_size:
+                head = 0
+            self.STATE.pack_into(self._map, self.HEADER.size, sequence + 1, head)
+
+            self._drop_overwritten(head, head + len(data))
+            start = self._ring_offset + head
+            self._map[start : start + len(data)] = data
+            self.SLOT.pack_into(
+                self._map,
+                self._slot_offset(key_digest),
+                key_digest,
+                _digest(version),
+                head,
+                len(data),
+            )
+            self.STATE.pack_into(
+                self._map, self.HEADER.size, sequence + 2, head + len(data)
+            )
+
+    def _drop_overwritten(self, start: int, end: int) -> None:
+        index = self._map[self._index_offset : self._ring_offset]
+        for slot, (_, _, offset, length) in enumerate(self.SLOT.iter_unpack(index)):
+            if length and offset < end and start < offset + length:
+                slot_offset = self._index_offset + slot * self.SLOT.size
+                self._map[slot_offset : slot_offset + self.SLOT.size] = bytes(
+                    self.SLOT.size
+                )
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
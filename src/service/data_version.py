@@ -0,0 +1,43 @@
+import asyncio
+import hashlib
+import time
+from collections.abc import Iterable
+
+from src.repository.directory import DirectoryRepositoryProtocol
+
+
+class DataVersionTracker:
+    """Per-table data versions, cached in-process for ttl seconds"""
+
+    def __init__(self, directory_repository: DirectoryRepositoryProtocol, ttl: float):
+        self.directory_repository = directory_repository
+        self._ttl = ttl
+        self._versions: dict[str, int] = {}
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_versions(self) -> dict[str, int]:
+        if time.monotonic() < self._expires_at:
+            return self._versions
+
+        # Concurrent requests on an expired cache share one refresh.
+        async with self._lock:
+            if time.monotonic() >= self._expires_at:
+                self._versions = await self.directory_repository.get_data_versions()
+                self._expires_at = time.monotonic() + self._ttl
+        return self._versions
+
+    def invalidate(self) -> None:
+        """Drop cached versions so writes from this process are seen at once"""
+        self._expires_at = 0.0
+
+    async def version_key(self, tables: Iterable[str]) -> str:
+        """Current versions of the given tables as one comparable string"""
+        versions = await self.get_versions()
+        return ",".join(f"{table}={versions.get(table, 0)}" for table in sorted(tables))
+
+    async def etag(self, scope: str, query: str, tables: Iterable[str]) -> str:
+        """Strong ETag for response of query built from the given tables"""
+        version_key = await self.version_key(tables)
+        digest = hashlib.sha256(f"{scope}\n{query}\n{version_key}".encode("utf-8"))
+        return f'"{digest.hexdigest()[:32]}"'
@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from src.database import deadline
+from src.dto import PaginatedOrganizations
+from src.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+prefetched_pages = registry.counter(
+    "directory_prefetched_pages_total", "Next pages fetched ahead of the client"
+)
+prefetch_hits = registry.counter(
+    "directory_prefetch_hits_total", "Requests answered from a prefetched page"
+)
+prefetch_discarded = registry.counter(
+    "directory_prefetch_discarded_total",
+    "Prefetched pages dropped unused, or prefetches not started",
+    ["reason"],
+)
+
+
+@dataclass(slots=True)
+class _PrefetchedPage:
+    page: PaginatedOrganizations
+    versions: dict[str, int]
+    expires_at: float
+
+
+class PagePrefetcher:
+    """Fetch the page after a returned one in background and keep it briefly"""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_pages: int,
+        max_in_flight: int,
+        statement_timeout: float,
+    ) -> None:
+        self._ttl = ttl
+        self._max_pages = max_pages
+        self._max_in_flight = max_in_flight
+        self._statement_timeout = statement_timeout
+        self._pages: OrderedDict[str, _PrefetchedPage] = OrderedDict()
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def pop(self, key: str, versions: dict[str, int]) -> PaginatedOrganizations | None:
+        """Take prefetched page, unless it expired or data changed since"""
+        entry = self._pages.pop(key, None)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            prefetch_discarded.inc(reason="expired")
+            return None
+        if entry.versions != versions:
+            prefetch_discarded.inc(reason="stale")
+            return None
+
+        prefetch_hits.inc()
+        return entry.page
+
+    def schedule(
+        self,
+        key: str,
+        versions: dict[str, int],
+        fetch: Callable[[], Awaitable[PaginatedOrganizations]],
+    ) -> None:
+        if key in self._pages:
+            return
+        if len(self._tasks) >= self._max_in_flight:
+            prefetch_discarded.inc(reason="busy")
+            return
+
+        # Fresh context, the page must not inherit deadline of finished request.
+        task = asyncio.create_task(
+            self._prefetch(key, dict(versions), fetch),
+            context=contextvars.Context(),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prefetch(
+        self,
+        key: str,
+        versions: dict[str, int],
+        fetch: Callable[[], Awaitable[PaginatedOrganizations]],
+    ) -> None:
+        try:
+            with deadline(self._statement_timeout):
+                page = await fetch()
+        except Exception:
+            logger.warning("Page prefetch failed", exc_info=True)
+            return
+
+        prefetched_pages.inc()
+        self._pages[key] = _PrefetchedPage(
+            page=page, versions=versions, expires_at=time.monotonic() + self._ttl
+        )
+        self._pages.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        # Entries share one ttl, so insertion order is also expiry order.
+        now = time.monotonic()
+        while self._pages and next(iter(self._pages.values())).expires_at <= now:
+            self._pages.popitem(last=False)
+            prefetch_discarded.inc(reason="expired")
+        while len(self._pages) > self._max_pages:
+            self._pages.popitem(last=False)
+            prefetch_discarded.inc(reason="evicted")
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,29 +1,173 @@
+from collections.abc import Awaitable, Callable, Iterable, Sequence
 from uuid import UUID
 
+from pydantic import TypeAdapter
+
 from src.dto import (
+    ActivityTreeNode,
     BuildingFilter,
+    ChangeFilter,
+    DirectoryChangePage,
     Organization,
+    OrganizationExpand,
     OrganizationFilter,
+    OrganizationSyncResult,
+    OrganizationUpsert,
     PaginatedBuildings,
     PaginatedOrganizations,
 )
 from src.repository.directory import DirectoryRepositoryProtocol
+from src.tracing import traced
+
+from .activity_tree import ActivityTreeSnapshot
+from .cache import ResultCache
+from .data_version import DataVersionTracker
+from .prefetch import PagePrefetcher
+from .single_flight import SingleFlight
+
+# Tables each cached response is built from.
+ORGANIZATION_LIST_TABLES = (
+    "organization",
+    "building",
+    "activity",
+    "organization_activity",
+)
+ORGANIZATION_DETAIL_TABLES = (*ORGANIZATION_LIST_TABLES, "organization_phone_number")
+BUILDING_LIST_TABLES = ("building",)
+
+ORGANIZATION_PAGE_ADAPTER = TypeAdapter(PaginatedOrganizations)
+BUILDING_PAGE_ADAPTER = TypeAdapter(PaginatedBuildings)
+
+
+def organization_list_tables(filter: OrganizationFilter) -> tuple[str, ...]:
+    if OrganizationExpand.PHONES in filter.expand:
+        return ORGANIZATION_DETAIL_TABLES
+    return ORGANIZATION_LIST_TABLES
 
 
 class DirectoryService:
-    def __init__(self, directory_repository: DirectoryRepositoryProtocol):
+    def __init__(
+        self,
+        directory_repository: DirectoryRepositoryProtocol,
+        data_versions: DataVersionTracker,
+        single_flight: SingleFlight,
+        activity_tree: ActivityTreeSnapshot,
+        prefetcher: PagePrefetcher | None = None,
+        cache: ResultCache | None = None,
+    ):
         self.directory_repository = directory_repository
+        self.data_versions = data_versions
+        self.single_flight = single_flight
+        self.activity_tree = activity_tree
+        self.prefetcher = prefetcher
+        self.cache = cache
+
+    async def _cached[T](
+        self,
+        scope: str,
+        query: str,
+        tables: Iterable[str],
+        adapter: TypeAdapter[T],
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        if self.cache is None:
+            return await fetch()
 
+        # Versions are read before the fetch, so a stored result is never
+        # older than the version it is stored under.
+        key = f"{scope}\n{query}"
+        version = await self.data_versions.version_key(tables)
+        value = self.cache.get(key, version, adapter)
+        if value is None:
+            value = await fetch()
+            self.cache.set(key, version, value, adapter)
+        return value
+
+    @traced("DirectoryService.get_organizations")
     async def get_organizations(
         self, filter: OrganizationFilter
     ) -> PaginatedOrganizations:
-        organizations = await self.directory_repository.get_organizations(filter)
-        return organizations
+        if filter.snapshot:
+            # Session pages are cheap slices bound to a session that expires,
+            # they are neither cached nor prefetched.
+            return await self.directory_repository.get_organizations(filter)
+        if self.prefetcher is None:
+            return await self._fetch_organizations(filter)
+
+        versions = await self.data_versions.get_versions()
+        page = self.prefetcher.pop(filter.model_dump_json(), versions)
+        if page is None:
+            page = await self._fetch_organizations(filter)
+
+        if page.next_cursor is not None:
+            next_filter = filter.model_copy(
+                update={
+                    "pagination": filter.pagination.model_copy(
+                        update={"cursor": page.next_cursor}
+                    )
+                }
+            )
+            self.prefetcher.schedule(
+                next_filter.model_dump_json(),
+                versions,
+                lambda: self._fetch_organizations(next_filter),
+            )
+        return page
+
+    async def _fetch_organizations(
+        self, filter: OrganizationFilter
+    ) -> PaginatedOrganizations:
+        # Request for a page being prefetched joins the prefetch query.
+        return await self._cached(
+            "organizations",
+            filter.model_dump_json(),
+            organization_list_tables(filter),
+            ORGANIZATION_PAGE_ADAPTER,
+            lambda: self.single_flight.do(
+                "get_organizations",
+                filter.model_dump_json(),
+                lambda: self.directory_repository.get_organizations(filter),
+            ),
+        )
 
+    @traced("DirectoryService.get_organization")
     async def get_organization(self, organization_uuid: UUID) -> Organization | None:
-        return await self.directory_repository.get_organization_by_uuid(
-            organization_uuid
+        return await self.single_flight.do(
+            "get_organization",
+            organization_uuid,
+            lambda: self.directory_repository.get_organization_by_uuid(
+                organization_uuid
+            ),
         )
 
+    @traced("DirectoryService.get_buildings")
     async def get_buildings(self, filter: BuildingFilter) -> PaginatedBuildings:
-        return await self.directory_repository.get_buildings(filter)
+        return await self._cached(
+            "buildings",
+            filter.model_dump_json(),
+            BUILDING_LIST_TABLES,
+            BUILDING_PAGE_ADAPTER,
+            lambda: self.single_flight.do(
+                "get_buildings",
+                filter.model_dump_json(),
+                lambda: self.directory_repository.get_buildings(filter),
+            ),
+        )
+
+    @traced("DirectoryService.sync_organizations")
+    async def sync_organizations(
+        self, organizations: Sequence[OrganizationUpsert]
+    ) -> OrganizationSyncResult:
+        result = await self.directory_repository.sync_organizations(organizations)
+        self.data_versions.invalidate()
+        return result
+
+    @traced("DirectoryService.get_changes")
+    async def get_changes(self, filter: ChangeFilter) -> DirectoryChangePage:
+        return await self.directory_repository.get_changes(filter)
+
+    async def get_activity_tree(self) -> list[ActivityTreeNode]:
+        return await self.activity_tree.get_tree()
+
+    async def find_activities(self, name: str | None) -> list[ActivityTreeNode]:
+        return await self.activity_tree.find(name)
@@ -0,0 +1,97 @@
+import asyncio
+import contextvars
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+
+from src.config import settings
+from src.database import StatementTimeoutError, statement_deadline
+from src.metrics import registry
+
+single_flight_calls = registry.counter(
+    "directory_single_flight_calls_total",
+    "Service calls routed through single-flight",
+    ["operation"],
+)
+single_flight_coalesced = registry.counter(
+    "directory_single_flight_coalesced_total",
+    "Service calls that joined an identical call already in flight",
+    ["operation"],
+)
+
+
+class _Flight[T]:
+    def __init__(self, task: asyncio.Task[T]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run identical concurrent calls once and share the result with all callers"""
+
+    def __init__(self) -> None:
+        self._flights: dict[tuple[str, Hashable], _Flight] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do[T](
+        self,
+        operation: str,
+        key: Hashable,
+        call: Callable[[], Awaitable[T]],
+    ) -> T:
+        flight_key = (operation, key)
+        single_flight_calls.inc(operation=operation)
+
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            flight = _Flight(self._start(operation, call))
+            self._flights[flight_key] = flight
+            flight.task.add_done_callback(partial(self._forget, flight_key, flight))
+        else:
+            single_flight_coalesced.inc(operation=operation)
+
+        flight.waiters += 1
+        try:
+            # Shield keeps shared call alive when one of its callers is cancelled
+            # or runs out of its own deadline.
+            return await asyncio.wait_for(
+                asyncio.shield(flight.task), timeout=self._remaining()
+            )
+        except TimeoutError as exc:
+            raise StatementTimeoutError("Statement timeout exceeded") from exc
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is waiting anymore, next caller starts a fresh call.
+                self._forget(flight_key, flight)
+                flight.task.cancel()
+
+    @staticmethod
+    def _start[T](operation: str, call: Callable[[], Awaitable[T]]) -> asyncio.Task[T]:
+        # Shared call must not inherit the deadline of whichever caller came
+        # first, it runs in a fresh context with the endpoint budget.
+        budget_ms = settings.STATEMENT_TIMEOUTS_MS.get(
+            operation, settings.STATEMENT_TIMEOUT_DEFAULT_MS
+        )
+        context = contextvars.Context()
+        context.run(statement_deadline.set, time.monotonic() + budget_ms / 1000)
+        return asyncio.get_running_loop().create_task(call(), context=context)
+
+    @staticmethod
+    def _remaining() -> float | None:
+        deadline_at = statement_deadline.get()
+        if deadline_at is None:
+            return None
+        return max(deadline_at - time.monotonic(), 0)
+
+    def _forget(
+        self,
+        flight_key: tuple[str, Hashable],
+        flight: _Flight,
+        _task: asyncio.Future | None = None,
+    ) -> None:
+        if self._flights.get(flight_key) is flight:
+            del self._flights[flight_key]
@@ -0,0 +1,35 @@
+import logging
+
+from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.repository.directory import DirectoryRepositoryProtocol
+from src.service import DataVersionTracker
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_ERRORS = (SQLAlchemyError, OSError)
+
+
+async def warm_up(app: FastAPI) -> None:
+    """Prepare worker so that first request is served like any other one"""
+    container = app.state.dishka_container
+
+    directory_repository = await container.get(DirectoryRepositoryProtocol)
+    await directory_repository.warm_up()
+
+    data_versions = await container.get(DataVersionTracker)
+    await data_versions.get_versions()
+
+    app.openapi()
+    app.state.ready = True
+
+
+async def try_warm_up(app: FastAPI) -> bool:
+    """Warm up worker, failure leaves it not ready instead of stopping it"""
+    try:
+        await warm_up(app)
+    except WARM_UP_ERRORS:
+        logger.exception("Worker warm-up failed, readiness probe will retry")
+        return False
+    return True
@@ -0,0 +1,224 @@
+import functools
+import json
+import os
+import random
+import re
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+from src.config import settings
+from src.private_files import open_private
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_random_bits = random.getrandbits
+
+
+@dataclass(slots=True)
+class Span:
+    # Ids are kept as integers, hex formatting is deferred until spans are read.
+    trace_id: int
+    span_id: int
+    parent_id: int | None
+    name: str
+    start_time_ns: int
+    duration_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": format_trace_id(self.trace_id),
+            "span_id": format_span_id(self.span_id),
+            "parent_id": None
+            if self.parent_id is None
+            else format_span_id(self.parent_id),
+            "name": self.name,
+            "start_time_ns": self.start_time_ns,
+            "duration_ns": self.duration_ns,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def format_trace_id(trace_id: int) -> str:
+    return f"{trace_id:032x}"
+
+
+def format_span_id(span_id: int) -> str:
+    return f"{span_id:016x}"
+
+
+def parse_traceparent(header: str | None) -> tuple[int, int] | None:
+    """Trace id and parent span id from W3C traceparent header"""
+    if not header:
+        return None
+    match = TRACEPARENT_RE.match(header.strip().lower())
+    if match is None:
+        return None
+    trace_id, parent_id = int(match.group(1), 16), int(match.group(2), 16)
+    if not trace_id or not parent_id:
+        return None
+    return trace_id, parent_id
+
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{format_trace_id(span.trace_id)}-{format_span_id(span.span_id)}-01"
+
+
+class RingBufferExporter:
+    """Keeps the latest finished spans in memory"""
+
+    def __init__(self, capacity: int) -> None:
+        self.spans: deque[Span] = deque(maxlen=capacity)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+class FileExporter:
+    """Appends finished spans to a JSON lines file shared by worker processes"""
+
+    def __init__(self, path: Path) -> None:
+        # Each line goes out in one write() on an O_APPEND descriptor, so it
+        # lands whole at the end of the file even when several workers append,
+        # and is visible to readers right away.
+        self._fd = open_private(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+
+    def export(self, span: Span) -> None:
+        os.write(self._fd, (json.dumps(span.to_dict()) + "\n").encode("utf-8"))
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class SpanScope:
+    """Context manager making the recorded span current for its duration"""
+
+    __slots__ = ("_attributes", "_exporter", "_name", "_parent", "_span", "_token")
+
+    def __init__(
+        self,
+        exporter: RingBufferExporter | FileExporter,
+        name: str,
+        parent: tuple[int, int] | None,
+        attributes: dict[str, Any],
+    ) -> None:
+        self._exporter = exporter
+        self._name = name
+        self._parent = parent
+        self._attributes = attributes
+
+    def __enter__(self) -> Span:
+        if self._parent is not None:
+            trace_id, parent_id = self._parent
+        elif (current := current_span.get()) is not None:
+            trace_id, parent_id = current.trace_id, current.span_id
+        else:
+            trace_id, parent_id = _random_bits(128), None
+
+        span = Span(
+            trace_id,
+            _random_bits(64),
+            parent_id,
+            self._name,
+            time.time_ns(),
+            attributes=self._attributes,
+        )
+        self._span = span
+        self._token = current_span.set(span)
+        # Wall clock start is for display, duration uses monotonic clock.
+        span.duration_ns = time.perf_counter_ns()
+        return span
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_: object) -> None:
+        span = self._span
+        span.duration_ns = time.perf_counter_ns() - span.duration_ns
+        if exc_type is not None:
+            span.error = exc_type.__name__
+        current_span.reset(self._token)
+        self._exporter.export(span)
+
+
+class NoopSpanScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *_: object) -> None:
+        return None
+
+
+NOOP_SPAN_SCOPE = NoopSpanScope()
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self._exporter: RingBufferExporter | FileExporter | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.TRACING_ENABLED
+
+    @property
+    def exporter(self) -> RingBufferExporter | FileExporter:
+        if self._exporter is None:
+            if settings.TRACING_EXPORTER == "file":
+                self._exporter = FileExporter(settings.TRACING_FILE_PATH)
+            else:
+                self._exporter = RingBufferExporter(settings.TRACING_BUFFER_SIZE)
+        return self._exporter
+
+    def span(
+        self,
+        name: str,
+        parent: tuple[int, int] | None = None,
+        **attributes: Any,
+    ) -> SpanScope | NoopSpanScope:
+        """Record span as child of current span, or of remote parent if given"""
+        if not settings.TRACING_ENABLED:
+            return NOOP_SPAN_SCOPE
+        return SpanScope(self.exporter, name, parent, attributes)
+
+    def close(self) -> None:
+        if isinstance(self._exporter, FileExporter):
+            self._exporter.close()
+            self._exporter = None
+
+    def recent_spans(self) -> list[Span]:
+        """Spans kept by in-memory exporter, empty when exporting to file"""
+        exporter = self.exporter
+        if isinstance(exporter, RingBufferExporter):
+            return list(exporter.spans)
+        return []
+
+
+tracer = Tracer()
+
+
+def traced(
+    name: str,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """Record every call of decorated coroutine function as a span"""
+
+    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            with tracer.span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -15,7 +15,7 @@ from httpx import ASGITransport, AsyncClient
 from testcontainers.postgres import PostgresContainer
 
 from src.app import App
-from src.config import settings
+from src.config import ApiKeySettings, settings
 from src.dependencies import AppProvider, DatabaseProvider
 from tests.integration.fixtures.db import (  # noqa: F401
     insert_activity,
@@ -24,9 +24,15 @@ from tests.integration.fixtures.db import (  # noqa: F401
     insert_organization_activity,
     insert_organization_phone,
 )
+from tests.integration.fixtures.large_dataset import (
+    LargeDatasetKeys,
+    fetch_large_dataset_keys,
+    seed_large_dataset,
+)
 
 logger = logging.getLogger(__name__)
 DB_CLONE_LOCK_KEY = 74123091
+WRITER_API_KEY = ApiKeySettings(name="writer", key="writer-key", can_write=True)
 
 
 def _safe_identifier(value: str) -> str:
@@ -104,6 +110,23 @@ async def _release_db_clone_lock(conn: asyncpg.Connection) -> None:
     await conn.execute("SELECT pg_advisory_unlock($1)", DB_CLONE_LOCK_KEY)
 
 
+async def _clone_template_db(
+    pg: dict[str, str | int], template_db: str, database_name: str
+) -> None:
+    """Create database as a copy of the migrated template."""
+    admin_conn = await _connect(pg, "postgres")
+    try:
+        await _acquire_db_clone_lock(admin_conn)
+        try:
+            await admin_conn.execute(
+                f'CREATE DATABASE "{database_name}" TEMPLATE "{template_db}"'
+            )
+        finally:
+            await _release_db_clone_lock(admin_conn)
+    finally:
+        await admin_conn.close()
+
+
 @pytest.fixture(scope="session")
 def postgres_container() -> Generator[dict[str, str | int], None, None]:
     """Start PostGIS container for integration tests session."""
@@ -113,6 +136,9 @@ def postgres_container() -> Generator[dict[str, str | int], None, None]:
         username=settings.POSTGRES_USER,
         password=settings.POSTGRES_PASSWORD,
         dbname="postgres",
+    ).with_command(
+        # Activity moves across shards use two-phase commit.
+        "postgres -c max_prepared_transactions=16"
     ) as container:
         logger.info("PostGIS test container is ready")
         yield {
@@ -158,18 +184,7 @@ async def test_db(
     test_db_name = _safe_identifier(f"test_case_{uuid.uuid4().hex[:12]}")
     logger.info("Creating test DB: %s from template %s", test_db_name, template_db)
     await _drop_database_if_exists(postgres_container, test_db_name)
-
-    admin_conn = await _connect(postgres_container, "postgres")
-    try:
-        await _acquire_db_clone_lock(admin_conn)
-        try:
-            await admin_conn.execute(
-                f'CREATE DATABASE "{test_db_name}" TEMPLATE "{template_db}"'
-            )
-        finally:
-            await _release_db_clone_lock(admin_conn)
-    finally:
-        await admin_conn.close()
+    await _clone_template_db(postgres_container, template_db, test_db_name)
 
     yield test_db_name
 
@@ -177,6 +192,81 @@ async def test_db(
     await _drop_database_if_exists(postgres_container, test_db_name)
 
 
+@pytest.fixture
+async def second_shard_db(
+    postgres_container: dict[str, str | int], template_db: str
+) -> AsyncGenerator[str]:
+    """Create one more isolated database clone, used as a second shard."""
+    shard_db_name = _safe_identifier(f"test_shard_{uuid.uuid4().hex[:12]}")
+    logger.info("Creating shard DB: %s from template %s", shard_db_name, template_db)
+    await _drop_database_if_exists(postgres_container, shard_db_name)
+    await _clone_template_db(postgres_container, template_db, shard_db_name)
+
+    yield shard_db_name
+
+    logger.info("Dropping shard DB: %s", shard_db_name)
+    await _drop_database_if_exists(postgres_container, shard_db_name)
+
+
+@pytest.fixture
+async def second_shard_conn(
+    postgres_container: dict[str, str | int], second_shard_db: str
+) -> AsyncGenerator[asyncpg.Connection]:
+    """Provide direct asyncpg connection to the second shard database."""
+    conn = await _connect(postgres_container, second_shard_db)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+@pytest.fixture
+def shard_dsns(
+    postgres_container: dict[str, str | int], test_db: str, second_shard_db: str
+) -> tuple[str, str]:
+    """SQLAlchemy DSNs of the test database and the second shard database."""
+    return (
+        _build_sqlalchemy_async_dsn(postgres_container, test_db),
+        _build_sqlalchemy_async_dsn(postgres_container, second_shard_db),
+    )
+
+
+@pytest.fixture(scope="module")
+async def large_dataset(
+    postgres_container: dict[str, str | int], template_db: str
+) -> AsyncGenerator[LargeDatasetKeys]:
+    """Create database clone seeded with large dataset, shared by a test module."""
+    large_db_name = _safe_identifier(f"test_large_{uuid.uuid4().hex[:12]}")
+    logger.info("Creating large dataset DB: %s", large_db_name)
+    await _drop_database_if_exists(postgres_container, large_db_name)
+    await _clone_template_db(postgres_container, template_db, large_db_name)
+
+    conn = await _connect(postgres_container, large_db_name)
+    try:
+        await seed_large_dataset(conn)
+        keys = await fetch_large_dataset_keys(conn, large_db_name)
+    finally:
+        await conn.close()
+    logger.info("Large dataset DB is ready: %s", large_db_name)
+
+    yield keys
+
+    logger.info("Dropping large dataset DB: %s", large_db_name)
+    await _drop_database_if_exists(postgres_container, large_db_name)
+
+
+@pytest.fixture
+async def large_dataset_conn(
+    postgres_container: dict[str, str | int], large_dataset: LargeDatasetKeys
+) -> AsyncGenerator[asyncpg.Connection]:
+    """Provide direct asyncpg connection to the large dataset database."""
+    conn = await _connect(postgres_container, large_dataset["database"])
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
 @pytest.fixture
 async def db_conn(
     postgres_container: dict[str, str | int], test_db: str
@@ -190,11 +280,26 @@ async def db_conn(
 
 
 @pytest.fixture
-async def app(
+async def second_db_conn(
     postgres_container: dict[str, str | int], test_db: str
-) -> AsyncGenerator[FastAPI]:
+) -> AsyncGenerator[asyncpg.Connection]:
+    """Provide one more connection to the test database for concurrent writes."""
+    conn = await _connect(postgres_container, test_db)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+@pytest.fixture
+def test_dsn(postgres_container: dict[str, str | int], test_db: str) -> str:
+    """SQLAlchemy DSN of the current isolated test database."""
+    return _build_sqlalchemy_async_dsn(postgres_container, test_db)
+
+
+@pytest.fixture
+async def app(test_dsn: str) -> AsyncGenerator[FastAPI]:
     """Build FastAPI app wired to the test-specific database."""
-    test_dsn = _build_sqlalchemy_async_dsn(postgres_container, test_db)
     fastapi_app: FastAPI = App.create_fastapi_app()
     container: AsyncContainer = make_async_container(
         AppProvider(),
@@ -217,3 +322,10 @@ async def client(app: FastAPI) -> AsyncGenerator[AsyncClient]:
         headers={"Authorization": f"Bearer {settings.API_KEY}"},
     ) as test_client:
         yield test_client
+
+
+@pytest.fixture
+def write_headers(monkeypatch: pytest.MonkeyPatch) -> dict[str, str]:
+    """Register an API key allowed to write and return its auth header."""
+    monkeypatch.setattr(settings, "API_KEYS", [WRITER_API_KEY])
+    return {"Authorization": f"Bearer {WRITER_API_KEY.key}"}
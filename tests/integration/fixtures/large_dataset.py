@@ -0,0 +1,164 @@
+from datetime import datetime
+from typing import TypedDict
+from uuid import UUID
+
+import asyncpg
+
+LARGE_DATASET_BUILDINGS = 20_000
+LARGE_DATASET_ORGANIZATIONS = 200_000
+
+
+class LargeDatasetKeys(TypedDict):
+    database: str
+    building_id: UUID
+    second_building_id: UUID
+    root_activity_id: UUID
+    leaf_activity_id: UUID
+    second_leaf_activity_id: UUID
+    organization_id: UUID
+    cursor_created_at: datetime
+    cursor_id: UUID
+
+
+async def seed_large_dataset(conn: asyncpg.Connection) -> None:
+    """Seed deterministic dataset big enough for planner to prefer indexes."""
+    await conn.execute(
+        """
+        INSERT INTO activity (id, name, parent_id)
+        SELECT gen_random_uuid(), 'Root ' || r, NULL
+        FROM generate_series(1, 6) AS r
+        """
+    )
+    await conn.execute(
+        """
+        INSERT INTO activity (id, name, parent_id)
+        SELECT gen_random_uuid(), parent.name || ' / ' || c, parent.id
+        FROM activity AS parent, generate_series(1, 5) AS c
+        WHERE parent.parent_id IS NULL
+        """
+    )
+    await conn.execute(
+        """
+        INSERT INTO activity (id, name, parent_id)
+        SELECT gen_random_uuid(), parent.name || ' / ' || c, parent.id
+        FROM activity AS parent, generate_series(1, 4) AS c
+        WHERE parent.parent_id IS NOT NULL
+        """
+    )
+    await conn.execute(
+        """
+        INSERT INTO building (id, address, location, created_at)
+        SELECT
+            gen_random_uuid(),
+            'Test City, Street ' || n,
+            ST_SetSRID(
+                ST_MakePoint(
+                    30 + ((n * 7919) % 10000) / 1000.0,
+                    50 + ((n * 104729) % 10000) / 1000.0
+                ),
+                4326
+            )::geography,
+            timestamptz '2025-01-01 00:00+00' + n * interval '1 minute'
+        FROM generate_series(1, $1) AS n
+        """,
+        LARGE_DATASET_BUILDINGS,
+    )
+    # Organizations are created in February; neighbouring months show pruning.
+    await conn.execute(
+        "SELECT create_organization_search_partitions('2025-01-01', '2025-04-01')"
+    )
+    await conn.execute(
+        """
+        INSERT INTO organization (id, name, building_id, created_at)
+        SELECT
+            gen_random_uuid(),
+            (ARRAY['Coffee', 'Bakery', 'Clinic', 'Bank', 'Code', 'Market'])
+                [1 + n % 6] || ' ' || substr(md5(n::text), 1, 8),
+            b.ids[1 + (n * 31) % array_length(b.ids, 1)],
+            timestamptz '2025-02-01 00:00+00' + n * interval '10 seconds'
+        FROM
+            generate_series(1, $1) AS n,
+            (SELECT array_agg(id ORDER BY created_at, id) AS ids FROM building) AS b
+        """,
+        LARGE_DATASET_ORGANIZATIONS,
+    )
+    await conn.execute(
+        """
+        WITH numbered AS (
+            SELECT id, row_number() OVER (ORDER BY created_at, id) AS n
+            FROM organization
+        ),
+        leaves AS (
+            SELECT array_agg(a.id ORDER BY a.id) AS ids
+            FROM activity AS a
+            WHERE NOT EXISTS (
+                SELECT 1 FROM activity AS child WHERE child.parent_id = a.id
+            )
+        )
+        INSERT INTO organization_activity (organization_id, activity_id)
+        SELECT numbered.id, leaves.ids[1 + (numbered.n * k) % array_length(leaves.ids, 1)]
+        FROM numbered, leaves, generate_series(1, 2) AS k
+        WHERE k = 1 OR numbered.n % 3 = 0
+        ON CONFLICT DO NOTHING
+        """
+    )
+    await conn.execute(
+        """
+        INSERT INTO organization_phone_number (id, organization_id, phone_number)
+        SELECT
+            gen_random_uuid(),
+            numbered.id,
+            '+7 (495) ' || lpad(((numbered.n * 13 + p) % 10000000)::text, 7, '0')
+        FROM (
+            SELECT id, row_number() OVER (ORDER BY created_at, id) AS n
+            FROM organization
+        ) AS numbered, generate_series(1, 2) AS p
+        WHERE p = 1 OR numbered.n % 2 = 0
+        """
+    )
+    await conn.execute("ANALYZE")
+
+
+async def fetch_large_dataset_keys(
+    conn: asyncpg.Connection, database: str
+) -> LargeDatasetKeys:
+    """Pick representative keys used as filter values in plan checks."""
+    building_id = await conn.fetchval(
+        "SELECT id FROM building ORDER BY created_at, id OFFSET $1 LIMIT 1",
+        LARGE_DATASET_BUILDINGS // 2,
+    )
+    second_building_id = await conn.fetchval(
+        "SELECT id FROM building ORDER BY created_at, id OFFSET $1 LIMIT 1",
+        LARGE_DATASET_BUILDINGS // 4,
+    )
+    root_activity_id = await conn.fetchval(
+        "SELECT id FROM activity WHERE parent_id IS NULL ORDER BY name LIMIT 1"
+    )
+    leaf_activity_ids = await conn.fetch(
+        """
+        SELECT a.id
+        FROM activity AS a
+        WHERE NOT EXISTS (SELECT 1 FROM activity AS child WHERE child.parent_id = a.id)
+        ORDER BY a.name
+        LIMIT 2
+        """
+    )
+    cursor_row = await conn.fetchrow(
+        "SELECT id, created_at FROM organization ORDER BY created_at, id "
+        "OFFSET $1 LIMIT 1",
+        LARGE_DATASET_ORGANIZATIONS // 2,
+    )
+    if cursor_row is None:
+        raise RuntimeError("Large dataset is empty")
+
+    return {
+        "database": database,
+        "building_id": building_id,
+        "second_building_id": second_building_id,
+        "root_activity_id": root_activity_id,
+        "leaf_activity_id": leaf_activity_ids[0]["id"],
+        "second_leaf_activity_id": leaf_activity_ids[1]["id"],
+        "organization_id": cursor_row["id"],
+        "cursor_created_at": cursor_row["created_at"],
+        "cursor_id": cursor_row["id"],
+    }
@@ -0,0 +1,29 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.database import Database
+
+
+@pytest.mark.asyncio
+async def test_live_does_not_require_api_key(client: AsyncClient) -> None:
+    """Liveness probe answers without authorization."""
+    response = await client.get("/health/live", headers={"Authorization": ""})
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_ready_warms_up_worker(app: FastAPI, client: AsyncClient) -> None:
+    """Readiness probe finishes warm-up: pool is open and OpenAPI is built."""
+    assert not getattr(app.state, "ready", False)
+
+    response = await client.get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    assert app.state.ready is True
+    assert app.openapi_schema is not None
+    database = await app.state.dishka_container.get(Database)
+    assert database.engine.pool.checkedin() == database.pool_size
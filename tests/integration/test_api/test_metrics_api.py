@@ -0,0 +1,75 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.repository.directory import DirectoryRepositoryProtocol
+from tests.integration.factories.building_factory import build_building_payload
+from tests.integration.fixtures.db import InsertBuildingFixture
+
+
+def _metric(body: str, sample: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(f"{sample} "):
+            return float(line.split(" ")[1])
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_single_flight(
+    app: FastAPI,
+    client: AsyncClient,
+    insert_building: InsertBuildingFixture,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Identical concurrent reads get the same page and are counted by metrics."""
+    await insert_building(**build_building_payload(index=80))
+    repository = await app.state.dishka_container.get(DirectoryRepositoryProtocol)
+    get_buildings = repository.get_buildings
+    backend_calls = 0
+
+    async def slow_get_buildings(filter):
+        nonlocal backend_calls
+        backend_calls += 1
+        # Keeps the call in flight until every request has arrived.
+        await asyncio.sleep(0.2)
+        return await get_buildings(filter)
+
+    monkeypatch.setattr(repository, "get_buildings", slow_get_buildings)
+    # Samples are labelled with the pid of the worker that served the scrape.
+    labels = f'{{operation="get_buildings",pid="{os.getpid()}"}}'
+    calls_sample = f"directory_single_flight_calls_total{labels}"
+    coalesced_sample = f"directory_single_flight_coalesced_total{labels}"
+    before = (await client.get("/metrics")).text
+
+    responses = await asyncio.gather(
+        *[
+            client.get(f"{API_V1_DIRECTORY_PREFIX}/building", params={"limit": 5})
+            for _ in range(8)
+        ]
+    )
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.text for response in responses}) == 1
+
+    after = await client.get("/metrics")
+    assert after.status_code == 200
+    assert after.headers["content-type"].startswith("text/plain")
+    calls = _metric(after.text, calls_sample) - _metric(before, calls_sample)
+    coalesced = _metric(after.text, coalesced_sample) - _metric(
+        before, coalesced_sample
+    )
+    assert calls == 8
+    assert 0 < backend_calls < calls
+    assert coalesced == calls - backend_calls
+
+
+@pytest.mark.asyncio
+async def test_metrics_requires_api_key(client: AsyncClient) -> None:
+    """Metrics endpoint is protected by the API key."""
+    response = await client.get("/metrics", headers={"Authorization": ""})
+
+    assert response.status_code == 401
@@ -0,0 +1,156 @@
+from datetime import datetime, timezone
+
+import asyncpg
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.dto import ActivityMove
+from src.repository.directory import DirectoryRepositoryProtocol
+from src.service import DataVersionTracker
+from src.service.activity_tree import activity_tree_rebuilds
+from tests.integration.fixtures.db import (
+    InsertActivityFixture,
+    InsertOrganizationActivityFixture,
+    InsertOrganizationFixture,
+)
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+@pytest.mark.asyncio
+async def test_get_activity_tree_returns_hierarchy_with_counts(
+    app: FastAPI,
+    client: AsyncClient,
+    insert_activity: InsertActivityFixture,
+    insert_organization: InsertOrganizationFixture,
+    insert_organization_activity: InsertOrganizationActivityFixture,
+) -> None:
+    """Tree nodes carry direct and distinct subtree counts, rebuilt after writes."""
+    food_id = await insert_activity(name="Food")
+    meat_id = await insert_activity(name="Meat", parent_id=food_id)
+    dairy_id = await insert_activity(name="Dairy", parent_id=food_id)
+    org_id = await insert_organization(
+        name="Farm Shop",
+        building_id=None,
+        created_at=datetime(2025, 1, 7, 10, 0, tzinfo=timezone.utc),
+    )
+    await insert_organization_activity(organization_id=org_id, activity_id=meat_id)
+    await insert_organization_activity(organization_id=org_id, activity_id=dairy_id)
+
+    response = await client.get(_url("/activity/tree"))
+
+    assert response.status_code == 200
+    (food,) = response.json()["items"]
+    assert food["name"] == "Food"
+    assert food["organization_count"] == 0
+    assert food["subtree_organization_count"] == 1
+    assert [
+        (child["name"], child["organization_count"]) for child in food["children"]
+    ] == [("Dairy", 1), ("Meat", 1)]
+
+    rebuilds = activity_tree_rebuilds.value()
+    cached = await client.get(_url("/activity/tree"))
+    assert cached.json() == response.json()
+    assert activity_tree_rebuilds.value() == rebuilds
+
+    other_id = await insert_organization(
+        name="Butcher",
+        building_id=None,
+        created_at=datetime(2025, 1, 7, 11, 0, tzinfo=timezone.utc),
+    )
+    await insert_organization_activity(organization_id=other_id, activity_id=meat_id)
+    tracker = await app.state.dishka_container.get(DataVersionTracker)
+    tracker.invalidate()
+
+    changed = await client.get(_url("/activity/tree"))
+    assert changed.json()["items"][0]["subtree_organization_count"] == 2
+    assert activity_tree_rebuilds.value() == rebuilds + 1
+
+
+@pytest.mark.asyncio
+async def test_get_activities_filters_by_name(
+    client: AsyncClient,
+    insert_activity: InsertActivityFixture,
+) -> None:
+    """Name lookup matches part of the name ignoring case."""
+    food_id = await insert_activity(name="Food")
+    await insert_activity(name="Seafood", parent_id=food_id)
+    await insert_activity(name="Cars")
+
+    response = await client.get(_url("/activity"), params={"name": "FOOD"})
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["name"] for item in items] == ["Food", "Seafood"]
+    assert items[1]["parent_uuid"] == str(food_id)
+
+
+@pytest.mark.asyncio
+async def test_move_activities_validates_tree_left_by_whole_batch(
+    app: FastAPI,
+    client: AsyncClient,
+    insert_activity: InsertActivityFixture,
+) -> None:
+    """Moves too deep one by one succeed together when the final tree is valid."""
+    food_id = await insert_activity(name="Food")
+    meat_id = await insert_activity(name="Meat", parent_id=food_id)
+    beef_id = await insert_activity(name="Beef", parent_id=meat_id)
+    cars_id = await insert_activity(name="Cars")
+    parts_id = await insert_activity(name="Parts", parent_id=cars_id)
+    repository = await app.state.dishka_container.get(DirectoryRepositoryProtocol)
+
+    moved = await repository.move_activities(
+        [
+            ActivityMove(activity_uuid=meat_id, parent_uuid=parts_id),
+            ActivityMove(activity_uuid=beef_id, parent_uuid=None),
+        ]
+    )
+
+    assert moved == 2
+    tracker = await app.state.dishka_container.get(DataVersionTracker)
+    tracker.invalidate()
+    response = await client.get(_url("/activity/tree"))
+    roots = response.json()["items"]
+    assert [root["name"] for root in roots] == ["Beef", "Cars", "Food"]
+    (parts,) = roots[1]["children"]
+    assert [child["name"] for child in parts["children"]] == ["Meat"]
+
+
+@pytest.mark.asyncio
+async def test_move_activities_rejects_invalid_batch_as_a_whole(
+    app: FastAPI,
+    db_conn: asyncpg.Connection,
+    insert_activity: InsertActivityFixture,
+) -> None:
+    """Cycle or depth violation anywhere in the batch leaves every parent intact."""
+    food_id = await insert_activity(name="Food")
+    meat_id = await insert_activity(name="Meat", parent_id=food_id)
+    beef_id = await insert_activity(name="Beef", parent_id=meat_id)
+    cars_id = await insert_activity(name="Cars")
+    repository = await app.state.dishka_container.get(DirectoryRepositoryProtocol)
+
+    with pytest.raises(ValueError, match="Activity hierarchy cycle detected"):
+        await repository.move_activities(
+            [
+                ActivityMove(activity_uuid=cars_id, parent_uuid=meat_id),
+                ActivityMove(activity_uuid=food_id, parent_uuid=cars_id),
+            ]
+        )
+    with pytest.raises(ValueError, match="Activity max depth exceeded: 4"):
+        await repository.move_activities(
+            [
+                ActivityMove(activity_uuid=cars_id, parent_uuid=beef_id),
+            ]
+        )
+
+    parents = await db_conn.fetch("SELECT id, parent_id FROM activity")
+    assert {row["id"]: row["parent_id"] for row in parents} == {
+        food_id: None,
+        meat_id: food_id,
+        beef_id: meat_id,
+        cars_id: None,
+    }
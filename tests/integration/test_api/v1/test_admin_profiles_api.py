@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_ADMIN_PREFIX, API_V1_DIRECTORY_PREFIX
+from src.config import settings
+
+ADMIN_API_KEY = "test-admin-key"
+
+
+@pytest.fixture
+def profiling_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", ADMIN_API_KEY)
+    monkeypatch.setattr(settings, "PROFILING_OUTPUT_DIR", tmp_path)
+    return tmp_path
+
+
+def _admin_headers() -> dict[str, str]:
+    return {"Authorization": f"Bearer {ADMIN_API_KEY}"}
+
+
+@pytest.mark.asyncio
+async def test_profiled_request_can_be_listed_and_downloaded(
+    client: AsyncClient, profiling_dir: Path
+) -> None:
+    """Request with admin profile header leaves flamegraph files for download."""
+    response = await client.get(
+        f"{API_V1_DIRECTORY_PREFIX}/building",
+        headers={"X-Profile-Request": ADMIN_API_KEY},
+    )
+    assert response.status_code == 200
+
+    listing = await client.get(
+        f"{API_V1_ADMIN_PREFIX}/profiles", headers=_admin_headers()
+    )
+    assert listing.status_code == 200
+    names = [item["name"] for item in listing.json()]
+    assert len(names) == 2
+    assert any(name.endswith(".collapsed") for name in names)
+
+    speedscope_name = next(name for name in names if name.endswith(".json"))
+    download = await client.get(
+        f"{API_V1_ADMIN_PREFIX}/profiles/{speedscope_name}", headers=_admin_headers()
+    )
+    assert download.status_code == 200
+    assert download.json()["profiles"][0]["type"] == "sampled"
+
+    missing = await client.get(
+        f"{API_V1_ADMIN_PREFIX}/profiles/missing.collapsed", headers=_admin_headers()
+    )
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profile_header_without_admin_key_is_ignored(
+    client: AsyncClient, profiling_dir: Path
+) -> None:
+    """Profile header with wrong key does not profile the request."""
+    response = await client.get(
+        f"{API_V1_DIRECTORY_PREFIX}/building",
+        headers={"X-Profile-Request": "not-admin"},
+    )
+
+    assert response.status_code == 200
+    assert list(profiling_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_admin_api_disabled_without_admin_key(client: AsyncClient) -> None:
+    """Admin endpoints are closed until ADMIN_API_KEY is configured."""
+    response = await client.get(f"{API_V1_ADMIN_PREFIX}/profiles")
+
+    assert response.status_code == 403
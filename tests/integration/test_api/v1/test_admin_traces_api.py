@@ -0,0 +1,71 @@
+import pytest
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_ADMIN_PREFIX, API_V1_DIRECTORY_PREFIX
+from src.config import settings
+from src.tracing import RingBufferExporter, tracer
+
+ADMIN_API_KEY = "test-admin-key"
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def tracing_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", ADMIN_API_KEY)
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracer, "_exporter", RingBufferExporter(capacity=1000))
+
+
+def _admin_headers() -> dict[str, str]:
+    return {"Authorization": f"Bearer {ADMIN_API_KEY}"}
+
+
+@pytest.mark.asyncio
+async def test_request_spans_continue_incoming_trace(
+    client: AsyncClient, tracing_enabled: None
+) -> None:
+    """Spans from router down to SQL join the caller trace and are viewable."""
+    response = await client.get(
+        f"{API_V1_DIRECTORY_PREFIX}/organization",
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"},
+    )
+    assert response.status_code == 200
+    assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+
+    trace = await client.get(
+        f"{API_V1_ADMIN_PREFIX}/traces/{TRACE_ID}", headers=_admin_headers()
+    )
+    assert trace.status_code == 200
+    spans = {span["name"]: span for span in trace.json()}
+    assert {
+        "router.get_organizations",
+        "DirectoryService.get_organizations",
+        "PostgresDirectoryRepository.get_organizations",
+        "db.pool_checkout",
+        "db.execute",
+        "serialize",
+    } <= spans.keys()
+
+    root = spans[f"GET {API_V1_DIRECTORY_PREFIX}/organization"]
+    assert root["parent_id"] == PARENT_SPAN_ID
+    assert spans["router.get_organizations"]["parent_id"] == root["span_id"]
+
+    listing = await client.get(
+        f"{API_V1_ADMIN_PREFIX}/traces", headers=_admin_headers()
+    )
+    assert TRACE_ID in [item["trace_id"] for item in listing.json()]
+
+
+@pytest.mark.asyncio
+async def test_tracing_disabled_records_nothing(
+    client: AsyncClient, tracing_enabled: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Disabled tracing neither records spans nor answers with traceparent."""
+    monkeypatch.setattr(settings, "TRACING_ENABLED", False)
+
+    response = await client.get(f"{API_V1_DIRECTORY_PREFIX}/building")
+
+    assert response.status_code == 200
+    assert "traceparent" not in response.headers
+    assert tracer.recent_spans() == []
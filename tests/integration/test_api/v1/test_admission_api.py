@@ -0,0 +1,36 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.api.admission import AdmissionController
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+@pytest.mark.asyncio
+async def test_expensive_requests_are_shed_before_cheap_ones(
+    app: FastAPI, client: AsyncClient
+) -> None:
+    """Near the limit searches get 503 while plain pages are still admitted."""
+    admission_controller = await app.state.dishka_container.get(AdmissionController)
+    admission_controller.limit = 4
+    admission_controller.in_flight = 2
+
+    search = await client.get(_url("/organization"), params={"name": "coffee"})
+    page = await client.get(_url("/organization"))
+
+    assert search.status_code == 503
+    assert search.headers["retry-after"] == "1"
+    assert page.status_code == 200
+    assert admission_controller.in_flight == 2
+
+    metrics = await client.get("/metrics")
+    assert (
+        "directory_admission_rejected_total"
+        f'{{request_class="expensive",pid="{os.getpid()}"}}' in metrics.text
+    )
@@ -76,6 +76,32 @@ async def test_get_buildings_pagination_with_cursor(
     assert second_payload["next_cursor"] is None
 
 
+@pytest.mark.asyncio
+async def test_get_buildings_sorted_by_address_with_cursor(
+    client: AsyncClient,
+    insert_building: InsertBuildingFixture,
+) -> None:
+    """Address order pages through buildings regardless of creation time."""
+    for index, address in enumerate(["Moscow, Zoo St, 1", "kazan, Main St, 2"]):
+        await insert_building(**build_building_payload(index=index, address=address))
+    await insert_building(
+        **build_building_payload(index=5, address="Moscow, Arbat St, 3")
+    )
+
+    listed: list[str] = []
+    params: dict[str, str | int] = {"limit": 2, "sort": "address"}
+    while True:
+        response = await client.get(_url("/building"), params=params)
+        assert response.status_code == 200
+        payload: dict = response.json()
+        listed.extend(item["address"] for item in payload["items"])
+        if payload["next_cursor"] is None:
+            break
+        params["cursor"] = payload["next_cursor"]
+
+    assert listed == ["kazan, Main St, 2", "Moscow, Arbat St, 3", "Moscow, Zoo St, 1"]
+
+
 @pytest.mark.asyncio
 async def test_get_buildings_invalid_cursor_returns_400(client: AsyncClient) -> None:
     """Returns 400 for malformed buildings cursor."""
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.config import settings
+from src.repository.directory import DirectoryRepositoryProtocol
+from src.service import ActivityTreeSnapshot, DataVersionTracker, SharedResultCache
+from src.service.activity_tree import activity_tree_rebuilds
+from src.service.cache import cache_lookups
+from tests.integration.fixtures.db import (
+    InsertActivityFixture,
+    InsertOrganizationFixture,
+)
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+@pytest.fixture
+def shared_cache_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    path = tmp_path / "directory-cache"
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "shared")
+    monkeypatch.setattr(settings, "CACHE_SHARED_PATH", path)
+    monkeypatch.setattr(settings, "CACHE_SHARED_SIZE_MB", 1)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_activity_tree_built_by_one_worker_is_reused_by_another(
+    shared_cache_path: Path,
+    app: FastAPI,
+    client: AsyncClient,
+    insert_activity: InsertActivityFixture,
+) -> None:
+    """Second worker with the same cache file does not rebuild the tree."""
+    food_id = await insert_activity(name="Food")
+    await insert_activity(name="Meat", parent_id=food_id)
+
+    response = await client.get(_url("/activity/tree"))
+    assert response.status_code == 200
+    rebuilds = activity_tree_rebuilds.value()
+
+    container = app.state.dishka_container
+    other_worker_cache = SharedResultCache(
+        shared_cache_path,
+        slots=settings.CACHE_MAX_ENTRIES,
+        size=settings.CACHE_SHARED_SIZE_MB * 1024 * 1024,
+    )
+    try:
+        other_worker_tree = ActivityTreeSnapshot(
+            directory_repository=await container.get(DirectoryRepositoryProtocol),
+            data_versions=await container.get(DataVersionTracker),
+            cache=other_worker_cache,
+        )
+        roots = await other_worker_tree.get_tree()
+    finally:
+        other_worker_cache.close()
+
+    assert [root.name for root in roots] == ["Food"]
+    assert [child.name for child in roots[0].children] == ["Meat"]
+    assert activity_tree_rebuilds.value() == rebuilds
+
+
+@pytest.mark.asyncio
+async def test_cached_organization_page_is_not_served_after_write(
+    shared_cache_path: Path,
+    app: FastAPI,
+    client: AsyncClient,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Page cached under old table versions is refetched once they change."""
+    await insert_organization(
+        name="Cached Org",
+        building_id=None,
+        created_at=datetime(2025, 1, 8, 10, 0, tzinfo=timezone.utc),
+    )
+    first = await client.get(_url("/organization"))
+    hits = cache_lookups.value(result="hit")
+
+    cached = await client.get(_url("/organization"))
+    assert cached.json() == first.json()
+    assert cache_lookups.value(result="hit") == hits + 1
+
+    await insert_organization(
+        name="Newer Org",
+        building_id=None,
+        created_at=datetime(2025, 1, 8, 11, 0, tzinfo=timezone.utc),
+    )
+    tracker = await app.state.dishka_container.get(DataVersionTracker)
+    tracker.invalidate()
+    stale = cache_lookups.value(result="stale")
+
+    changed = await client.get(_url("/organization"))
+    assert [item["name"] for item in changed.json()["items"]] == [
+        "Cached Org",
+        "Newer Org",
+    ]
+    assert cache_lookups.value(result="stale") == stale + 1
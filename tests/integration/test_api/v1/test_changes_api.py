@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.database import Database
+from src.repository.directory.postgres import PostgresDirectoryRepository
+from tests.integration.factories.building_factory import build_building_payload
+from tests.integration.fixtures.db import (
+    InsertBuildingFixture,
+    InsertOrganizationFixture,
+    InsertOrganizationPhoneFixture,
+)
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+@pytest.mark.asyncio
+async def test_get_changes_returns_compacted_deltas_since_token(
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+    insert_building: InsertBuildingFixture,
+    insert_organization: InsertOrganizationFixture,
+    insert_organization_phone: InsertOrganizationPhoneFixture,
+) -> None:
+    """Writes show up once per entity and later pages contain only new deltas."""
+    building_id = await insert_building(**build_building_payload(index=50))
+    org_id = await insert_organization(
+        name="Feed Org",
+        building_id=building_id,
+        created_at=datetime(2025, 1, 3, 10, 0, tzinfo=timezone.utc),
+    )
+    await insert_organization_phone(
+        organization_id=org_id, phone_number="+7 (495) 777-77-77"
+    )
+
+    first = await client.get(_url("/changes"))
+    assert first.status_code == 200
+    first_payload = first.json()
+    assert first_payload["items"] == [
+        {"entity": "building", "uuid": str(building_id), "op": "upsert"},
+        {"entity": "organization", "uuid": str(org_id), "op": "upsert"},
+    ]
+    assert first_payload["has_more"] is False
+
+    idle = await client.get(
+        _url("/changes"), params={"since": first_payload["next_token"]}
+    )
+    assert idle.status_code == 200
+    assert idle.json()["items"] == []
+    assert idle.json()["next_token"] == first_payload["next_token"]
+
+    await db_conn.execute("DELETE FROM organization WHERE id = $1", org_id)
+
+    after_delete = await client.get(
+        _url("/changes"), params={"since": first_payload["next_token"]}
+    )
+    assert after_delete.status_code == 200
+    assert after_delete.json()["items"] == [
+        {"entity": "organization", "uuid": str(org_id), "op": "delete"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_changes_respects_page_size(
+    client: AsyncClient,
+    insert_building: InsertBuildingFixture,
+) -> None:
+    """Pages are bounded by limit and has_more signals remaining changes."""
+    for index in range(3):
+        await insert_building(**build_building_payload(index=60 + index))
+
+    first = await client.get(_url("/changes"), params={"limit": 2})
+    assert first.status_code == 200
+    assert len(first.json()["items"]) == 2
+    assert first.json()["has_more"] is True
+
+    second = await client.get(
+        _url("/changes"), params={"limit": 2, "since": first.json()["next_token"]}
+    )
+    assert len(second.json()["items"]) == 1
+    assert second.json()["has_more"] is False
+
+
+@pytest.mark.asyncio
+async def test_get_changes_invalid_token_returns_400(client: AsyncClient) -> None:
+    """Returns 400 for malformed change token."""
+    response = await client.get(_url("/changes?since=not-a-token"))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid change token"
+
+
+@pytest.mark.asyncio
+async def test_get_changes_token_before_pruned_changes_expires(
+    app: FastAPI,
+    client: AsyncClient,
+    insert_building: InsertBuildingFixture,
+) -> None:
+    """Tokens behind pruned changes get 400, tokens past them keep working."""
+    await insert_building(**build_building_payload(index=70))
+    old_token = (await client.get(_url("/changes"))).json()["next_token"]
+    await insert_building(**build_building_payload(index=71))
+    recent = await client.get(_url("/changes"), params={"since": old_token})
+    recent_token = recent.json()["next_token"]
+    database = await app.state.dishka_container.get(Database)
+
+    pruned = await PostgresDirectoryRepository(database).prune_changes(
+        datetime.now(timezone.utc) + timedelta(minutes=1)
+    )
+
+    assert pruned == 2
+    expired = await client.get(_url("/changes"), params={"since": old_token})
+    assert expired.status_code == 400
+    assert expired.json()["detail"] == (
+        "Change token has expired, start again without since"
+    )
+    current = await client.get(_url("/changes"), params={"since": recent_token})
+    assert current.status_code == 200
+    assert current.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_prune_removes_a_prefix_of_the_feed(
+    app: FastAPI,
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+) -> None:
+    """A young change of an earlier transaction goes with an older later one."""
+    now = datetime.now(timezone.utc)
+    # Transaction 1 committed after transaction 2 that started days earlier.
+    for tx_id, changed_at in ((1, now), (2, now - timedelta(days=2)), (3, now)):
+        await db_conn.execute(
+            "INSERT INTO directory_change (entity, entity_id, op, tx_id, changed_at)"
+            " VALUES ('building', gen_random_uuid(), 'upsert', $1, $2)",
+            tx_id,
+            changed_at,
+        )
+    database = await app.state.dishka_container.get(Database)
+
+    pruned = await PostgresDirectoryRepository(database).prune_changes(
+        now - timedelta(days=1)
+    )
+
+    assert pruned == 2
+    first = await client.get(_url("/changes"))
+    assert len(first.json()["items"]) == 1
+    following = await client.get(
+        _url("/changes"), params={"since": first.json()["next_token"]}
+    )
+    assert following.status_code == 200
+    assert following.json()["items"] == []
@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.service import DataVersionTracker
+from tests.integration.factories.building_factory import build_building_payload
+from tests.integration.fixtures.db import (
+    InsertBuildingFixture,
+    InsertOrganizationFixture,
+    InsertOrganizationPhoneFixture,
+)
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+async def _expire_data_versions(app: FastAPI) -> None:
+    tracker = await app.state.dishka_container.get(DataVersionTracker)
+    tracker.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_not_modified_until_data_changes(
+    app: FastAPI,
+    client: AsyncClient,
+    insert_building: InsertBuildingFixture,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Matching If-None-Match returns 304 until a write bumps the data version."""
+    building_id = await insert_building(**build_building_payload(index=70))
+    await insert_organization(
+        name="Etag Org",
+        building_id=building_id,
+        created_at=datetime(2025, 1, 4, 10, 0, tzinfo=timezone.utc),
+    )
+
+    first = await client.get(_url("/organization"))
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = await client.get(_url("/organization"), headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    await insert_organization(
+        name="Another Etag Org",
+        building_id=building_id,
+        created_at=datetime(2025, 1, 4, 11, 0, tzinfo=timezone.utc),
+    )
+    await _expire_data_versions(app)
+
+    changed = await client.get(_url("/organization"), headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_organization_etag_tracks_phone_numbers(
+    app: FastAPI,
+    client: AsyncClient,
+    insert_building: InsertBuildingFixture,
+    insert_organization: InsertOrganizationFixture,
+    insert_organization_phone: InsertOrganizationPhoneFixture,
+) -> None:
+    """Organization detail ETag changes when its phone numbers change."""
+    building_id = await insert_building(**build_building_payload(index=71))
+    org_id = await insert_organization(
+        name="Detail Etag Org",
+        building_id=building_id,
+        created_at=datetime(2025, 1, 4, 12, 0, tzinfo=timezone.utc),
+    )
+
+    first = await client.get(_url(f"/organization/{org_id}"))
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    await insert_organization_phone(
+        organization_id=org_id, phone_number="+7 (495) 888-88-88"
+    )
+    await _expire_data_versions(app)
+
+    changed = await client.get(
+        _url(f"/organization/{org_id}"), headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.json()["phone_numbers"] == [{"number": "+7 (495) 888-88-88"}]
+
+
+@pytest.mark.asyncio
+async def test_get_buildings_etag_depends_on_query(
+    client: AsyncClient,
+    insert_building: InsertBuildingFixture,
+) -> None:
+    """Different queries get different ETags and weak or listed tags still match."""
+    await insert_building(**build_building_payload(index=72))
+
+    default_page = await client.get(_url("/building"))
+    small_page = await client.get(_url("/building"), params={"limit": 1})
+    etag = default_page.headers["etag"]
+    assert etag != small_page.headers["etag"]
+
+    cached = await client.get(
+        _url("/building"),
+        params={"limit": 20},
+        headers={"If-None-Match": f'"other", W/{etag}'},
+    )
+    assert cached.status_code == 304
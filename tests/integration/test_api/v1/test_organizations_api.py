@@ -1,5 +1,7 @@
+import base64
 from datetime import datetime, timezone
 
+import asyncpg
 import pytest
 from httpx import AsyncClient
 
@@ -66,6 +68,63 @@ async def test_get_organizations_returns_items_with_relations(
     assert org["building"]["address"] == "Moscow, Arbat, 10"
 
 
+@pytest.mark.asyncio
+async def test_get_organizations_expand_adds_phones_and_activities(
+    client: AsyncClient,
+    insert_activity: InsertActivityFixture,
+    insert_organization: InsertOrganizationFixture,
+    insert_organization_activity: InsertOrganizationActivityFixture,
+    insert_organization_phone: InsertOrganizationPhoneFixture,
+) -> None:
+    """Expanded listing carries phones and activities of every item."""
+    bakery_id = await insert_activity(name="Bakeries")
+    cafe_id = await insert_activity(name="Cafes")
+    first_id = await insert_organization(
+        name="First Bakery",
+        building_id=None,
+        created_at=datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc),
+    )
+    second_id = await insert_organization(
+        name="Second Cafe",
+        building_id=None,
+        created_at=datetime(2025, 1, 1, 11, 0, tzinfo=timezone.utc),
+    )
+    await insert_organization_activity(organization_id=first_id, activity_id=cafe_id)
+    await insert_organization_activity(organization_id=first_id, activity_id=bakery_id)
+    await insert_organization_phone(
+        organization_id=first_id, phone_number="+7 (495) 111-11-11"
+    )
+
+    expanded = await client.get(
+        _url("/organization"), params={"expand": "phones,activities"}
+    )
+    plain = await client.get(_url("/organization"))
+
+    assert expanded.status_code == 200
+    first, second = expanded.json()["items"]
+    assert first["phone_numbers"] == [{"number": "+7 (495) 111-11-11"}]
+    assert [activity["name"] for activity in first["activities"]] == [
+        "Bakeries",
+        "Cafes",
+    ]
+    assert second["uuid"] == str(second_id)
+    assert second["phone_numbers"] == []
+    assert second["activities"] == []
+
+    assert "phone_numbers" not in plain.json()["items"][0]
+    assert "activities" not in plain.json()["items"][0]
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_unknown_expand_returns_422(
+    client: AsyncClient,
+) -> None:
+    """Returns 422 for relation that can not be expanded."""
+    response = await client.get(_url("/organization"), params={"expand": "owners"})
+
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_get_organizations_pagination_with_cursor(
     client: AsyncClient,
@@ -111,6 +170,120 @@ async def test_get_organizations_pagination_with_cursor(
     assert second_payload["next_cursor"] is None
 
 
+@pytest.mark.asyncio
+async def test_get_organizations_pagination_across_partitions(
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Pages follow keyset order across monthly partitions of the search table."""
+    names = ["January Org", "February Org", "March Org"]
+    org_ids = [
+        await insert_organization(
+            name=name,
+            building_id=None,
+            created_at=datetime(2025, month, 15, 12, 0, tzinfo=timezone.utc),
+        )
+        for month, name in enumerate(names, start=1)
+    ]
+
+    created = await db_conn.fetch(
+        "SELECT create_organization_search_partitions('2025-01-01', '2025-03-01')"
+    )
+    assert [row[0] for row in created] == [
+        "organization_search_p202501",
+        "organization_search_p202502",
+    ]
+    partitions = await db_conn.fetch(
+        "SELECT organization_id, tableoid::regclass::text AS partition "
+        "FROM organization_search"
+    )
+    assert {row["organization_id"]: row["partition"] for row in partitions} == {
+        org_ids[0]: "organization_search_p202501",
+        org_ids[1]: "organization_search_p202502",
+        org_ids[2]: "organization_search_default",
+    }
+
+    listed: list[str] = []
+    params: dict[str, str | int] = {"limit": 1}
+    while True:
+        response = await client.get(_url("/organization"), params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        listed.extend(item["name"] for item in payload["items"])
+        if payload["next_cursor"] is None:
+            break
+        params["cursor"] = payload["next_cursor"]
+    assert listed == names
+
+
+async def _list_all(client: AsyncClient, params: dict[str, str | int]) -> list[str]:
+    listed: list[str] = []
+    while True:
+        response = await client.get(_url("/organization"), params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        listed.extend(item["name"] for item in payload["items"])
+        if payload["next_cursor"] is None:
+            return listed
+        params = {**params, "cursor": payload["next_cursor"]}
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_sorted_by_name_with_cursor(
+    client: AsyncClient,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Name order ignores case and creation time, in both directions."""
+    names = ["delta", "Bravo", "fox", "alpha", "Charlie", "Émile", "bravo"]
+    for hour, name in enumerate(names):
+        await insert_organization(
+            name=name,
+            building_id=None,
+            created_at=datetime(2025, 1, 9, hour, 0, tzinfo=timezone.utc),
+        )
+
+    ascending = await _list_all(client, {"limit": 2, "sort": "name"})
+    descending = await _list_all(client, {"limit": 2, "sort": "-name"})
+
+    assert [name.lower() for name in ascending] == [
+        "alpha",
+        "bravo",
+        "bravo",
+        "charlie",
+        "delta",
+        # Alphabetical, not code point order, which puts "é" after "f".
+        "émile",
+        "fox",
+    ]
+    assert descending == list(reversed(ascending))
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_cursor_of_another_sort_returns_400(
+    client: AsyncClient,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Cursor is bound to the sort order it was issued for."""
+    for hour in range(2):
+        await insert_organization(
+            name=f"Sorted Org {hour}",
+            building_id=None,
+            created_at=datetime(2025, 1, 10, hour, 0, tzinfo=timezone.utc),
+        )
+    first_page = await client.get(
+        _url("/organization"), params={"limit": 1, "sort": "name"}
+    )
+    cursor = first_page.json()["next_cursor"]
+
+    response = await client.get(
+        _url("/organization"), params={"limit": 1, "sort": "-name", "cursor": cursor}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
 @pytest.mark.asyncio
 async def test_get_organizations_invalid_cursor_returns_400(
     client: AsyncClient,
@@ -123,6 +296,19 @@ async def test_get_organizations_invalid_cursor_returns_400(
     assert payload["detail"] == "Invalid pagination cursor"
 
 
+@pytest.mark.asyncio
+async def test_get_organizations_cursor_with_json_array_returns_400(
+    client: AsyncClient,
+) -> None:
+    """Returns 400, not 500, for a cursor that decodes to a JSON array."""
+    cursor = base64.urlsafe_b64encode(b"[1, 2]").decode()
+    response = await client.get(_url(f"/organization?cursor={cursor}"))
+
+    assert response.status_code == 400
+    payload = response.json()
+    assert payload["detail"] == "Invalid pagination cursor"
+
+
 @pytest.mark.asyncio
 async def test_get_organization_by_uuid(
     client: AsyncClient,
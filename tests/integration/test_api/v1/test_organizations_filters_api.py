@@ -1,7 +1,9 @@
+import asyncio
 from datetime import datetime, timezone
 from typing import TypedDict
 from uuid import UUID
 
+import asyncpg
 import pytest
 from httpx import AsyncClient
 
@@ -74,6 +76,7 @@ async def org_filter_dataset(
         created_at=datetime(2025, 1, 10, 10, 5, tzinfo=timezone.utc),
     )
     await insert_organization_activity(organization_id=bravo, activity_id=coffee_id)
+    await insert_organization_activity(organization_id=bravo, activity_id=it_id)
     code = await insert_organization(
         name="Code Forge",
         building_id=b3,
@@ -132,6 +135,25 @@ async def org_filter_dataset(
             {"name": "coffee", "building_uuid": "b1"},
             {"alpha"},
         ),
+        ({"building_uuid": "b1,b3"}, {"alpha", "code", "food_court"}),
+        ({"activity_uuid": "coffee,it"}, {"alpha", "bravo", "code"}),
+        (
+            {"activity_uuid": "food,it", "include_children": "true"},
+            {"alpha", "bravo", "code", "food_court"},
+        ),
+        ({"activity_uuid": "coffee,it", "activity_match": "all"}, {"bravo"}),
+        (
+            {
+                "activity_uuid": "food,it",
+                "include_children": "true",
+                "activity_match": "all",
+            },
+            {"bravo"},
+        ),
+        (
+            {"activity_uuid": "food,coffee", "activity_match": "all"},
+            set(),
+        ),
     ],
 )
 async def test_get_organizations_filters(
@@ -148,10 +170,14 @@ async def test_get_organizations_filters(
     query_params: dict[str, str] = {}
     for key, value in params.items():
         if key == "building_uuid":
-            query_params[key] = str(building_map[value])
+            query_params[key] = ",".join(
+                str(building_map[name]) for name in value.split(",")
+            )
             continue
         if key == "activity_uuid":
-            query_params[key] = str(activity_map[value])
+            query_params[key] = ",".join(
+                str(activity_map[name]) for name in value.split(",")
+            )
             continue
         query_params[key] = value
 
@@ -164,6 +190,100 @@ async def test_get_organizations_filters(
     assert got_ids == expected_ids
 
 
+@pytest.mark.asyncio
+async def test_get_organizations_follows_source_table_writes(
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+    org_filter_dataset: OrgFilterDataset,
+) -> None:
+    """Listing reflects moved buildings, reparented activities and removed links."""
+    activity_map: dict[str, UUID] = org_filter_dataset["activity"]
+    building_map: dict[str, UUID] = org_filter_dataset["building"]
+    org_map: dict[str, UUID] = org_filter_dataset["org"]
+
+    async def listed(params: dict[str, str]) -> set[UUID]:
+        response = await client.get(_url("/organization"), params=params)
+        assert response.status_code == 200
+        return {UUID(item["uuid"]) for item in response.json()["items"]}
+
+    food_with_children = {"activity_uuid": str(activity_map["food"])}
+    assert org_map["code"] not in await listed(food_with_children)
+
+    await db_conn.execute(
+        "UPDATE activity SET parent_id = $1 WHERE id = $2",
+        activity_map["food"],
+        activity_map["it"],
+    )
+    assert org_map["code"] in await listed(food_with_children)
+
+    await db_conn.execute(
+        "DELETE FROM organization_activity WHERE organization_id = $1",
+        org_map["code"],
+    )
+    assert org_map["code"] not in await listed(food_with_children)
+
+    await db_conn.execute(
+        "UPDATE building SET address = 'Moved' WHERE id = $1",
+        building_map["b3"],
+    )
+    response = await client.get(
+        _url("/organization"), params={"building_uuid": str(building_map["b3"])}
+    )
+    assert {item["building"]["address"] for item in response.json()["items"]} == {
+        "Moved"
+    }
+
+
+@pytest.mark.asyncio
+async def test_organization_search_keeps_concurrent_writes(
+    db_conn: asyncpg.Connection,
+    second_db_conn: asyncpg.Connection,
+    org_filter_dataset: OrgFilterDataset,
+) -> None:
+    """Two transactions touching one organization both land in its search row."""
+    activity_map: dict[str, UUID] = org_filter_dataset["activity"]
+    code = org_filter_dataset["org"]["code"]
+
+    moving = db_conn.transaction()
+    await moving.start()
+    await db_conn.execute(
+        "UPDATE building SET address = 'Moved' WHERE id = $1",
+        org_filter_dataset["building"]["b3"],
+    )
+
+    async def link_activity() -> None:
+        async with second_db_conn.transaction():
+            await second_db_conn.execute(
+                "INSERT INTO organization_activity (organization_id, activity_id) "
+                "VALUES ($1, $2)",
+                code,
+                activity_map["coffee"],
+            )
+
+    linking = asyncio.create_task(link_activity())
+    await asyncio.sleep(0.5)
+    assert not linking.done()
+    await moving.commit()
+    await asyncio.wait_for(linking, timeout=10)
+
+    row = await db_conn.fetchrow(
+        "SELECT building_address, direct_activity_ids, activity_ids "
+        "FROM organization_search WHERE organization_id = $1",
+        code,
+    )
+    assert row is not None
+    assert row["building_address"] == "Moved"
+    assert set(row["direct_activity_ids"]) == {
+        activity_map["it"],
+        activity_map["coffee"],
+    }
+    assert set(row["activity_ids"]) == {
+        activity_map["it"],
+        activity_map["coffee"],
+        activity_map["food"],
+    }
+
+
 @pytest.mark.asyncio
 async def test_get_organizations_invalid_radius_params_returns_422(
     client: AsyncClient,
@@ -0,0 +1,150 @@
+import uuid
+
+import asyncpg
+import pytest
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from tests.integration.factories.building_factory import build_building_payload
+from tests.integration.fixtures.db import InsertActivityFixture, InsertBuildingFixture
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+@pytest.mark.asyncio
+async def test_sync_organizations_reports_inserted_updated_unchanged(
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+    insert_activity: InsertActivityFixture,
+    insert_building: InsertBuildingFixture,
+    write_headers: dict[str, str],
+) -> None:
+    """Bulk sync writes new and changed organizations and skips unchanged ones."""
+    activity_id = await insert_activity(name="Bakeries")
+    building_id = await insert_building(**build_building_payload(index=40))
+    alpha = {
+        "uuid": str(uuid.uuid4()),
+        "name": "Alpha Bakery",
+        "building_uuid": str(building_id),
+        "phone_numbers": ["+7 (495) 333-33-33"],
+        "activity_uuids": [str(activity_id)],
+    }
+    bravo = {
+        "uuid": str(uuid.uuid4()),
+        "name": "Bravo Bakery",
+        "building_uuid": None,
+        "phone_numbers": [],
+        "activity_uuids": [],
+    }
+
+    first = await client.put(
+        _url("/organization/bulk"),
+        json={"items": [alpha, bravo]},
+        headers=write_headers,
+    )
+    assert first.status_code == 200
+    assert first.json() == {"inserted": 2, "updated": 0, "unchanged": 0}
+
+    alpha["phone_numbers"] = ["+7 (495) 444-44-44", "+7 (495) 555-55-55"]
+    second = await client.put(
+        _url("/organization/bulk"),
+        json={"items": [alpha, bravo]},
+        headers=write_headers,
+    )
+    assert second.status_code == 200
+    assert second.json() == {"inserted": 0, "updated": 1, "unchanged": 1}
+
+    phones = await db_conn.fetch(
+        "SELECT phone_number FROM organization_phone_number WHERE organization_id = $1",
+        uuid.UUID(alpha["uuid"]),
+    )
+    assert {row["phone_number"] for row in phones} == {
+        "+7 (495) 444-44-44",
+        "+7 (495) 555-55-55",
+    }
+
+    detail = await client.get(_url(f"/organization/{alpha['uuid']}"))
+    assert detail.status_code == 200
+    assert [item["name"] for item in detail.json()["activities"]] == ["Bakeries"]
+
+
+@pytest.mark.asyncio
+async def test_sync_organizations_unknown_reference_returns_400(
+    client: AsyncClient,
+    write_headers: dict[str, str],
+) -> None:
+    """Returns 400 and writes nothing when a referenced building does not exist."""
+    response = await client.put(
+        _url("/organization/bulk"),
+        json={
+            "items": [
+                {
+                    "uuid": str(uuid.uuid4()),
+                    "name": "Ghost Org",
+                    "building_uuid": str(uuid.uuid4()),
+                }
+            ]
+        },
+        headers=write_headers,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown building or activity reference"
+
+    listing = await client.get(_url("/organization"))
+    assert listing.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_sync_organizations_duplicate_uuid_returns_422(
+    client: AsyncClient,
+    write_headers: dict[str, str],
+) -> None:
+    """Returns 422 when the same organization appears twice in one batch."""
+    item = {"uuid": str(uuid.uuid4()), "name": "Twice"}
+
+    response = await client.put(
+        _url("/organization/bulk"),
+        json={"items": [item, item]},
+        headers=write_headers,
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_sync_organizations_oversized_phone_number_returns_422(
+    client: AsyncClient,
+    write_headers: dict[str, str],
+) -> None:
+    """Returns 422 for a phone number longer than its column."""
+    item = {
+        "uuid": str(uuid.uuid4()),
+        "name": "Long Phone",
+        "phone_numbers": ["1" * 256],
+    }
+
+    response = await client.put(
+        _url("/organization/bulk"), json={"items": [item]}, headers=write_headers
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_sync_organizations_requires_write_key(
+    client: AsyncClient,
+) -> None:
+    """Read-only keys get 403 and write nothing."""
+    response = await client.put(
+        _url("/organization/bulk"),
+        json={"items": [{"uuid": str(uuid.uuid4()), "name": "Read Only"}]},
+    )
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "API key is not allowed to write"
+
+    listing = await client.get(_url("/organization"))
+    assert listing.json()["items"] == []
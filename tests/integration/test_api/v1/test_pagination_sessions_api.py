@@ -0,0 +1,130 @@
+from datetime import datetime, timezone
+
+import asyncpg
+import pytest
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.config import settings
+from tests.integration.fixtures.db import InsertOrganizationFixture
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+async def _insert_orgs(
+    insert_organization: InsertOrganizationFixture, names: list[str]
+) -> None:
+    for minute, name in enumerate(names):
+        await insert_organization(
+            name=name,
+            building_id=None,
+            created_at=datetime(2025, 1, 11, 10, minute, tzinfo=timezone.utc),
+        )
+
+
+@pytest.mark.asyncio
+async def test_snapshot_pages_come_from_matches_resolved_once(
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Later pages slice the stored matches; new and deleted rows do not shift them."""
+    await _insert_orgs(
+        insert_organization, ["Snap Alpha", "Snap Bravo", "Snap Charlie", "Other"]
+    )
+    params: dict[str, str | int] = {"name": "snap", "limit": 1, "snapshot": "true"}
+
+    first = await client.get(_url("/organization"), params=params)
+    assert first.status_code == 200
+    assert "etag" not in first.headers
+    assert [item["name"] for item in first.json()["items"]] == ["Snap Alpha"]
+
+    await _insert_orgs(insert_organization, ["Snap Delta"])
+    await db_conn.execute("DELETE FROM organization WHERE name = 'Snap Bravo'")
+
+    listed: list[str] = []
+    cursor = first.json()["next_cursor"]
+    while cursor is not None:
+        response = await client.get(
+            _url("/organization"), params={**params, "cursor": cursor}
+        )
+        assert response.status_code == 200
+        listed.extend(item["name"] for item in response.json()["items"])
+        cursor = response.json()["next_cursor"]
+
+    assert listed == ["Snap Charlie"]
+    sessions = await db_conn.fetchval("SELECT count(*) FROM pagination_session")
+    assert sessions == 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cursor_rejected_for_another_filter(
+    client: AsyncClient,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Session cursor only continues the filter it was created for."""
+    await _insert_orgs(insert_organization, ["Snap One", "Snap Two"])
+    first = await client.get(
+        _url("/organization"), params={"name": "snap", "limit": 1, "snapshot": "true"}
+    )
+
+    response = await client.get(
+        _url("/organization"),
+        params={
+            "name": "two",
+            "limit": 1,
+            "snapshot": "true",
+            "cursor": first.json()["next_cursor"],
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Pagination cursor belongs to another filter"
+
+
+@pytest.mark.asyncio
+async def test_expired_snapshot_session_returns_400(
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Pages of a session past its ttl are refused."""
+    monkeypatch.setattr(settings, "PAGINATION_SESSION_TTL", 0.0)
+    await _insert_orgs(insert_organization, ["Snap One", "Snap Two"])
+    params: dict[str, str | int] = {"limit": 1, "snapshot": "true"}
+    first = await client.get(_url("/organization"), params=params)
+
+    response = await client.get(
+        _url("/organization"),
+        params={**params, "cursor": first.json()["next_cursor"]},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Pagination session expired"
+
+
+@pytest.mark.asyncio
+async def test_snapshot_matching_more_than_max_rows_returns_400(
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+    monkeypatch: pytest.MonkeyPatch,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """A session is not created when it could not hold every match."""
+    monkeypatch.setattr(settings, "PAGINATION_SESSION_MAX_ROWS", 2)
+    await _insert_orgs(insert_organization, ["Snap One", "Snap Two", "Snap Three"])
+    params: dict[str, str | int] = {"name": "snap", "limit": 1, "snapshot": "true"}
+
+    response = await client.get(_url("/organization"), params=params)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "Filter matches more than 2 organizations, "
+        "narrow it down for snapshot pagination"
+    )
+    assert await db_conn.fetchval("SELECT count(*) FROM pagination_session") == 0
+
+    exact = await client.get(_url("/organization"), params={**params, "name": "snap t"})
+    assert exact.status_code == 200
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timezone
+
+import asyncpg
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.config import settings
+from src.service import DataVersionTracker
+from src.service.prefetch import prefetch_discarded, prefetch_hits, prefetched_pages
+from tests.integration.fixtures.db import InsertOrganizationFixture
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+@pytest.fixture
+def prefetch_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PREFETCH_ENABLED", True)
+
+
+async def _wait_for_prefetched_pages(count: float) -> None:
+    for _ in range(100):
+        if prefetched_pages.value() >= count:
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError("Next page was not prefetched")
+
+
+@pytest.mark.asyncio
+async def test_next_page_is_served_from_prefetch(
+    prefetch_enabled: None,
+    client: AsyncClient,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Page following a returned one is fetched ahead and answers the next request."""
+    for index in range(3):
+        await insert_organization(
+            name=f"Prefetch Org {index}",
+            building_id=None,
+            created_at=datetime(2025, 1, 5, 10, index, tzinfo=timezone.utc),
+        )
+    prefetched_before = prefetched_pages.value()
+    hits_before = prefetch_hits.value()
+
+    first = await client.get(_url("/organization"), params={"limit": 1})
+    assert first.status_code == 200
+    await _wait_for_prefetched_pages(prefetched_before + 1)
+
+    second = await client.get(
+        _url("/organization"),
+        params={"limit": 1, "cursor": first.json()["next_cursor"]},
+    )
+
+    assert second.status_code == 200
+    assert [item["name"] for item in second.json()["items"]] == ["Prefetch Org 1"]
+    assert second.json()["next_cursor"] is not None
+    assert prefetch_hits.value() == hits_before + 1
+
+
+@pytest.mark.asyncio
+async def test_prefetched_page_is_dropped_after_write(
+    prefetch_enabled: None,
+    app: FastAPI,
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Prefetched page built before a write is not served after it."""
+    for index in range(2):
+        await insert_organization(
+            name=f"Stale Org {index}",
+            building_id=None,
+            created_at=datetime(2025, 1, 6, 10, index, tzinfo=timezone.utc),
+        )
+    prefetched_before = prefetched_pages.value()
+    stale_before = prefetch_discarded.value(reason="stale")
+
+    first = await client.get(_url("/organization"), params={"limit": 1})
+    await _wait_for_prefetched_pages(prefetched_before + 1)
+
+    await db_conn.execute(
+        "UPDATE organization SET name = 'Renamed Org' WHERE name = 'Stale Org 1'"
+    )
+    tracker = await app.state.dishka_container.get(DataVersionTracker)
+    tracker.invalidate()
+
+    second = await client.get(
+        _url("/organization"),
+        params={"limit": 1, "cursor": first.json()["next_cursor"]},
+    )
+
+    assert [item["name"] for item in second.json()["items"]] == ["Renamed Org"]
+    assert prefetch_discarded.value(reason="stale") == stale_before + 1
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+from httpx import AsyncClient
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.config import ApiKeySettings, settings
+
+LIMITED_KEY = ApiKeySettings(
+    name="limited-client", key="limited-client-key", requests_per_second=1, burst=2
+)
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+def _auth(api_key: ApiKeySettings) -> dict[str, str]:
+    return {"Authorization": f"Bearer {api_key.key}"}
+
+
+@pytest.mark.asyncio
+async def test_over_limit_requests_get_429_with_retry_after(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Key over its token bucket is throttled while other keys keep working."""
+    monkeypatch.setattr(settings, "API_KEYS", [LIMITED_KEY])
+
+    statuses = [
+        (await client.get(_url("/building"), headers=_auth(LIMITED_KEY))).status_code
+        for _ in range(2)
+    ]
+    throttled = await client.get(_url("/building"), headers=_auth(LIMITED_KEY))
+    default_key = await client.get(_url("/building"))
+
+    assert statuses == [200, 200]
+    assert throttled.status_code == 429
+    assert throttled.json()["detail"] == "Rate limit exceeded"
+    assert int(throttled.headers["retry-after"]) >= 1
+    assert default_key.status_code == 200
+
+    metrics = await client.get("/metrics")
+    assert (
+        "directory_api_key_throttled_total"
+        f'{{api_key="limited-client",reason="rate",pid="{os.getpid()}"}}'
+        in metrics.text
+    )
+
+
+@pytest.mark.asyncio
+async def test_configured_api_key_is_accepted_and_unknown_rejected(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Every configured key authenticates, unknown keys get 401."""
+    monkeypatch.setattr(settings, "API_KEYS", [LIMITED_KEY])
+
+    accepted = await client.get(_url("/building"), headers=_auth(LIMITED_KEY))
+    rejected = await client.get(
+        _url("/building"), headers={"Authorization": "Bearer unknown-key"}
+    )
+
+    assert accepted.status_code == 200
+    assert rejected.status_code == 401
+    assert rejected.json()["detail"] == "Invalid API key"
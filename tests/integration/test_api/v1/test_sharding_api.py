@@ -0,0 +1,320 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import asyncpg
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.activity_moves import move_activities
+from src.api.admission import AdmissionController
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.config import ShardSettings, settings
+from src.dto import ActivityMove
+from src.repository.directory.sharded.repository import shard_calls
+from tests.integration.factories.building_factory import build_building_payload
+from tests.integration.fixtures.db import (
+    InsertBuildingFixture,
+    InsertOrganizationFixture,
+)
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+@pytest.fixture(autouse=True)
+def two_shards(monkeypatch: pytest.MonkeyPatch, shard_dsns: tuple[str, str]) -> None:
+    moscow_dsn, spb_dsn = shard_dsns
+    monkeypatch.setattr(
+        settings,
+        "DIRECTORY_SHARDS",
+        [
+            ShardSettings(
+                name="moscow",
+                dsn=moscow_dsn,
+                min_lat=55.0,
+                max_lat=56.5,
+                min_long=36.5,
+                max_long=38.5,
+            ),
+            ShardSettings(
+                name="spb",
+                dsn=spb_dsn,
+                min_lat=59.5,
+                max_lat=60.5,
+                min_long=29.5,
+                max_long=31.0,
+            ),
+        ],
+    )
+
+
+async def _insert_spb_organization(
+    conn: asyncpg.Connection, name: str, created_at: datetime
+) -> UUID:
+    building_id = await conn.fetchval(
+        """
+        INSERT INTO building (address, location, created_at)
+        VALUES (
+            'Saint Petersburg, Nevsky, 1',
+            ST_SetSRID(ST_MakePoint(30.3351, 59.9343), 4326)::geography,
+            $1
+        )
+        RETURNING id
+        """,
+        created_at,
+    )
+    return await conn.fetchval(
+        """
+        INSERT INTO organization (name, building_id, created_at)
+        VALUES ($1, $2, $3)
+        RETURNING id
+        """,
+        name,
+        building_id,
+        created_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_merges_shard_pages_in_keyset_order(
+    client: AsyncClient,
+    second_shard_conn: asyncpg.Connection,
+    insert_building: InsertBuildingFixture,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Cursor pages interleave rows of both shards by (created_at, id)."""
+    building_id = await insert_building(**build_building_payload(index=70))
+    for hour, name in [(10, "Moscow A"), (12, "Moscow B"), (14, "Moscow C")]:
+        await insert_organization(
+            name=name,
+            building_id=building_id,
+            created_at=datetime(2025, 1, 5, hour, 0, tzinfo=timezone.utc),
+        )
+    for hour, name in [(11, "Spb A"), (13, "Spb B")]:
+        await _insert_spb_organization(
+            second_shard_conn,
+            name,
+            datetime(2025, 1, 5, hour, 0, tzinfo=timezone.utc),
+        )
+
+    listed: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        response = await client.get(_url("/organization"), params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        listed.extend(item["name"] for item in payload["items"])
+        if payload["next_cursor"] is None:
+            break
+        params["cursor"] = payload["next_cursor"]
+
+    assert listed == ["Moscow A", "Spb A", "Moscow B", "Spb B", "Moscow C"]
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_merges_shard_pages_in_name_order(
+    client: AsyncClient,
+    second_shard_conn: asyncpg.Connection,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Alphabetical cursor pages interleave rows of both shards by name."""
+    # "Émile" sorts before "Fox" alphabetically but after it by code point.
+    for name in ["alpha", "Delta", "Émile"]:
+        await insert_organization(
+            name=name,
+            building_id=None,
+            created_at=datetime(2025, 1, 5, 10, 0, tzinfo=timezone.utc),
+        )
+    for name in ["Bravo", "charlie", "Fox"]:
+        await _insert_spb_organization(
+            second_shard_conn,
+            name,
+            datetime(2025, 1, 5, 9, 0, tzinfo=timezone.utc),
+        )
+
+    listed: list[str] = []
+    params: dict[str, str | int] = {"limit": 1, "sort": "name"}
+    while True:
+        response = await client.get(_url("/organization"), params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        listed.extend(item["name"] for item in payload["items"])
+        if payload["next_cursor"] is None:
+            break
+        params["cursor"] = payload["next_cursor"]
+
+    assert listed == ["alpha", "Bravo", "charlie", "Delta", "Émile", "Fox"]
+
+
+@pytest.mark.asyncio
+async def test_geo_filter_queries_only_intersecting_shards(
+    client: AsyncClient,
+    second_shard_conn: asyncpg.Connection,
+) -> None:
+    """Radius search in one region does not touch the other shard."""
+    spb_org_id = await _insert_spb_organization(
+        second_shard_conn,
+        "Nevsky Books",
+        datetime(2025, 1, 6, 10, 0, tzinfo=timezone.utc),
+    )
+    moscow_calls = shard_calls.value(shard="moscow", method="get_organizations")
+
+    response = await client.get(
+        _url("/organization"),
+        params={"radius": 1000, "center_lat": 59.9343, "center_long": 30.3351},
+    )
+
+    assert response.status_code == 200
+    assert [item["uuid"] for item in response.json()["items"]] == [str(spb_org_id)]
+    moscow_calls_after = shard_calls.value(shard="moscow", method="get_organizations")
+    assert moscow_calls_after == moscow_calls
+
+    detail = await client.get(_url(f"/organization/{spb_org_id}"))
+    assert detail.status_code == 200
+    assert detail.json()["name"] == "Nevsky Books"
+
+
+@pytest.mark.asyncio
+async def test_ready_and_admission_cover_every_shard(
+    app: FastAPI, client: AsyncClient
+) -> None:
+    """Readiness probes each shard and admission sees shard pool checkouts."""
+    checks = {
+        name: shard_calls.value(shard=name, method="check_connection")
+        for name in ("moscow", "spb")
+    }
+
+    ready = await client.get("/health/ready")
+
+    assert ready.status_code == 200
+    for name, before in checks.items():
+        assert shard_calls.value(shard=name, method="check_connection") == before + 1
+
+    admission_controller = await app.state.dishka_container.get(AdmissionController)
+    admission_controller.pool_wait = 0.0
+    response = await client.get(_url("/organization"))
+
+    assert response.status_code == 200
+    assert admission_controller.pool_wait > 0
+
+
+@pytest.mark.asyncio
+async def test_sync_organizations_writes_to_building_shard(
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+    second_shard_conn: asyncpg.Connection,
+    write_headers: dict[str, str],
+) -> None:
+    """Bulk sync stores every organization on the shard of its building."""
+    spb_org_id = await _insert_spb_organization(
+        second_shard_conn,
+        "Existing Spb Org",
+        datetime(2025, 1, 7, 10, 0, tzinfo=timezone.utc),
+    )
+    spb_building_id = await second_shard_conn.fetchval(
+        "SELECT building_id FROM organization WHERE id = $1", spb_org_id
+    )
+    new_org_id = uuid4()
+
+    response = await client.put(
+        _url("/organization/bulk"),
+        json={
+            "items": [
+                {
+                    "uuid": str(new_org_id),
+                    "name": "New Spb Org",
+                    "building_uuid": str(spb_building_id),
+                }
+            ]
+        },
+        headers=write_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 1, "updated": 0, "unchanged": 0}
+    spb_name = await second_shard_conn.fetchval(
+        "SELECT name FROM organization WHERE id = $1", new_org_id
+    )
+    assert spb_name == "New Spb Org"
+    moscow_count = await db_conn.fetchval(
+        "SELECT count(*) FROM organization WHERE id = $1", new_org_id
+    )
+    assert moscow_count == 0
+
+
+@pytest.mark.asyncio
+async def test_move_activities_applies_to_every_shard(
+    db_conn: asyncpg.Connection,
+    second_shard_conn: asyncpg.Connection,
+) -> None:
+    """Replicated activities move on both shards; a rejected batch moves none."""
+    food_id, meat_id, cars_id = uuid4(), uuid4(), uuid4()
+    for conn in (db_conn, second_shard_conn):
+        await conn.execute(
+            """
+            INSERT INTO activity (id, name, parent_id)
+            VALUES ($1, 'Food', NULL), ($2, 'Meat', $1), ($3, 'Cars', NULL)
+            """,
+            food_id,
+            meat_id,
+            cars_id,
+        )
+
+    moved = await move_activities(
+        [ActivityMove(activity_uuid=meat_id, parent_uuid=cars_id)]
+    )
+    with pytest.raises(ValueError, match="Activity hierarchy cycle detected"):
+        await move_activities(
+            [ActivityMove(activity_uuid=cars_id, parent_uuid=meat_id)]
+        )
+
+    assert moved == 1
+    for conn in (db_conn, second_shard_conn):
+        parents = await conn.fetch("SELECT id, parent_id FROM activity")
+        assert {row["id"]: row["parent_id"] for row in parents} == {
+            food_id: None,
+            meat_id: cars_id,
+            cars_id: None,
+        }
+
+
+@pytest.mark.asyncio
+async def test_move_failing_on_one_shard_changes_no_shard(
+    db_conn: asyncpg.Connection,
+    second_shard_conn: asyncpg.Connection,
+) -> None:
+    """A shard rejecting a prepared move rolls back the others as well."""
+    food_id, meat_id, cars_id = uuid4(), uuid4(), uuid4()
+    await db_conn.execute(
+        """
+        INSERT INTO activity (id, name, parent_id)
+        VALUES ($1, 'Food', NULL), ($2, 'Meat', $1), ($3, 'Cars', NULL)
+        """,
+        food_id,
+        meat_id,
+        cars_id,
+    )
+    # The second shard misses the new parent, so its part of the move fails
+    # while the first shard has it prepared.
+    await second_shard_conn.execute(
+        """
+        INSERT INTO activity (id, name, parent_id)
+        VALUES ($1, 'Food', NULL), ($2, 'Meat', $1)
+        """,
+        food_id,
+        meat_id,
+    )
+
+    with pytest.raises(ValueError, match="Unknown parent activity"):
+        await move_activities(
+            [ActivityMove(activity_uuid=meat_id, parent_uuid=cars_id)]
+        )
+
+    for conn in (db_conn, second_shard_conn):
+        assert (
+            await conn.fetchval("SELECT parent_id FROM activity WHERE id = $1", meat_id)
+            == food_id
+        )
+        assert await conn.fetchval("SELECT count(*) FROM pg_prepared_xacts") == 0
@@ -0,0 +1,64 @@
+import os
+
+import asyncpg
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from src.api.v1.constants import API_V1_DIRECTORY_PREFIX
+from src.database import Database, deadline
+
+
+def _url(path: str) -> str:
+    return f"{API_V1_DIRECTORY_PREFIX}{path}"
+
+
+@pytest.mark.asyncio
+async def test_client_deadline_turns_blocked_query_into_504(
+    client: AsyncClient,
+    db_conn: asyncpg.Connection,
+) -> None:
+    """Query blocked past the client deadline is cancelled and answered with 504."""
+    transaction = db_conn.transaction()
+    await transaction.start()
+    await db_conn.execute("LOCK TABLE building IN ACCESS EXCLUSIVE MODE")
+    try:
+        response = await client.get(
+            _url("/building"), headers={"X-Request-Timeout-Ms": "200"}
+        )
+    finally:
+        await transaction.rollback()
+
+    assert response.status_code == 504
+    assert response.json()["detail"] == "Statement timeout exceeded"
+
+    metrics = await client.get("/metrics")
+    assert (
+        "directory_statement_timeouts_total"
+        f'{{endpoint="get_buildings",pid="{os.getpid()}"}}' in metrics.text
+    )
+
+    recovered = await client.get(_url("/building"))
+    assert recovered.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_pooled_connection_reuses_statement_timeout(test_dsn: str) -> None:
+    """Checkouts with a similar budget skip setting the timeout again."""
+    database = Database(dsn=test_dsn)
+    query = select(func.current_setting("statement_timeout").label("timeout"))
+    try:
+        with deadline(10):
+            first = await database.fetch_one(query)
+            async with database.transaction() as connection:
+                second = await database.fetch_one(query, connection)
+        with deadline(1):
+            shorter = await database.fetch_one(query)
+        unbounded = await database.fetch_one(query)
+    finally:
+        await database.dispose()
+
+    assert first["timeout"].endswith("s")
+    assert second["timeout"] == first["timeout"]
+    assert shorter["timeout"] != first["timeout"]
+    assert unbounded["timeout"] == "0"
@@ -0,0 +1,131 @@
+import json
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+import asyncpg
+import pytest
+
+from src.directory_export import DirectoryExporter
+from tests.integration.factories.building_factory import build_building_payload
+from tests.integration.fixtures.db import (
+    InsertActivityFixture,
+    InsertBuildingFixture,
+    InsertOrganizationActivityFixture,
+    InsertOrganizationFixture,
+    InsertOrganizationPhoneFixture,
+)
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+ConnectFixture = Callable[[], Awaitable[asyncpg.Connection]]
+
+
+@pytest.fixture
+def connect(postgres_container: dict[str, str | int], test_db: str) -> ConnectFixture:
+    """Opens connections to the test database, as the exporter's workers do."""
+
+    async def _connect() -> asyncpg.Connection:
+        return await asyncpg.connect(
+            user=str(postgres_container["user"]),
+            password=str(postgres_container["password"]),
+            host=str(postgres_container["host"]),
+            port=int(postgres_container["port"]),
+            database=test_db,
+        )
+
+    return _connect
+
+
+@pytest.mark.asyncio
+async def test_export_writes_disjoint_parts_of_every_table(
+    connect: ConnectFixture,
+    tmp_path: Path,
+    insert_activity: InsertActivityFixture,
+    insert_building: InsertBuildingFixture,
+    insert_organization: InsertOrganizationFixture,
+    insert_organization_activity: InsertOrganizationActivityFixture,
+    insert_organization_phone: InsertOrganizationPhoneFixture,
+) -> None:
+    """Parts of a table together hold each of its rows exactly once."""
+    food_id = await insert_activity(name="Food")
+    building_id = await insert_building(**build_building_payload(index=80))
+    organization_ids = []
+    for minute in range(12):
+        organization_id = await insert_organization(
+            name=f"Export Org {minute}",
+            building_id=building_id,
+            created_at=datetime(2025, 1, 9, 10, minute, tzinfo=UTC),
+        )
+        await insert_organization_activity(
+            organization_id=organization_id, activity_id=food_id
+        )
+        organization_ids.append(organization_id)
+    await insert_organization_phone(
+        organization_id=organization_ids[0], phone_number="+7 000"
+    )
+    output = tmp_path / "export"
+
+    report = await DirectoryExporter(connect, workers=3).run(output)
+
+    assert report.rows == {
+        "activity": 1,
+        "building": 1,
+        "organization": 12,
+        "organization_phone_number": 1,
+        "organization_activity": 12,
+    }
+    organizations = pa.concat_tables(
+        pq.read_table(output / path) for path in report.files["organization"]
+    )
+    assert len(report.files["organization"]) == 3
+    assert sorted(organizations.column("id").to_pylist()) == sorted(
+        str(organization_id) for organization_id in organization_ids
+    )
+    assert organizations.schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+    manifest = json.loads((output / "manifest.json").read_text("utf-8"))
+    assert manifest["snapshot"] == report.snapshot
+    assert manifest["tables"]["organization_activity"]["rows"] == 12
+
+
+@pytest.mark.asyncio
+async def test_export_reads_snapshot_taken_at_start(
+    connect: ConnectFixture,
+    tmp_path: Path,
+    db_conn: asyncpg.Connection,
+    insert_organization: InsertOrganizationFixture,
+) -> None:
+    """Rows committed after the snapshot was exported are not in the files."""
+    await insert_organization(
+        name="Before Export",
+        building_id=None,
+        created_at=datetime(2025, 1, 9, 10, 0, tzinfo=UTC),
+    )
+    worker_connections = 0
+
+    async def connect_after_write() -> asyncpg.Connection:
+        # The first connection is the coordinator; by the time workers
+        # connect, a concurrent writer has already committed.
+        nonlocal worker_connections
+        if worker_connections == 1:
+            await db_conn.execute(
+                "INSERT INTO organization (name) VALUES ('After Export')"
+            )
+        worker_connections += 1
+        return await connect()
+
+    report = await DirectoryExporter(
+        connect_after_write, workers=2, file_format="arrow"
+    ).run(tmp_path / "export")
+
+    names = [
+        name
+        for path in report.files["organization"]
+        for name in pa.ipc.open_file(tmp_path / "export" / path)
+        .read_all()
+        .column("name")
+        .to_pylist()
+    ]
+    assert names == ["Before Export"]
+    assert await db_conn.fetchval("SELECT count(*) FROM organization") == 2
@@ -0,0 +1,198 @@
+import json
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import asyncpg
+import pytest
+
+from src.directory_import import DirectoryImporter, ImportBatch, ImportReport
+from tests.integration.fixtures.db import InsertActivityFixture
+
+CSV_HEADER = "uuid,name,address,latitude,longitude,phones,activities\n"
+
+
+@pytest.fixture
+async def import_pool(
+    postgres_container: dict[str, str | int], test_db: str
+) -> AsyncGenerator[asyncpg.Pool]:
+    """Pool to the test database with the importer's staging tables."""
+    pool = await asyncpg.create_pool(
+        user=str(postgres_container["user"]),
+        password=str(postgres_container["password"]),
+        host=str(postgres_container["host"]),
+        port=int(postgres_container["port"]),
+        database=test_db,
+        min_size=1,
+        max_size=3,
+        init=DirectoryImporter.create_staging_tables,
+    )
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+def _write_csv(path: Path, rows: list[str]) -> Path:
+    path.write_text(CSV_HEADER + "".join(f"{row}\n" for row in rows), "utf-8")
+    return path
+
+
+@pytest.mark.asyncio
+async def test_csv_import_loads_batches_with_phones_and_activities(
+    import_pool: asyncpg.Pool,
+    db_conn: asyncpg.Connection,
+    insert_activity: InsertActivityFixture,
+    tmp_path: Path,
+) -> None:
+    """Rows sharing an address share a building; paths resolve to activities."""
+    food_id = await insert_activity(name="Food")
+    meat_id = await insert_activity(name="Meat", parent_id=food_id)
+    source = _write_csv(
+        tmp_path / "city.csv",
+        [
+            ",Butcher,Lenina 1,55.75,37.61,+7 1;+7 2,Food/Meat",
+            ",Grocery,Lenina 1,55.75,37.61,,food",
+            ",Bakery,Mira 2,55.78,37.63,+7 3,",
+            ",Remote Office,,,,,",
+            ",Deli,Mira 2,55.78,37.63,,Food / Meat",
+        ],
+    )
+    progress: list[tuple[int, int]] = []
+
+    def on_batch(batch: ImportBatch, report: ImportReport) -> None:
+        progress.append((batch.number, batch.records))
+
+    report = await DirectoryImporter(
+        import_pool, batch_size=2, workers=2, on_batch=on_batch
+    ).run(source)
+
+    assert (report.batches, report.records) == (3, 5)
+    assert sorted(progress) == [(0, 2), (1, 2), (2, 1)]
+    assert await db_conn.fetchval("SELECT count(*) FROM building") == 2
+    organizations = await db_conn.fetch(
+        """
+        SELECT o.name, b.address, array_agg(DISTINCT p.phone_number) AS phones
+        FROM organization o
+        LEFT JOIN building b ON b.id = o.building_id
+        LEFT JOIN organization_phone_number p ON p.organization_id = o.id
+        GROUP BY o.name, b.address
+        """
+    )
+    assert {row["name"]: row["address"] for row in organizations} == {
+        "Butcher": "Lenina 1",
+        "Grocery": "Lenina 1",
+        "Bakery": "Mira 2",
+        "Remote Office": None,
+        "Deli": "Mira 2",
+    }
+    phones = {row["name"]: row["phones"] for row in organizations}
+    assert sorted(phones["Butcher"]) == ["+7 1", "+7 2"]
+    links = await db_conn.fetch(
+        """
+        SELECT o.name, oa.activity_id
+        FROM organization_activity oa
+        JOIN organization o ON o.id = oa.organization_id
+        """
+    )
+    assert {(row["name"], row["activity_id"]) for row in links} == {
+        ("Butcher", meat_id),
+        ("Grocery", food_id),
+        ("Deli", meat_id),
+    }
+    searchable = await db_conn.fetchval("SELECT count(*) FROM organization_search")
+    assert searchable == 5
+
+
+@pytest.mark.asyncio
+async def test_interrupted_import_resumes_after_committed_batches(
+    import_pool: asyncpg.Pool,
+    db_conn: asyncpg.Connection,
+    tmp_path: Path,
+) -> None:
+    """Second run loads only the batch that was not committed."""
+    source = _write_csv(
+        tmp_path / "city.csv",
+        [f",Org {index},Street {index},55.7,37.6,," for index in range(5)],
+    )
+    importer = DirectoryImporter(import_pool, batch_size=2, workers=2)
+    await importer.run(source)
+    # Same state as a run that failed before committing the last batch.
+    await db_conn.execute("UPDATE directory_import SET finished_at = NULL")
+    await db_conn.execute("DELETE FROM directory_import_batch WHERE batch_number = 2")
+    await db_conn.execute("DELETE FROM organization WHERE name = 'Org 4'")
+
+    with pytest.raises(ValueError, match="batch size 2"):
+        await DirectoryImporter(import_pool, batch_size=3).run(source)
+    report = await importer.run(source)
+
+    assert (report.skipped_batches, report.skipped_records) == (2, 4)
+    assert (report.batches, report.records) == (1, 1)
+    names = await db_conn.fetch("SELECT name FROM organization ORDER BY name")
+    assert [row["name"] for row in names] == [f"Org {index}" for index in range(5)]
+    finished = await db_conn.fetchval("SELECT finished_at FROM directory_import")
+    assert finished is not None
+
+
+@pytest.mark.asyncio
+async def test_interrupted_import_of_edited_file_is_not_resumed(
+    import_pool: asyncpg.Pool,
+    db_conn: asyncpg.Connection,
+    tmp_path: Path,
+) -> None:
+    """A file edited in place keeps its size but can not be resumed."""
+    rows = [f",Org {index},Street {index},55.7,37.6,," for index in range(3)]
+    source = _write_csv(tmp_path / "city.csv", rows)
+    importer = DirectoryImporter(import_pool, batch_size=2)
+    await importer.run(source)
+    await db_conn.execute("UPDATE directory_import SET finished_at = NULL")
+
+    _write_csv(source, [row.replace("Org 0", "Org 9") for row in rows])
+
+    with pytest.raises(ValueError, match="Source changed"):
+        await importer.run(source)
+    report = await importer.run(source, restart=True)
+    assert report.records == 3
+
+
+@pytest.mark.asyncio
+async def test_geojson_import_streams_feature_collection(
+    import_pool: asyncpg.Pool,
+    db_conn: asyncpg.Connection,
+    tmp_path: Path,
+) -> None:
+    """Point features become organizations located at their coordinates."""
+    source = tmp_path / "city.geojson"
+    source.write_text(
+        json.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "geometry": {
+                            "type": "Point",
+                            "coordinates": [30.3351, 59.9343],
+                        },
+                        "properties": {
+                            "name": "Nevsky Books",
+                            "address": "Nevsky, 1",
+                            "phones": ["+7 812 000"],
+                        },
+                    }
+                ],
+            }
+        ),
+        "utf-8",
+    )
+
+    report = await DirectoryImporter(import_pool).run(source)
+
+    assert report.records == 1
+    row = await db_conn.fetchrow(
+        """
+        SELECT o.name, ST_X(b.location::geometry) AS long, ST_Y(b.location::geometry) AS lat
+        FROM organization o
+        JOIN building b ON b.id = o.building_id
+        """
+    )
+    assert (row["name"], row["long"], row["lat"]) == ("Nevsky Books", 30.3351, 59.9343)
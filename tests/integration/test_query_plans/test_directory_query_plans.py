@@ -0,0 +1,372 @@
+import itertools
+import json
+import re
+from typing import Any
+
+import asyncpg
+import pytest
+from sqlalchemy import Select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from src.dto import (
+    ActivityMatch,
+    BuildingFilter,
+    BuildingSort,
+    OrganizationActivityFilter,
+    OrganizationFilter,
+    OrganizationSort,
+    PaginationParams,
+    WithinBoundingBoxFilter,
+    WithinRadiusFilter,
+)
+from src.repository.directory.postgres.cursor import (
+    KeysetCursorCodec,
+    SortKeyCursorCodec,
+)
+from src.repository.directory.postgres.queries import (
+    buildings_query,
+    organization_activities_query,
+    organization_phone_numbers_query,
+    organization_query,
+    organizations_activities_query,
+    organizations_phone_numbers_query,
+    organizations_query,
+)
+from tests.integration.fixtures.large_dataset import LargeDatasetKeys
+
+# Tables that grow with the directory; sequential scans on them are regressions.
+LARGE_TABLES = frozenset(
+    {
+        "organization",
+        "building",
+        "organization_activity",
+        "organization_phone_number",
+        "organization_search",
+    }
+)
+INDEX_NODE_TYPES = frozenset({"Index Scan", "Index Only Scan", "Bitmap Index Scan"})
+SORT_NODE_TYPES = frozenset({"Sort", "Incremental Sort"})
+# Monthly and default partitions of organization_search.
+PARTITION_SUFFIX = re.compile(r"_(p\d{6}|default)$")
+
+NAME_OPTIONS = (None, "bakery 1a")
+BUILDING_OPTIONS = (False, True)
+ACTIVITY_OPTIONS = (None, "direct", "children")
+GEO_OPTIONS = (None, "radius", "bbox")
+CURSOR_OPTIONS = (False, True)
+
+
+def _organization_filter_combinations() -> list[Any]:
+    combinations = []
+    for name, building, activity, geo, cursor in itertools.product(
+        NAME_OPTIONS,
+        BUILDING_OPTIONS,
+        ACTIVITY_OPTIONS,
+        GEO_OPTIONS,
+        CURSOR_OPTIONS,
+    ):
+        parts = [
+            "name" if name else "",
+            "building" if building else "",
+            f"activity_{activity}" if activity else "",
+            geo or "",
+            "cursor" if cursor else "",
+        ]
+        combinations.append(
+            pytest.param(
+                {
+                    "name": name,
+                    "building": building,
+                    "activity": activity,
+                    "geo": geo,
+                    "cursor": cursor,
+                },
+                id="-".join(part for part in parts if part) or "no_filters",
+            )
+        )
+    return combinations
+
+
+def _build_organization_filter(
+    keys: LargeDatasetKeys, combination: dict[str, Any]
+) -> OrganizationFilter:
+    activity: OrganizationActivityFilter | None = None
+    if combination["activity"] == "direct":
+        activity = OrganizationActivityFilter(
+            activity_uuids=[keys["leaf_activity_id"]], include_children=False
+        )
+    if combination["activity"] == "children":
+        activity = OrganizationActivityFilter(
+            activity_uuids=[keys["root_activity_id"]], include_children=True
+        )
+
+    return OrganizationFilter(
+        name=combination["name"],
+        building_uuids=[keys["building_id"]] if combination["building"] else [],
+        activity=activity,
+        within_radius=WithinRadiusFilter(radius=2000, center_lat=55.0, center_long=35.0)
+        if combination["geo"] == "radius"
+        else None,
+        within_bounding_box=WithinBoundingBoxFilter(
+            min_lat=54.95, max_lat=55.05, min_long=34.95, max_long=35.05
+        )
+        if combination["geo"] == "bbox"
+        else None,
+        pagination=PaginationParams(
+            cursor=KeysetCursorCodec.encode(
+                keys["cursor_created_at"], keys["cursor_id"]
+            )
+            if combination["cursor"]
+            else None,
+            limit=20,
+        ),
+    )
+
+
+async def _explain(conn: asyncpg.Connection, stmt: Select) -> dict[str, Any]:
+    """Return planner output for statement exactly as repository sends it."""
+    compiled = stmt.compile(dialect=asyncpg_dialect())
+    params = [compiled.params[name] for name in compiled.positiontup or []]
+    raw_plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {compiled.string}", *params)
+    return json.loads(raw_plan)[0]["Plan"]
+
+
+def _plan_nodes(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+def _table_name(node: dict[str, Any]) -> str | None:
+    relation = node.get("Relation Name")
+    return PARTITION_SUFFIX.sub("", relation) if relation else None
+
+
+def _assert_index_driven(plan: dict[str, Any]) -> None:
+    nodes = _plan_nodes(plan)
+    seq_scans = [
+        node["Relation Name"]
+        for node in nodes
+        if node["Node Type"] == "Seq Scan" and _table_name(node) in LARGE_TABLES
+    ]
+    assert not seq_scans, (
+        f"Sequential scan on large tables {seq_scans}:\n{json.dumps(plan, indent=2)}"
+    )
+    assert any(node["Node Type"] in INDEX_NODE_TYPES for node in nodes), (
+        f"Plan does not use any index:\n{json.dumps(plan, indent=2)}"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("combination", _organization_filter_combinations())
+async def test_get_organizations_query_plan_uses_indexes(
+    large_dataset: LargeDatasetKeys,
+    large_dataset_conn: asyncpg.Connection,
+    combination: dict[str, Any],
+) -> None:
+    """Every organization filter combination is answered through indexes."""
+    organization_filter = _build_organization_filter(large_dataset, combination)
+
+    plan = await _explain(large_dataset_conn, organizations_query(organization_filter))
+
+    _assert_index_driven(plan)
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_deep_page_prunes_partitions(
+    large_dataset: LargeDatasetKeys,
+    large_dataset_conn: asyncpg.Connection,
+) -> None:
+    """Cursor page skips search partitions older than the cursor."""
+    organization_filter = OrganizationFilter(
+        pagination=PaginationParams(
+            cursor=KeysetCursorCodec.encode(
+                large_dataset["cursor_created_at"], large_dataset["cursor_id"]
+            ),
+            limit=20,
+        )
+    )
+
+    plan = await _explain(large_dataset_conn, organizations_query(organization_filter))
+
+    scanned = {
+        node["Relation Name"]
+        for node in _plan_nodes(plan)
+        if _table_name(node) == "organization_search"
+    }
+    assert "organization_search_p202501" not in scanned
+    assert "organization_search_p202502" in scanned
+
+
+def _assert_no_sort(plan: dict[str, Any]) -> None:
+    sorts = [
+        node["Node Type"]
+        for node in _plan_nodes(plan)
+        if node["Node Type"] in SORT_NODE_TYPES
+    ]
+    assert not sorts, f"Rows are sorted after reading:\n{json.dumps(plan, indent=2)}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort", [OrganizationSort.NAME, OrganizationSort.NAME_DESC])
+@pytest.mark.parametrize("cursor", [False, True])
+async def test_get_organizations_name_sort_query_plan_reads_index_order(
+    large_dataset: LargeDatasetKeys,
+    large_dataset_conn: asyncpg.Connection,
+    sort: OrganizationSort,
+    cursor: bool,
+) -> None:
+    """Alphabetical pages come in index order, without sorting all rows."""
+    organization_filter = OrganizationFilter(
+        pagination=PaginationParams(
+            cursor=SortKeyCursorCodec.encode(
+                sort, "bakery 8", large_dataset["organization_id"]
+            )
+            if cursor
+            else None,
+            limit=20,
+        ),
+        sort=sort,
+    )
+
+    plan = await _explain(large_dataset_conn, organizations_query(organization_filter))
+
+    _assert_index_driven(plan)
+    _assert_no_sort(plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("match", list(ActivityMatch))
+@pytest.mark.parametrize("include_children", [False, True])
+@pytest.mark.parametrize("cursor", [False, True])
+async def test_get_organizations_multi_value_query_plan_uses_indexes(
+    large_dataset: LargeDatasetKeys,
+    large_dataset_conn: asyncpg.Connection,
+    match: ActivityMatch,
+    include_children: bool,
+    cursor: bool,
+) -> None:
+    """Several buildings and activities in one filter are answered through indexes."""
+    organization_filter = OrganizationFilter(
+        building_uuids=[
+            large_dataset["building_id"],
+            large_dataset["second_building_id"],
+        ],
+        activity=OrganizationActivityFilter(
+            activity_uuids=[
+                large_dataset["leaf_activity_id"],
+                large_dataset["second_leaf_activity_id"],
+            ]
+            if not include_children
+            else [large_dataset["root_activity_id"], large_dataset["leaf_activity_id"]],
+            include_children=include_children,
+            match=match,
+        ),
+        pagination=PaginationParams(
+            cursor=KeysetCursorCodec.encode(
+                large_dataset["cursor_created_at"], large_dataset["cursor_id"]
+            )
+            if cursor
+            else None,
+            limit=20,
+        ),
+    )
+
+    plan = await _explain(large_dataset_conn, organizations_query(organization_filter))
+
+    _assert_index_driven(plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query_builder",
+    [
+        organization_query,
+        organization_phone_numbers_query,
+        organization_activities_query,
+    ],
+)
+async def test_get_organization_detail_query_plans_use_indexes(
+    large_dataset: LargeDatasetKeys,
+    large_dataset_conn: asyncpg.Connection,
+    query_builder: Any,
+) -> None:
+    """Organization detail queries are answered through indexes."""
+    plan = await _explain(
+        large_dataset_conn, query_builder(large_dataset["organization_id"])
+    )
+
+    _assert_index_driven(plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query_builder",
+    [organizations_phone_numbers_query, organizations_activities_query],
+)
+async def test_get_organizations_expand_query_plans_use_indexes(
+    large_dataset: LargeDatasetKeys,
+    large_dataset_conn: asyncpg.Connection,
+    query_builder: Any,
+) -> None:
+    """Relations of a listing page are loaded through indexes."""
+    organization_ids = await large_dataset_conn.fetch(
+        "SELECT id FROM organization ORDER BY created_at, id LIMIT 100"
+    )
+
+    plan = await _explain(
+        large_dataset_conn, query_builder([row["id"] for row in organization_ids])
+    )
+
+    _assert_index_driven(plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("with_cursor", [False, True])
+async def test_get_buildings_query_plan_uses_indexes(
+    large_dataset: LargeDatasetKeys,
+    large_dataset_conn: asyncpg.Connection,
+    with_cursor: bool,
+) -> None:
+    """Buildings page (first and deep page) is answered through indexes."""
+    building_filter = BuildingFilter(
+        pagination=PaginationParams(
+            cursor=KeysetCursorCodec.encode(
+                large_dataset["cursor_created_at"], large_dataset["building_id"]
+            )
+            if with_cursor
+            else None,
+        )
+    )
+
+    plan = await _explain(large_dataset_conn, buildings_query(building_filter))
+
+    _assert_index_driven(plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("with_cursor", [False, True])
+async def test_get_buildings_address_sort_query_plan_reads_index_order(
+    large_dataset: LargeDatasetKeys,
+    large_dataset_conn: asyncpg.Connection,
+    with_cursor: bool,
+) -> None:
+    """Buildings ordered by address come in index order."""
+    building_filter = BuildingFilter(
+        pagination=PaginationParams(
+            cursor=SortKeyCursorCodec.encode(
+                BuildingSort.ADDRESS,
+                "test city, street 500",
+                large_dataset["building_id"],
+            )
+            if with_cursor
+            else None,
+        ),
+        sort=BuildingSort.ADDRESS,
+    )
+
+    plan = await _explain(large_dataset_conn, buildings_query(building_filter))
+
+    _assert_index_driven(plan)
+    _assert_no_sort(plan)
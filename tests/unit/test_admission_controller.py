@@ -0,0 +1,62 @@
+import pytest
+
+from src.api import admission
+from src.api.admission import AdmissionController, RequestClass
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def _controller() -> AdmissionController:
+    return AdmissionController(
+        initial_limit=10,
+        min_limit=2,
+        max_limit=20,
+        target_pool_wait=0.01,
+        expensive_share=0.5,
+    )
+
+
+def _request(controller: AdmissionController) -> None:
+    controller.acquire(RequestClass.CHEAP)
+    controller.release()
+
+
+def test_stale_pool_wait_shrinks_limit_once(clock: _Clock) -> None:
+    """Without new slow checkouts one burst decreases the limit a single time."""
+    controller = _controller()
+    for _ in range(5):
+        controller.observe_pool_wait(1.0)
+
+    for _ in range(10):
+        clock.now += controller.BACKOFF_INTERVAL
+        _request(controller)
+
+    assert controller.limit == pytest.approx(10 * controller.BACKOFF_RATIO)
+
+
+def test_pool_wait_decays_while_pool_is_idle(clock: _Clock) -> None:
+    """An idle pool forgets its last burst and the limit grows again."""
+    controller = _controller()
+    controller.observe_pool_wait(1.0)
+    _request(controller)
+    shrunk = controller.limit
+
+    clock.now += 20 * controller.POOL_WAIT_HALF_LIFE
+    controller.in_flight = int(controller.limit)
+    controller.release()
+
+    assert controller.pool_wait < controller.target_pool_wait
+    assert controller.limit > shrunk
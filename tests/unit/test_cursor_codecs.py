@@ -0,0 +1,34 @@
+import base64
+
+import pytest
+
+from src.repository.directory.postgres.cursor import (
+    ChangeTokenCodec,
+    KeysetCursorCodec,
+    SnapshotCursorCodec,
+    SortKeyCursorCodec,
+)
+
+
+def _encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        _encode(b"[1, 2]"),
+        _encode(b"42"),
+        _encode(b'{"created_at": "2024-01-01T00:00:00", "id": 1}'),
+        _encode(b'{"created_at": null, "id": null}'),
+    ],
+)
+def test_wrong_payload_types_are_invalid_cursors(cursor: str) -> None:
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        KeysetCursorCodec.decode(cursor)
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        SortKeyCursorCodec.decode(cursor, "name")
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        SnapshotCursorCodec.decode(cursor)
+    with pytest.raises(ValueError, match="Invalid change token"):
+        ChangeTokenCodec.decode(cursor)
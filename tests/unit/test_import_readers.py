@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.directory_import.readers import read_records
+
+
+def _write_features(path: Path, features: list[Any]) -> Path:
+    path.write_text(
+        json.dumps({"type": "FeatureCollection", "features": features}), "utf-8"
+    )
+    return path
+
+
+@pytest.mark.parametrize(
+    ("feature", "message"),
+    [
+        ("not a feature", "feature is not an object"),
+        ({"properties": ["name"]}, "properties and geometry must be objects"),
+        (
+            {"geometry": {"coordinates": [30.3]}, "properties": {"name": "A"}},
+            r"coordinates must be a \[longitude, latitude\] array",
+        ),
+        (
+            {"geometry": {"coordinates": "30.3,59.9"}, "properties": {"name": "A"}},
+            r"coordinates must be a \[longitude, latitude\] array",
+        ),
+        (
+            {
+                "geometry": {"coordinates": [[30.3], [59.9]]},
+                "properties": {"name": "A", "address": "Nevsky, 1"},
+            },
+            r"float\(\) argument must be",
+        ),
+    ],
+)
+def test_malformed_feature_is_reported_with_its_number(
+    tmp_path: Path, feature: Any, message: str
+) -> None:
+    valid = {
+        "geometry": {"coordinates": [30.3351, 59.9343]},
+        "properties": {"name": "Nevsky Books", "address": "Nevsky, 1"},
+    }
+    source = _write_features(tmp_path / "city.geojson", [valid, feature])
+
+    with pytest.raises(ValueError, match=f"^Invalid record 2: {message}"):
+        list(read_records(source))
@@ -0,0 +1,40 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src.profiling import Profile, ProfileStorage
+
+
+def test_profiles_of_one_path_and_second_get_distinct_names(tmp_path: Path) -> None:
+    """Storages created per request never overwrite each other's profiles."""
+    profile = Profile(name="GET /api/v1/directory/building", interval=0.005)
+
+    names = [ProfileStorage(tmp_path, max_profiles=10).save(profile) for _ in range(3)]
+
+    assert len(set(names)) == 3
+    assert len(ProfileStorage(tmp_path, max_profiles=10).list()) == 6
+
+
+def test_symlink_in_profile_directory_is_not_served(tmp_path: Path) -> None:
+    """A file planted as a symlink is neither listed nor downloaded."""
+    secret = tmp_path / "secret"
+    secret.write_text("secret")
+    directory = tmp_path / "profiles"
+    storage = ProfileStorage(directory, max_profiles=10)
+    storage.save(Profile(name="GET /", interval=0.005))
+    (directory / "planted.collapsed").symlink_to(secret)
+
+    assert storage.get("planted.collapsed") is None
+    assert len(storage.list()) == 2
+
+
+def test_profile_directory_writable_by_others_is_refused(tmp_path: Path) -> None:
+    directory = tmp_path / "profiles"
+    directory.mkdir(mode=0o777)
+    os.chmod(directory, 0o777)
+
+    with pytest.raises(PermissionError):
+        ProfileStorage(directory, max_profiles=10).save(
+            Profile(name="GET /", interval=0.005)
+        )
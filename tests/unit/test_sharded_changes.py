@@ -0,0 +1,82 @@
+from uuid import uuid4
+
+import pytest
+
+from src.dto import ChangeFilter, DirectoryChange
+from src.repository.directory.postgres import KeyedChanges
+from src.repository.directory.postgres.cursor import ChangeTokenCodec
+from src.repository.directory.sharded import Region, Shard, ShardedDirectoryRepository
+from src.repository.directory.sharded.repository import ShardChangeTokenCodec
+
+WORLD = Region(min_lat=-90, max_lat=90, min_long=-180, max_long=180)
+
+
+class _ChangeLog:
+    """Shard repository stand-in serving changes at positions (1, 1), (1, 2)..."""
+
+    def __init__(self, count: int) -> None:
+        self.changes = [
+            DirectoryChange(entity="organization", uuid=uuid4(), op="upsert")
+            for _ in range(count)
+        ]
+
+    async def get_change_page(self, filter: ChangeFilter) -> KeyedChanges:
+        since = ChangeTokenCodec.decode(filter.since) if filter.since else (0, 0)
+        rows = [
+            ((1, seq), change)
+            for seq, change in enumerate(self.changes, start=1)
+            if (1, seq) > since
+        ]
+        return KeyedChanges(
+            rows=rows[: filter.limit], has_more=len(rows) > filter.limit, since=since
+        )
+
+
+def _repository(*logs: _ChangeLog) -> ShardedDirectoryRepository:
+    return ShardedDirectoryRepository(
+        [
+            Shard(name=f"shard-{index}", region=WORLD, repository=log)
+            for index, log in enumerate(logs)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_changes_page_is_trimmed_to_limit_across_shards() -> None:
+    """More shards than the limit still give at most `limit` changes per page."""
+    logs = [_ChangeLog(1) for _ in range(3)]
+    repository = _repository(*logs)
+
+    first = await repository.get_changes(ChangeFilter(limit=2))
+    second = await repository.get_changes(ChangeFilter(since=first.next_token, limit=2))
+
+    assert len(first.items) == 2
+    assert first.has_more
+    assert second.items == [logs[2].changes[0]]
+    assert not second.has_more
+
+
+@pytest.mark.asyncio
+async def test_changes_pages_return_every_change_once() -> None:
+    """Shard tokens stop after the last returned change, nothing is skipped."""
+    logs = [_ChangeLog(5), _ChangeLog(1), _ChangeLog(3)]
+    repository = _repository(*logs)
+
+    seen: list[DirectoryChange] = []
+    token = None
+    while True:
+        page = await repository.get_changes(ChangeFilter(since=token, limit=2))
+        assert len(page.items) <= 2
+        seen.extend(page.items)
+        token = page.next_token
+        if not page.has_more:
+            break
+
+    assert sorted(str(change.uuid) for change in seen) == sorted(
+        str(change.uuid) for log in logs for change in log.changes
+    )
+    assert set(ShardChangeTokenCodec.decode(token)) == {
+        "shard-0",
+        "shard-1",
+        "shard-2",
+    }
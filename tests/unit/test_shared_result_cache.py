@@ -0,0 +1,129 @@
+import itertools
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pydantic import TypeAdapter
+
+from src.service import SharedResultCache
+from src.service.cache import cache_lookups
+
+TEXT = TypeAdapter(str)
+NUMBER = TypeAdapter(int)
+
+
+@pytest.fixture
+def cache_path(tmp_path: Path) -> Path:
+    return tmp_path / "directory-cache"
+
+
+@pytest.fixture
+def cache(cache_path: Path) -> Iterator[SharedResultCache]:
+    # 100 byte ring: two 40 byte values fit, the third one wraps around.
+    cache = SharedResultCache(cache_path, slots=1024, size=100)
+    try:
+        yield cache
+    finally:
+        cache.close()
+
+
+def _value(letter: str) -> str:
+    # JSON string of 38 characters plus two quotes.
+    return letter * 38
+
+
+def test_value_is_shared_with_another_instance(
+    cache: SharedResultCache, cache_path: Path
+) -> None:
+    """Another worker mapping the same file reads the stored value."""
+    cache.set("key", "v1", _value("a"), TEXT)
+
+    other = SharedResultCache(cache_path, slots=1024, size=100)
+    try:
+        assert other.get("key", "v1", TEXT) == _value("a")
+        assert other.get("key", "v2", TEXT) is None
+    finally:
+        other.close()
+
+
+def test_ring_wrap_around_drops_overwritten_values(cache: SharedResultCache) -> None:
+    """A value that does not fit before the ring end overwrites the oldest one."""
+    cache.set("first", "v1", _value("a"), TEXT)
+    cache.set("second", "v1", _value("b"), TEXT)
+    cache.set("third", "v1", _value("c"), TEXT)
+
+    assert cache.get("first", "v1", TEXT) is None
+    assert cache.get("second", "v1", TEXT) == _value("b")
+    assert cache.get("third", "v1", TEXT) == _value("c")
+
+
+def test_key_sharing_a_slot_evicts_previous_entry(cache_path: Path) -> None:
+    """With one index slot the last stored key replaces the previous one."""
+    cache = SharedResultCache(cache_path, slots=1, size=100)
+    try:
+        cache.set("first", "v1", _value("a"), TEXT)
+        cache.set("second", "v1", _value("b"), TEXT)
+
+        assert cache.get("first", "v1", TEXT) is None
+        assert cache.get("second", "v1", TEXT) == _value("b")
+    finally:
+        cache.close()
+
+
+def test_read_during_write_is_reported_busy(cache: SharedResultCache) -> None:
+    """Odd write sequence means a write is in progress, nothing is decoded."""
+    cache.set("key", "v1", _value("a"), TEXT)
+    sequence, head = cache.STATE.unpack_from(cache._map, cache.HEADER.size)
+    cache.STATE.pack_into(cache._map, cache.HEADER.size, sequence + 1, head)
+    busy = cache_lookups.value(result="busy")
+
+    assert cache.get("key", "v1", TEXT) is None
+    assert cache_lookups.value(result="busy") == busy + 1
+
+
+def test_torn_read_is_retried_and_given_up(
+    cache: SharedResultCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Sequence changing during every copy never returns the copied bytes."""
+    cache.set("key", "v1", _value("a"), TEXT)
+
+    class ChangingState:
+        # Every read sees another completed write.
+        size = cache.STATE.size
+        sequences = itertools.count(start=2, step=2)
+
+        def unpack_from(self, buffer: object, offset: int) -> tuple[int, int]:
+            return next(self.sequences), 0
+
+    monkeypatch.setattr(cache, "STATE", ChangingState())
+    busy = cache_lookups.value(result="busy")
+
+    assert cache.get("key", "v1", TEXT) is None
+    assert cache_lookups.value(result="busy") == busy + 1
+
+
+def test_value_of_another_type_is_a_miss(cache: SharedResultCache) -> None:
+    """Bytes the adapter can not decode are treated as a miss."""
+    cache.set("key", "v1", _value("a"), TEXT)
+    misses = cache_lookups.value(result="miss")
+
+    assert cache.get("key", "v1", NUMBER) is None
+    assert cache_lookups.value(result="miss") == misses + 1
+
+
+def test_cache_file_readable_by_others_is_refused(cache_path: Path) -> None:
+    cache_path.touch(mode=0o644)
+    os.chmod(cache_path, 0o644)
+
+    with pytest.raises(PermissionError):
+        SharedResultCache(cache_path, slots=1, size=100)
+
+
+def test_symlinked_cache_file_is_refused(cache_path: Path, tmp_path: Path) -> None:
+    target = tmp_path / "elsewhere"
+    target.touch(mode=0o600)
+    cache_path.symlink_to(target)
+
+    with pytest.raises(OSError):
+        SharedResultCache(cache_path, slots=1, size=100)
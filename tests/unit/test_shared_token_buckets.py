@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src.api.rate_limit import SharedTokenBuckets
+
+
+def test_buckets_are_shared_through_the_file(tmp_path: Path) -> None:
+    """A second instance on the same file sees tokens taken by the first."""
+    path = tmp_path / "private" / "rate-limit"
+    first = SharedTokenBuckets(path, ["client"])
+    second = SharedTokenBuckets(path, ["client"])
+
+    assert first.take("client", rate=0.001, burst=1) == 0
+    assert second.take("client", rate=0.001, burst=1) > 0
+    assert os.stat(path.parent).st_mode & 0o777 == 0o700
+    first.close()
+    second.close()
+
+
+def test_symlinked_bucket_file_is_refused(tmp_path: Path) -> None:
+    target = tmp_path / "elsewhere"
+    target.write_bytes(b"keep")
+    path = tmp_path / "rate-limit"
+    path.symlink_to(target)
+
+    with pytest.raises(OSError):
+        SharedTokenBuckets(path, ["client"])
+    assert target.read_bytes() == b"keep"
+
+
+def test_bucket_file_writable_by_others_is_refused(tmp_path: Path) -> None:
+    path = tmp_path / "rate-limit"
+    path.touch()
+    os.chmod(path, 0o666)
+
+    with pytest.raises(PermissionError):
+        SharedTokenBuckets(path, ["client"])
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+
+from src.config import settings
+from src.database import StatementTimeoutError, deadline, statement_deadline
+from src.service.single_flight import SingleFlight, single_flight_coalesced
+
+
+class _Backend:
+    """Call that blocks until released and counts how often it ran."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.error: Exception | None = None
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"result-{self.calls}"
+
+
+async def _wait_for_waiters(single_flight: SingleFlight, count: int) -> None:
+    while sum(flight.waiters for flight in single_flight._flights.values()) < count:
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_run_backend_once() -> None:
+    """Callers of one key share a single backend call and its result."""
+    single_flight = SingleFlight()
+    backend = _Backend()
+    coalesced_before = single_flight_coalesced.value(operation="unit")
+
+    callers = [
+        asyncio.create_task(single_flight.do("unit", "key", backend)) for _ in range(5)
+    ]
+    await _wait_for_waiters(single_flight, 5)
+    backend.release.set()
+
+    assert await asyncio.gather(*callers) == ["result-1"] * 5
+    assert backend.calls == 1
+    assert single_flight_coalesced.value(operation="unit") - coalesced_before == 4
+    assert single_flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    """Remaining callers still get the result when one of them is cancelled."""
+    single_flight = SingleFlight()
+    backend = _Backend()
+    cancelled = asyncio.create_task(single_flight.do("unit", "key", backend))
+    waiting = asyncio.create_task(single_flight.do("unit", "key", backend))
+    await _wait_for_waiters(single_flight, 2)
+
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    backend.release.set()
+
+    assert await waiting == "result-1"
+    assert backend.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_backend_error_reaches_every_waiter() -> None:
+    """A failed call raises its error in every caller and is not reused."""
+    single_flight = SingleFlight()
+    backend = _Backend()
+    backend.error = LookupError("backend failed")
+
+    callers = [
+        asyncio.create_task(single_flight.do("unit", "key", backend)) for _ in range(3)
+    ]
+    await _wait_for_waiters(single_flight, 3)
+    backend.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert [type(result) for result in results] == [LookupError] * 3
+    assert {str(result) for result in results} == {"backend failed"}
+    assert backend.calls == 1
+    assert single_flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_caller_deadline_times_out_alone() -> None:
+    """A short caller deadline neither reaches the shared call nor other callers."""
+    single_flight = SingleFlight()
+    backend = _Backend()
+    seen_deadlines = []
+
+    async def call() -> str:
+        seen_deadlines.append(statement_deadline.get())
+        return await backend()
+
+    with deadline(0.01):
+        hurried = asyncio.create_task(single_flight.do("get_organization", "key", call))
+    patient = asyncio.create_task(single_flight.do("get_organization", "key", call))
+    await _wait_for_waiters(single_flight, 2)
+
+    with pytest.raises(StatementTimeoutError):
+        await hurried
+    backend.release.set()
+
+    assert await patient == "result-1"
+    assert backend.calls == 1
+    budget = settings.STATEMENT_TIMEOUTS_MS["get_organization"] / 1000
+    assert seen_deadlines[0] - time.monotonic() > budget - 1
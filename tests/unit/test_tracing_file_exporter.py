@@ -0,0 +1,55 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src.tracing import FileExporter, Span
+
+SPANS_PER_PROCESS = 300
+
+
+def _span(index: int) -> Span:
+    # Large attributes make lines longer than typical write buffers.
+    return Span(1, index + 1, None, "db.execute", 0, attributes={"sql": "x" * 9000})
+
+
+def _export_spans(path: Path) -> None:
+    exporter = FileExporter(path)
+    for index in range(SPANS_PER_PROCESS):
+        exporter.export(_span(index))
+    exporter.close()
+
+
+def test_span_is_readable_right_after_export(tmp_path: Path) -> None:
+    """Spans reach the file without waiting for a flush."""
+    path = tmp_path / "spans.jsonl"
+    exporter = FileExporter(path)
+
+    exporter.export(_span(0))
+
+    assert json.loads(path.read_text())["name"] == "db.execute"
+    exporter.close()
+
+
+def test_processes_appending_to_one_file_keep_lines_whole(tmp_path: Path) -> None:
+    """Workers sharing the span file never interleave parts of their lines."""
+    path = tmp_path / "spans.jsonl"
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_export_spans, [path] * 4))
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 4 * SPANS_PER_PROCESS
+    assert all(json.loads(line)["attributes"]["sql"] == "x" * 9000 for line in lines)
+
+
+def test_symlinked_span_file_is_refused(tmp_path: Path) -> None:
+    target = tmp_path / "elsewhere"
+    target.write_text("keep")
+    path = tmp_path / "spans.jsonl"
+    path.symlink_to(target)
+
+    with pytest.raises(OSError):
+        FileExporter(path)
+    assert target.read_text() == "keep"